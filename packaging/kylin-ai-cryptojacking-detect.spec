@@ -17,6 +17,7 @@ Requires:       python3
 Requires:       python3dist(pyyaml)
 Requires:       python3dist(psutil)
 Requires:       python3dist(pandas)
+Requires:       python3dist(numpy)
 
 %description
 Multi-layer cryptominer detection tool: L1 system signals, L2 process scan, L3 memory forensics. Installs `miner-sentinel` CLI.
@@ -40,6 +41,7 @@ Multi-layer cryptominer detection tool: L1 system signals, L2 process scan, L3 m
 %license LICENSE
 %doc README.md README README.rst readme.md
 %{_bindir}/miner-sentinel
+%{_bindir}/miner-sentinel-ml
 
 %changelog
 * Wed Oct 22 2025 You <you@example.com> - 0.1.1-1
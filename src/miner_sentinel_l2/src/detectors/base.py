@@ -0,0 +1,255 @@
+import importlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import psutil
+
+from ..utils.exe_identity import ExeIdentityResolver
+from ..utils.environ_config import EnvironConfigInspector
+from ..utils.exe_signatures import ExeSignatureScanner
+from ..utils.memory_maps import MapsAnalyzer
+from ..utils.procfs import CLOCK_TICKS, read_meminfo, read_smaps_rollup, read_stat, read_status, read_uptime
+from ..utils.sched_io import SchedIOProfiler
+from ..utils.system_utils import SystemUtils
+from ..utils.thread_profiler import ThreadCPUProfiler
+
+
+FeatureProvider = Callable[['FeatureContext'], Any]
+
+
+class _FeatureError:
+    """记住特征采集时抛出的异常，同一轮扫描内再次访问直接重新抛出"""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class FeatureContext:
+    """单个进程在一轮扫描内的特征上下文
+
+    特征在第一次被访问时才由对应的提供者采集，结果在本轮扫描内缓存，
+    多个检测器声明同一特征时只采集一次。
+    """
+
+    def __init__(self, pid: int, graph: 'FeatureGraph'):
+        self.pid = pid
+        self.graph = graph
+        self._values: Dict[str, Any] = {}
+
+    def get(self, name: str) -> Any:
+        if name in self.graph.shared_providers:
+            return self.graph.shared(name)
+        if name in self._values:
+            value = self._values[name]
+        else:
+            provider = self.graph.providers.get(name)
+            if provider is None:
+                raise KeyError(f"未注册的特征: {name}")
+            try:
+                value = provider(self)
+            except Exception as e:
+                value = _FeatureError(e)
+            self._values[name] = value
+            self.graph.fetch_counts[name] = self.graph.fetch_counts.get(name, 0) + 1
+        if isinstance(value, _FeatureError):
+            raise value.error
+        return value
+
+    __getitem__ = get
+
+    def has(self, name: str) -> bool:
+        """特征是否已经采集过（不触发采集）"""
+        return name in self._values
+
+    def set(self, name: str, value: Any):
+        """直接写入已由其他途径得到的特征值"""
+        self._values[name] = value
+
+    @property
+    def process(self) -> psutil.Process:
+        return self.get('process')
+
+
+class FeatureGraph:
+    """特征提供者注册表
+
+    提供者签名为 provider(ctx) -> value，可以通过 ctx.get 依赖其他特征；
+    全局特征（如 /proc/meminfo）的提供者签名为 provider() -> value，每轮扫描只采集一次。
+    context(pid) 返回本轮扫描内该进程共享的上下文，reset() 在每轮扫描开始时清空。
+    """
+
+    def __init__(self):
+        self.providers: Dict[str, FeatureProvider] = {}
+        self.shared_providers: Dict[str, Callable[[], Any]] = {}
+        self.fetch_counts: Dict[str, int] = {}
+        self._contexts: Dict[int, FeatureContext] = {}
+        self._shared: Dict[str, Any] = {}
+
+    def register(self, name: str, provider: FeatureProvider):
+        self.providers[name] = provider
+        self.shared_providers.pop(name, None)
+
+    def register_shared(self, name: str, provider: Callable[[], Any]):
+        self.shared_providers[name] = provider
+        self.providers.pop(name, None)
+
+    def shared(self, name: str) -> Any:
+        if name not in self._shared:
+            self._shared[name] = self.shared_providers[name]()
+            self.fetch_counts[name] = self.fetch_counts.get(name, 0) + 1
+        return self._shared[name]
+
+    def context(self, pid: int) -> FeatureContext:
+        ctx = self._contexts.get(pid)
+        if ctx is None:
+            ctx = self._contexts[pid] = FeatureContext(pid, self)
+        return ctx
+
+    def reset(self):
+        self._contexts = {}
+        self._shared = {}
+        self.fetch_counts = {}
+
+    def missing(self, features: Iterable[str]) -> List[str]:
+        return [name for name in features if name not in self.providers and name not in self.shared_providers]
+
+
+def _stat(ctx: FeatureContext):
+    stat = read_stat(ctx.pid)
+    if stat is None:
+        raise psutil.NoSuchProcess(ctx.pid)
+    return stat
+
+
+def _uptime_seconds(ctx: FeatureContext) -> float:
+    """运行时长取内核记录的真实启动时间"""
+    return max(read_uptime() - ctx.get('stat').starttime / CLOCK_TICKS, 0.0)
+
+
+def _cmdline(ctx: FeatureContext) -> List[str]:
+    try:
+        return ctx.process.cmdline()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return []
+
+
+_exe_resolver: Optional[ExeIdentityResolver] = None
+
+
+def _default_exe_resolver() -> ExeIdentityResolver:
+    """哈希库与持久化缓存在第一次用到时才加载"""
+    global _exe_resolver
+    if _exe_resolver is None:
+        _exe_resolver = ExeIdentityResolver()
+    return _exe_resolver
+
+
+_signature_scanner: Optional[ExeSignatureScanner] = None
+
+
+def _default_signature_scanner() -> ExeSignatureScanner:
+    global _signature_scanner
+    if _signature_scanner is None:
+        _signature_scanner = ExeSignatureScanner()
+    return _signature_scanner
+
+
+_environ_inspector: Optional[EnvironConfigInspector] = None
+
+
+def _default_environ_inspector() -> EnvironConfigInspector:
+    global _environ_inspector
+    if _environ_inspector is None:
+        _environ_inspector = EnvironConfigInspector()
+    return _environ_inspector
+
+
+def build_feature_graph() -> FeatureGraph:
+    """内置特征：
+      process         psutil.Process 对象
+      stat            /proc/[pid]/stat 解析结果
+      name            进程名
+      cmdline         命令行参数列表（无权限时为空列表）
+      username        进程所属用户
+      memory_info     psutil 内存信息
+      connections     进程的网络连接（无权限时为空列表）
+      uptime_seconds  进程运行时长（秒）
+      cpu_percent     CPU 使用率；扫描器会替换为基于批量快照的版本
+      thread_profile  线程级 CPU 分布；扫描器会替换为带采样历史的版本
+      sched_io        上下文切换、schedstat 与 I/O 特征；扫描器会替换为带采样历史的版本
+      proc_status     /proc/[pid]/status 字段字典
+      smaps_rollup    /proc/[pid]/smaps_rollup 汇总（kB），内核不支持时为空字典
+      meminfo         /proc/meminfo（全局特征，每轮扫描读取一次）
+      maps_profile    /proc/[pid]/maps 的分类结果与 L3 区域排序
+      exe_identity    可执行文件路径、inode 与 SHA-256 身份（内核线程或无权限时为 None）
+      exe_signature   可执行文件静态签名扫描结果（无法读取时为 None）
+      environ_config  环境变量与命令行引用的配置文件的 IOC 检查结果（无法读取 environ 时为 None）
+    """
+    graph = FeatureGraph()
+    graph.register('process', lambda ctx: psutil.Process(ctx.pid))
+    graph.register('stat', _stat)
+    graph.register('name', lambda ctx: ctx.process.name())
+    graph.register('cmdline', _cmdline)
+    graph.register('username', lambda ctx: ctx.process.username())
+    graph.register('memory_info', lambda ctx: ctx.process.memory_info())
+    graph.register('connections', lambda ctx: SystemUtils.get_network_connections(ctx.pid))
+    graph.register('uptime_seconds', _uptime_seconds)
+    graph.register('cpu_percent', lambda ctx: ctx.process.cpu_percent(interval=0.1))
+    profiler = ThreadCPUProfiler()
+    graph.register('thread_profile', lambda ctx: profiler.profile(ctx.get('stat')))
+    graph.register('proc_status', lambda ctx: read_status(ctx.pid))
+    graph.register('smaps_rollup', lambda ctx: read_smaps_rollup(ctx.pid))
+    graph.register_shared('meminfo', read_meminfo)
+    maps_analyzer = MapsAnalyzer()
+    graph.register('maps_profile', lambda ctx: maps_analyzer.analyze(ctx.pid))
+    graph.register('exe_identity', lambda ctx: _default_exe_resolver().resolve(ctx.pid))
+    graph.register('exe_signature', lambda ctx: _default_signature_scanner().scan_pid(ctx.pid))
+    graph.register('environ_config', lambda ctx: _default_environ_inspector().inspect(ctx.pid, ctx.get('cmdline')))
+    sched_io = SchedIOProfiler()
+    graph.register('sched_io', lambda ctx: sched_io.profile(ctx.get('stat'), ctx.get('thread_profile').busiest_tid))
+    return graph
+
+
+_standalone_graph: Optional[FeatureGraph] = None
+
+
+def standalone_context(pid: int) -> FeatureContext:
+    """不经过扫描器单独调用检测器时使用的一次性上下文"""
+    global _standalone_graph
+    if _standalone_graph is None:
+        _standalone_graph = build_feature_graph()
+    _standalone_graph.reset()
+    return FeatureContext(pid, _standalone_graph)
+
+
+class BaseDetector:
+    """L2 检测器插件基类
+
+    子类声明：
+      name            检测器名，对应 l2_scanner.yaml 中 weights / detectors 的键
+      features        需要的特征名，扫描器只采集已启用检测器声明的特征
+      score_key       analyze 返回字典中得分的键
+      confidence_key  analyze 返回字典中置信度的键
+      default_weight  配置中没有给出权重时使用的权重
+      per_process     结果随进程自身运行状态变化（CPU、调度等）；为 False 的检测器只依赖
+                      可执行文件 / 命令行 / 连接等同组进程共享的属性，分组扫描时只对代表进程运行
+    并实现 analyze(ctx)，返回包含得分、置信度和 evidences 列表的字典。
+    """
+
+    name: str = ''
+    features: Tuple[str, ...] = ()
+    score_key: str = ''
+    confidence_key: str = ''
+    default_weight: float = 0.0
+    per_process: bool = False
+
+    def analyze(self, ctx: FeatureContext) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+def load_detector_plugin(spec: str) -> BaseDetector:
+    """按 "模块路径:类名" 加载并实例化检测器插件"""
+    module_name, _, class_name = spec.partition(':')
+    cls = getattr(importlib.import_module(module_name), class_name)
+    if not (isinstance(cls, type) and issubclass(cls, BaseDetector)):
+        raise TypeError(f"{spec} 不是 BaseDetector 的子类")
+    return cls()
@@ -0,0 +1,31 @@
+import argparse
+import sys
+import time
+
+from .pid_status_scan import PidStatusScanner
+
+
+def check_parity(interval: float = 1.0) -> int:
+    """在本机核对批量评分规则与逐进程检测器的得分（PidStatusScanner.batch_parity），返回不一致的进程数"""
+    scanner = PidStatusScanner()
+    # 核对预过滤后的全部候选进程，而不只是 Top-K 选中的部分
+    scanner.selector.enabled = False
+    scanner.select_candidates()
+    time.sleep(interval)
+    mismatches = scanner.batch_parity()
+    for pid, diff in mismatches.items():
+        details = ', '.join(f"{name}: 逐进程{expected:.3f} / 批量{batch:.3f}" for name, (expected, batch) in diff.items())
+        print(f"PID {pid} 得分不一致: {details}")
+    print(f"核对完成: {len(mismatches)}个进程的批量得分与逐进程检测器不一致")
+    return len(mismatches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='L2 批量评分：核对批量规则与逐进程检测器的得分是否一致')
+    parser.add_argument('--interval', type=float, default=1.0, help='CPU 采样间隔（秒）')
+    args = parser.parse_args()
+    sys.exit(1 if check_parity(args.interval) else 0)
+
+
+if __name__ == '__main__':
+    main()
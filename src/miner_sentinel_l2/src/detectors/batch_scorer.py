@@ -0,0 +1,285 @@
+import operator
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import psutil
+
+from ..models.detection_result import DetectionResult
+from ..utils.container import ContainerResolver
+from ..utils.ioc_matcher import IOCMatcher
+from ..utils.process_state_store import ProcessStateStore
+from ..utils.procfs import ProcessSnapshot, ProcStat, read_cmdline
+from ..utils.thread_profiler import ThreadCPUProfiler, ThreadProfile
+
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# 特征矩阵的行（顺序固定，保证结果可复现）
+FEATURE_NAMES = (
+    'cpu_current',
+    'cpu_avg',
+    'cpu_std',
+    'uptime',
+    'name_keyword',
+    'process_keyword',
+    'cmdline_keyword',
+    'cmdline_pattern',
+    'is_root',
+    'rss_mb',
+    'connections',
+    'mining_connections',
+    'uniform_threads',
+    'saturated_threads',
+    'thread_cv',
+)
+
+_OPS = {
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'lt': operator.lt,
+    'le': operator.le,
+    'eq': operator.eq,
+}
+
+
+class FeatureMatrix:
+    """特征 × 进程 矩阵，以及仅供生成证据使用的每进程上下文"""
+
+    def __init__(self, pids: List[int], values: np.ndarray, context: List[Dict]):
+        self.pids = pids
+        self.values = values
+        self.context = context
+        self.index = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+    def row(self, name: str) -> np.ndarray:
+        return self.values[self.index[name]]
+
+    def column(self, j: int) -> Dict[str, float]:
+        """第 j 个进程的特征字典（标量评分路径使用）"""
+        return {name: float(self.values[i, j]) for i, name in enumerate(FEATURE_NAMES)}
+
+    def __len__(self):
+        return len(self.pids)
+
+
+class ProcessFeatureCollector:
+    """从批量快照中采集特征矩阵
+
+    CPU、运行时长、RSS 来自 /proc/*/stat 快照；网络连接来自一次全局的 net_connections，
+    扫描器网络命名空间之外（容器内）的进程按命名空间读取各自的套接字表；
+    进程名/命令行通过共享的 IOC 自动机匹配；进程名与 psutil 一样在 comm 被截断时用 cmdline[0] 补全。
+    线程级 CPU 分布由 thread_profile 给出，扫描器传入特征图谱中的同名特征，
+    批量与逐进程路径共用每轮同一次采样（线程 ticks 历史只更新一次）。
+    """
+
+    def __init__(self, ioc_matcher: IOCMatcher, state_store: ProcessStateStore, mining_ports: Set[int],
+                 container_resolver: Optional[ContainerResolver] = None,
+                 thread_profiler: Optional[ThreadCPUProfiler] = None,
+                 thread_profile: Optional[Callable[[ProcStat], ThreadProfile]] = None):
+        self.ioc_matcher = ioc_matcher
+        self.state_store = state_store
+        self.mining_ports = mining_ports
+        self.container_resolver = container_resolver
+        self.thread_profiler = thread_profiler or ThreadCPUProfiler()
+        self.thread_profile = thread_profile or self.thread_profiler.profile
+
+    @staticmethod
+    def _process_name(comm: str, cmdline: str) -> str:
+        """comm 最长 15 字节，与 psutil.Process.name() 相同地用 cmdline[0] 的文件名补全"""
+        if len(comm) >= 15 and cmdline:
+            extended = os.path.basename(cmdline.split(' ', 1)[0])
+            if extended.startswith(comm):
+                return extended
+        return comm
+
+    def _connections_by_pid(self, pids: List[int]) -> Dict[int, List]:
+        conns: Dict[int, List] = {}
+        try:
+            for conn in psutil.net_connections(kind='inet'):
+                if conn.pid:
+                    conns.setdefault(conn.pid, []).append(conn)
+        except (psutil.AccessDenied, OSError):
+            pass
+        if self.container_resolver is not None:
+            for pid in pids:
+                if self.container_resolver.foreign_netns(pid):
+                    conns[pid] = self.container_resolver.connections(pid)
+        return conns
+
+    def collect(self, snapshot: ProcessSnapshot, previous: Optional[ProcessSnapshot],
+                pids: Iterable[int], record_history: bool = True) -> FeatureMatrix:
+        """采集特征矩阵；record_history=False 时只读取已有 CPU 历史，不写入新样本"""
+        pids = [pid for pid in pids if pid in snapshot]
+        values = np.zeros((len(FEATURE_NAMES), len(pids)), dtype=np.float64)
+        index = {name: i for i, name in enumerate(FEATURE_NAMES)}
+        conns_by_pid = self._connections_by_pid(pids)
+        context = []
+
+        for j, pid in enumerate(pids):
+            stat = snapshot.get(pid)
+            cpu = snapshot.cpu_percent(stat, previous)
+            key = (pid, stat.starttime)
+            if record_history:
+                samples = self.state_store.ring(key, 'cpu_samples')
+                samples.append(cpu)
+                cpu_avg, cpu_std = samples.mean(), samples.std()
+            else:
+                state = self.state_store.peek(key)
+                samples = state.rings.get('cpu_samples') if state is not None else None
+                if samples:
+                    cpu_avg, cpu_std = samples.mean(), samples.std()
+                else:
+                    cpu_avg, cpu_std = cpu, 0.0
+
+            cmdline = read_cmdline(pid)
+            # 结果保留原始大小写的进程名，IOC 自动机内部按小写匹配
+            name = self._process_name(stat.comm, cmdline)
+            name_hits = self.ioc_matcher.match(name)
+            cmdline_hits = self.ioc_matcher.match(cmdline)
+            try:
+                threads = self.thread_profile(stat)
+            except Exception:
+                threads = None
+
+            conns = conns_by_pid.get(pid, [])
+            mining_endpoints = [
+                f"{conn.raddr[0]}:{conn.raddr[1]}" for conn in conns
+                if conn.raddr and conn.raddr[1] in self.mining_ports
+            ]
+            try:
+                is_root = os.stat(f'/proc/{pid}').st_uid == 0
+            except OSError:
+                is_root = False
+
+            uptime = snapshot.age_seconds(stat)
+            column = {
+                'cpu_current': cpu,
+                'cpu_avg': cpu_avg,
+                'cpu_std': cpu_std,
+                'uptime': uptime,
+                'name_keyword': 1.0 if name_hits.get('name_keyword') else 0.0,
+                'process_keyword': 1.0 if name_hits.get('keyword') else 0.0,
+                'cmdline_keyword': 1.0 if cmdline_hits.get('keyword') else 0.0,
+                'cmdline_pattern': 1.0 if cmdline_hits.get('pattern') else 0.0,
+                'is_root': 1.0 if is_root else 0.0,
+                'rss_mb': stat.rss_pages * PAGE_SIZE / (1024 * 1024),
+                'connections': len(conns),
+                'mining_connections': len(mining_endpoints),
+                'uniform_threads': 1.0 if threads is not None and self.thread_profiler.is_uniform(threads) else 0.0,
+                'saturated_threads': threads.saturated if threads is not None else 0.0,
+                'thread_cv': threads.cv if threads is not None else 0.0,
+            }
+            for name_, value in column.items():
+                values[index[name_], j] = value
+
+            context.append({
+                'name': name,
+                'uptime_hours': uptime / 3600,
+                'cmdline_keywords': ', '.join(cmdline_hits.get('keyword', [])),
+                'cmdline_patterns': ', '.join(cmdline_hits.get('pattern', [])),
+                'mining_endpoints': ', '.join(mining_endpoints),
+            })
+
+        return FeatureMatrix(pids, values, context)
+
+
+class BatchScorer:
+    """按配置中的规则表对特征矩阵做向量化评分
+
+    score_matrix 为向量化路径，score_features 为等价的标量路径；
+    两者按相同顺序累加，结果逐位一致。
+    """
+
+    def __init__(self, config: Optional[Dict] = None, weights: Optional[Dict[str, float]] = None):
+        config = config or {}
+        self.enabled = config.get('enabled', False)
+        self.threshold = config.get('threshold', 0.5)
+        self.detectors: Dict[str, Dict] = config.get('detectors', {})
+        self.weights = weights or {}
+
+    @staticmethod
+    def _increment(rule: Dict, features) -> object:
+        score = rule.get('score', 0.0)
+        per = rule.get('score_per')
+        return score * features[per] if per else score
+
+    # ---------- 向量化路径 ----------
+
+    def score_matrix(self, fm: FeatureMatrix) -> Dict[str, np.ndarray]:
+        """返回 {检测器名: 得分向量, 检测器名_confidence: 置信度向量, 'total', 'confidence'}"""
+        n = len(fm)
+        features = {name: fm.row(name) for name in FEATURE_NAMES}
+        out: Dict[str, np.ndarray] = {}
+        total = np.zeros(n)
+        confidence = np.zeros(n)
+
+        for det_name, det in self.detectors.items():
+            raw = np.zeros(n)
+            for rule in det.get('rules', []):
+                mask = np.ones(n, dtype=bool)
+                for feature, op, value in rule.get('when', []):
+                    mask &= _OPS[op](features[feature], value)
+                raw += np.where(mask, self._increment(rule, features), 0.0)
+            score = np.minimum(raw, 1.0)
+            conf = raw * det.get('confidence_factor', 1.0)
+            weight = self.weights.get(det_name, 0.0)
+            out[det_name] = score
+            out[f'{det_name}_confidence'] = conf
+            total += score * weight
+            confidence += conf * weight
+
+        out['total'] = total
+        out['confidence'] = confidence
+        return out
+
+    # ---------- 标量路径 ----------
+
+    def score_features(self, features: Dict[str, float]) -> Dict[str, float]:
+        """单个进程的等价标量评分"""
+        out: Dict[str, float] = {}
+        total = 0.0
+        confidence = 0.0
+        for det_name, det in self.detectors.items():
+            raw = 0.0
+            for rule in det.get('rules', []):
+                if all(_OPS[op](features[feature], value) for feature, op, value in rule.get('when', [])):
+                    raw += self._increment(rule, features)
+            score = min(raw, 1.0)
+            conf = raw * det.get('confidence_factor', 1.0)
+            weight = self.weights.get(det_name, 0.0)
+            out[det_name] = score
+            out[f'{det_name}_confidence'] = conf
+            total += score * weight
+            confidence += conf * weight
+        out['total'] = total
+        out['confidence'] = confidence
+        return out
+
+    # ---------- 结果 ----------
+
+    def build_results(self, fm: FeatureMatrix, scores: Dict[str, np.ndarray]) -> List[DetectionResult]:
+        """只为总分达到阈值的进程生成 DetectionResult 和证据文本"""
+        results = []
+        for j in np.flatnonzero(scores['total'] >= self.threshold):
+            features = fm.column(j)
+            ctx = dict(features, **fm.context[j])
+            evidences = []
+            for det in self.detectors.values():
+                for rule in det.get('rules', []):
+                    if all(_OPS[op](features[feature], value) for feature, op, value in rule.get('when', [])):
+                        evidences.append(rule.get('evidence', '').format(**ctx))
+
+            result = DetectionResult(process_id=fm.pids[j], process_name=fm.context[j]['name'])
+            result.total_score = float(scores['total'][j])
+            result.confidence = float(scores['confidence'][j])
+            result.details = {f'{name}_score': float(scores[name][j]) for name in self.detectors}
+            if 'ml' in scores:
+                ml_score = float(scores['ml'][j])
+                result.details['ml_score'] = ml_score
+                if ml_score >= 0.5:
+                    evidences.append(f"ML模型判定挖矿概率: {ml_score:.2f}")
+            result.evidences = evidences
+            result.status = "SUSPICIOUS"
+            results.append(result)
+        return results
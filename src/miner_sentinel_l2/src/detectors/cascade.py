@@ -0,0 +1,105 @@
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class StageOutput(NamedTuple):
+    score: float
+    confidence: float
+    evidences: List[str]
+
+
+class DetectorStage:
+    """级联中的一个检测器阶段：run(target) 返回 StageOutput"""
+
+    def __init__(self, name: str, weight: float, run: Callable[[Any], StageOutput]):
+        self.name = name
+        self.weight = weight
+        self.run = run
+
+
+class CascadeOutcome:
+    """一次级联执行的结果"""
+
+    def __init__(self):
+        self.outputs: Dict[str, StageOutput] = {}
+        self.skipped: List[str] = []
+        self.total_score = 0.0
+        self.confidence = 0.0
+        self.early_exit: Optional[str] = None  # None / "below" / "above" / "deadline"
+
+
+class DetectorCascade:
+    """按实测成本排序的检测器级联，可提前退出
+
+    每个阶段结束后计算剩余阶段（得分上限为 1.0）还能贡献的最大分数：
+      - 当前分数 + 剩余最大分数 < 阈值：不可能达到可疑阈值，提前判定为正常
+      - 当前分数 >= 阈值：已确定达到可疑阈值，提前判定为可疑
+    各检测器的耗时以指数滑动平均记录，阶段按 单位权重成本（耗时/权重）升序执行，
+    尚未测量的阶段排在最前以尽快获得成本数据。
+    给定 deadline（time.monotonic）时，到期后不再启动新的阶段，已有得分作为部分结果返回。
+    """
+
+    def __init__(self, stages: List[DetectorStage], threshold: float = 0.5,
+                 early_exit: bool = True, cost_alpha: float = 0.2):
+        self.stages = stages
+        self.threshold = threshold
+        self.early_exit = early_exit
+        self.cost_alpha = cost_alpha
+        self.costs: Dict[str, float] = {}
+        self.exit_counts = {'below': 0, 'above': 0, 'deadline': 0, 'complete': 0}
+
+    def ordered_stages(self) -> List[DetectorStage]:
+        def key(stage: DetectorStage) -> Tuple[int, float]:
+            cost = self.costs.get(stage.name)
+            if cost is None:
+                return 0, 0.0
+            return 1, cost / stage.weight if stage.weight > 0 else float('inf')
+        return sorted(self.stages, key=key)
+
+    def record_cost(self, name: str, elapsed: float):
+        previous = self.costs.get(name)
+        if previous is None:
+            self.costs[name] = elapsed
+        else:
+            self.costs[name] = previous + self.cost_alpha * (elapsed - previous)
+
+    def run(self, target: Any, threshold: Optional[float] = None,
+            precomputed: Optional[Dict[str, StageOutput]] = None,
+            deadline: Optional[float] = None) -> CascadeOutcome:
+        """precomputed 中已有结果的阶段（如同组代表进程的共享检测结果）不再执行，排在最前参与提前退出判断"""
+        threshold = self.threshold if threshold is None else threshold
+        precomputed = precomputed or {}
+        outcome = CascadeOutcome()
+        stages = self.ordered_stages()
+        if precomputed:
+            stages.sort(key=lambda stage: stage.name not in precomputed)
+        remaining = sum(stage.weight for stage in stages)
+
+        for i, stage in enumerate(stages):
+            output = precomputed.get(stage.name)
+            if output is None:
+                if deadline is not None and time.monotonic() >= deadline:
+                    outcome.early_exit = 'deadline'
+                    outcome.skipped = [s.name for s in stages[i:]]
+                    break
+                start = time.perf_counter()
+                output = stage.run(target)
+                self.record_cost(stage.name, time.perf_counter() - start)
+
+            outcome.outputs[stage.name] = output
+            outcome.total_score += output.score * stage.weight
+            outcome.confidence += output.confidence * stage.weight
+            remaining -= stage.weight
+
+            if not self.early_exit or i == len(stages) - 1:
+                continue
+            if outcome.total_score + remaining < threshold:
+                outcome.early_exit = 'below'
+            elif outcome.total_score >= threshold:
+                outcome.early_exit = 'above'
+            if outcome.early_exit:
+                outcome.skipped = [s.name for s in stages[i + 1:]]
+                break
+
+        self.exit_counts[outcome.early_exit or 'complete'] += 1
+        return outcome
@@ -1,58 +1,55 @@
 import psutil
-import time
-from typing import Dict, List
-from collections import deque
+from typing import Dict, List, Optional
 from ..models.detection_result import DetectionResult
-
-
-class CPUMiningDetector:
-    def __init__(self, history_size: int = 10):
+from ..utils.ioc_matcher import IOCMatcher, get_shared_matcher
+from ..utils.process_state_store import ProcessStateStore
+from ..utils.thread_profiler import ThreadCPUProfiler
+from .base import BaseDetector, FeatureContext, standalone_context
+
+
+class CPUMiningDetector(BaseDetector):
+    name = 'cpu'
+    features = ('stat', 'cpu_percent', 'uptime_seconds', 'name', 'thread_profile')
+    score_key = 'cpu_score'
+    confidence_key = 'cpu_confidence'
+    per_process = True
+
+    def __init__(self, history_size: int = 10, ioc_matcher: Optional[IOCMatcher] = None,
+                 state_store: Optional[ProcessStateStore] = None,
+                 thread_profiler: Optional[ThreadCPUProfiler] = None):
         self.history_size = history_size
-        self.process_history = {}
-        self.mining_keywords = {'miner', 'xmrig', 'ccminer', 'ethminer', 'cpuminer'}
+        # 历史按 (pid, starttime) 存放在共享状态存储中，随进程退出被淘汰
+        self.state_store = state_store or ProcessStateStore(history_size=history_size)
+        self.ioc_matcher = ioc_matcher or get_shared_matcher()
+        # 线程级分布的判定阈值；线程数据本身通过 thread_profile 特征获取
+        self.thread_profiler = thread_profiler or ThreadCPUProfiler()
 
     def analyze_process(self, process: psutil.Process) -> Dict[str, float]:
         """分析单个进程的CPU模式"""
-        pid = process.pid
-        current_time = time.time()
+        return self.analyze(standalone_context(process.pid))
 
-        # 初始化历史记录
-        if pid not in self.process_history:
-            self.process_history[pid] = {
-                'cpu_samples': deque(maxlen=self.history_size),
-                'timestamps': deque(maxlen=self.history_size),
-                'start_time': current_time
-            }
-
-        history = self.process_history[pid]
+    def analyze(self, ctx: FeatureContext) -> Dict[str, float]:
+        stat = ctx.get('stat')
 
         # 记录当前CPU使用率
-        cpu_usage = process.cpu_percent(interval=0.1)
-        history['cpu_samples'].append(cpu_usage)
-        history['timestamps'].append(current_time)
+        cpu_usage = ctx.get('cpu_percent')
+        samples = self.state_store.ring((stat.pid, stat.starttime), 'cpu_samples')
+        samples.append(cpu_usage)
 
         # 计算特征
+        threads = ctx.get('thread_profile')
         features = {
             'cpu_usage_current': cpu_usage,
-            'cpu_usage_avg': self._calculate_avg(history['cpu_samples']),
-            'cpu_usage_std': self._calculate_std(history['cpu_samples']),
-            'cpu_usage_max': max(history['cpu_samples']) if history['cpu_samples'] else 0,
-            'process_uptime': current_time - history['start_time']
+            'cpu_usage_avg': samples.mean(),
+            'cpu_usage_std': samples.std(),
+            'cpu_usage_max': samples.max(),
+            'process_uptime': ctx.get('uptime_seconds'),
+            'threads': threads
         }
 
-        return self._calculate_score(features, process)
-
-    def _calculate_avg(self, samples: deque) -> float:
-        return sum(samples) / len(samples) if samples else 0
+        return self._calculate_score(features, ctx.get('name'))
 
-    def _calculate_std(self, samples: deque) -> float:
-        if len(samples) < 2:
-            return 0
-        mean = self._calculate_avg(samples)
-        variance = sum((x - mean) ** 2 for x in samples) / len(samples)
-        return variance ** 0.5
-
-    def _calculate_score(self, features: Dict, process: psutil.Process) -> Dict[str, float]:
+    def _calculate_score(self, features: Dict, process_name: str) -> Dict[str, float]:
         """计算CPU相关得分"""
         score = 0.0
         evidences = []
@@ -72,9 +69,15 @@ class CPUMiningDetector:
             score += 0.1
             evidences.append(f"长时间运行: {features['process_uptime'] / 3600:.1f}小时")
 
+        # 多个工作线程同时满载且 CPU 时间几乎一致（多线程矿工特征）
+        threads = features['threads']
+        if self.thread_profiler.is_uniform(threads):
+            score += 0.3
+            evidences.append(f"{threads.saturated}个线程满载且CPU时间均匀(离散系数{threads.cv:.2f})")
+
         # 进程名包含挖矿关键词
-        process_name = process.name().lower()
-        if any(keyword in process_name for keyword in self.mining_keywords):
+        process_name = process_name.lower()
+        if self.ioc_matcher.match_name(process_name).get('name_keyword'):
             score += 0.4
             evidences.append(f"进程名包含挖矿关键词: {process_name}")
 
@@ -0,0 +1,22 @@
+from typing import Dict
+from .base import BaseDetector, FeatureContext
+
+
+class EnvironConfigDetector(BaseDetector):
+    """环境变量与配置文件检测：命令行干净，但矿池地址、钱包藏在 environ 或 -c 指定的配置文件中"""
+
+    name = 'environ_config'
+    features = ('environ_config',)
+    score_key = 'environ_config_score'
+    confidence_key = 'environ_config_confidence'
+    default_weight = 0.3
+
+    def analyze(self, ctx: FeatureContext) -> Dict[str, float]:
+        result = ctx.get('environ_config')
+        if result is None or not result.evidences:
+            return {'environ_config_score': 0.0, 'environ_config_confidence': 0.0, 'evidences': []}
+        return {
+            'environ_config_score': result.score,
+            'environ_config_confidence': result.score * 0.85,
+            'evidences': list(result.evidences)
+        }
@@ -0,0 +1,22 @@
+from typing import Dict
+from .base import BaseDetector, FeatureContext
+
+
+class ExeIdentityDetector(BaseDetector):
+    """可执行文件哈希检测：SHA-256 命中已知挖矿程序集合时直接给出满分，不受进程改名影响"""
+
+    name = 'exe_identity'
+    features = ('exe_identity',)
+    score_key = 'exe_identity_score'
+    confidence_key = 'exe_identity_confidence'
+    default_weight = 0.5
+
+    def analyze(self, ctx: FeatureContext) -> Dict[str, float]:
+        identity = ctx.get('exe_identity')
+        if identity is None or identity.verdict != 'miner':
+            return {'exe_identity_score': 0.0, 'exe_identity_confidence': 0.0, 'evidences': []}
+        return {
+            'exe_identity_score': 1.0,
+            'exe_identity_confidence': 1.0,
+            'evidences': [f"可执行文件哈希命中已知挖矿程序: {identity.path} (sha256 {identity.sha256[:16]}...)"]
+        }
@@ -0,0 +1,22 @@
+from typing import Dict
+from .base import BaseDetector, FeatureContext
+
+
+class ExeSignatureDetector(BaseDetector):
+    """可执行文件静态签名检测：改名后的 XMRig 等矿工仍带有 RandomX 常量、Stratum 方法名、捐赠配置等字节串"""
+
+    name = 'exe_signature'
+    features = ('exe_signature',)
+    score_key = 'exe_signature_score'
+    confidence_key = 'exe_signature_confidence'
+    default_weight = 0.3
+
+    def analyze(self, ctx: FeatureContext) -> Dict[str, float]:
+        result = ctx.get('exe_signature')
+        if result is None or not result.rules:
+            return {'exe_signature_score': 0.0, 'exe_signature_confidence': 0.0, 'evidences': []}
+        return {
+            'exe_signature_score': result.score,
+            'exe_signature_confidence': result.score * 0.9,
+            'evidences': [f"可执行文件{evidence}" for evidence in result.evidences]
+        }
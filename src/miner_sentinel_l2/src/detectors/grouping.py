@@ -0,0 +1,78 @@
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .incremental import cmdline_hash
+from ..utils.procfs import exe_inode, read_cgroup
+
+
+# 分组键：(exe inode, cmdline 哈希, uid, cgroup)
+GroupKey = Tuple[int, int, int, str]
+
+
+def process_uid(pid: int) -> int:
+    try:
+        return os.stat(f'/proc/{pid}').st_uid
+    except OSError:
+        return -1
+
+
+class ProcessGroup:
+    """同一工作负载的一组进程（php-fpm / gunicorn worker 等）"""
+
+    def __init__(self, key: GroupKey, pids: List[int]):
+        self.key = key
+        self.representative = pids[0]
+        self.members = pids[1:]
+
+    def __len__(self):
+        return 1 + len(self.members)
+
+
+class ProcessGrouper:
+    """按 (exe inode, cmdline 哈希, uid, cgroup) 对候选进程分组
+
+    每组只对代表进程（CPU 最高的成员）运行开销大的共享检测器（网络、maps、可执行文件哈希等），
+    其余成员只运行逐进程的廉价检测器（CPU、上下文切换等）并复用代表进程的共享结果；
+    成员的逐进程得分明显高于代表进程时视为离群，单独做完整分析。
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.min_group_size = config.get('min_group_size', 2)
+        self.outlier_margin = config.get('outlier_margin', 0.3)
+        self.last_stats = {'groups': 0, 'grouped': 0, 'outliers': 0}
+
+    @staticmethod
+    def group_key(pid: int) -> GroupKey:
+        return exe_inode(pid), cmdline_hash(pid), process_uid(pid), read_cgroup(pid)
+
+    def group(self, pids: List[int], cpu_of: Callable[[int], float]) -> List[ProcessGroup]:
+        """返回分组列表，组的顺序按组内首个进程在 pids 中的位置；组内按 CPU 降序，代表进程在首位"""
+        if not self.enabled:
+            self.last_stats = {'groups': len(pids), 'grouped': 0, 'outliers': 0}
+            return [ProcessGroup((0, 0, -1, ''), [pid]) for pid in pids]
+
+        buckets: Dict[GroupKey, List[int]] = {}
+        for pid in pids:
+            buckets.setdefault(self.group_key(pid), []).append(pid)
+
+        groups = []
+        grouped = 0
+        for key, members in buckets.items():
+            if len(members) >= self.min_group_size:
+                members.sort(key=cpu_of, reverse=True)
+                groups.append(ProcessGroup(key, members))
+                grouped += len(members)
+            else:
+                groups.extend(ProcessGroup(key, [pid]) for pid in members)
+        self.last_stats = {'groups': len(groups), 'grouped': grouped, 'outliers': 0}
+        return groups
+
+    def is_outlier(self, outputs: Dict, reference: Dict, names: List[str]) -> bool:
+        """成员任一逐进程检测器得分比代表进程高出 outlier_margin 即为离群"""
+        for name in names:
+            if name in outputs and name in reference and \
+                    outputs[name].score >= reference[name].score + self.outlier_margin:
+                return True
+        return False
@@ -0,0 +1,148 @@
+import os
+from typing import Dict, List, NamedTuple, Optional
+
+from ..models.detection_result import DetectionResult
+from ..utils.procfs import CLOCK_TICKS, ProcessSnapshot, ProcStat, read_pid_max, read_stat, read_status
+
+
+class HiddenProcess(NamedTuple):
+    pid: int
+    stat: Optional[ProcStat]    # stat 也无法读取时为 None（/proc/[pid] 被挂载覆盖等）
+    method: str                 # "kill" / "unreadable"
+
+
+class HiddenProcessDetector:
+    """检测对 /proc 目录遍历隐藏的进程
+
+    挖矿木马常配合用户态 rootkit（LD_PRELOAD 劫持 readdir）把自身从 /proc 列表中过滤掉，
+    ps / psutil / 本扫描器的快照都看不到它。两项检查：
+      - PID 空间扫描：对快照目录遍历没有列出的每个 PID 调用 kill(pid, 0)，存在的再直接打开
+        /proc/[pid]/status 读取 Tgid 区分线程与进程；目录中列出但 stat 无法读取（/proc/[pid] 被挂载覆盖）同样上报。
+        pid_max 超过 max_pids_per_round 时每轮扫描其中一段，多轮轮转覆盖整个 PID 空间。
+      - CPU 记账对账：两次快照间 /proc/stat 的 user+nice+system 增量减去所有可见进程
+        utime+stime（及已回收子进程 cutime+cstime）增量，差值即无法归属到可见进程的 CPU；
+        连续 min_rounds 轮超标时上报，并在下一轮做完整 PID 空间扫描。
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.max_pids_per_round = config.get('max_pids_per_round', 131072)
+        self.min_unexplained_percent = config.get('min_unexplained_percent', 50.0)
+        self.min_unexplained_ratio = config.get('min_unexplained_ratio', 0.25)
+        self.min_rounds = config.get('min_rounds', 2)
+        self.cursor = 1
+        self.unexplained_rounds = 0
+        self.full_sweep = False
+        self.last_stats = {'swept': 0, 'hidden': 0, 'unexplained_percent': 0.0}
+
+    def _sweep_range(self, pid_max: int) -> range:
+        if self.full_sweep or pid_max <= self.max_pids_per_round:
+            self.full_sweep = False
+            return range(1, pid_max)
+        start = self.cursor
+        end = min(start + self.max_pids_per_round, pid_max)
+        self.cursor = end if end < pid_max else 1
+        return range(start, end)
+
+    def sweep(self, snapshot: ProcessSnapshot) -> List[HiddenProcess]:
+        listed = snapshot.listed
+        suspects = []
+        pids = self._sweep_range(read_pid_max())
+        kill = os.kill
+        for pid in pids:
+            if pid in listed:
+                continue
+            try:
+                kill(pid, 0)
+            except ProcessLookupError:
+                continue
+            except PermissionError:
+                pass
+            suspects.append(pid)
+
+        hidden = []
+        for pid in suspects:
+            # kill 对线程 ID 同样成功：Tgid 不同的是某个进程的线程，由其所属进程判定
+            tgid = read_status(pid).get('Tgid')
+            if tgid is not None and tgid != str(pid):
+                continue
+            stat = read_stat(pid)
+            if stat is None:
+                continue
+            # 排除扫描期间新创建的进程：必须在本轮快照之前已经存在
+            if stat.starttime / CLOCK_TICKS > snapshot.uptime:
+                continue
+            hidden.append(HiddenProcess(pid, stat, 'kill'))
+
+        # 目录中可见但 stat 无法读取且进程仍然存在
+        for pid in listed - set(snapshot.stats):
+            try:
+                kill(pid, 0)
+            except ProcessLookupError:
+                continue
+            except PermissionError:
+                pass
+            if read_stat(pid) is None and os.path.isdir(f'/proc/{pid}'):
+                hidden.append(HiddenProcess(pid, None, 'unreadable'))
+
+        # 复核：扫描结束时目录遍历仍然看不到（排除快照之后才出现在列表中的竞态）
+        relisted = set(int(name) for name in os.listdir('/proc') if name.isdigit())
+        hidden = [h for h in hidden if h.method == 'unreadable' or h.pid not in relisted]
+        self.last_stats['swept'] = len(pids)
+        self.last_stats['hidden'] = len(hidden)
+        return hidden
+
+    def unexplained_cpu(self, snapshot: ProcessSnapshot, previous: Optional[ProcessSnapshot]) -> Optional[float]:
+        """无法归属到可见进程的 CPU 使用率（单核 100%），缺少对账数据时返回 None"""
+        if previous is None or snapshot.busy_ticks is None or previous.busy_ticks is None:
+            return None
+        elapsed = snapshot.timestamp - previous.timestamp
+        busy = snapshot.busy_ticks - previous.busy_ticks
+        if elapsed <= 0 or busy <= 0:
+            return None
+
+        explained = 0
+        for pid, stat in snapshot.stats.items():
+            ticks = stat.utime + stat.stime
+            prev = previous.stats.get(pid)
+            if prev is not None and prev.starttime == stat.starttime:
+                ticks += stat.cutime + stat.cstime - prev.utime - prev.stime - prev.cutime - prev.cstime
+            explained += max(ticks, 0)
+
+        unexplained = busy - explained
+        if unexplained <= busy * self.min_unexplained_ratio:
+            return 0.0
+        return unexplained / CLOCK_TICKS / elapsed * 100
+
+    def check(self, snapshot: ProcessSnapshot, previous: Optional[ProcessSnapshot]) -> List[DetectionResult]:
+        """每轮 L2 扫描调用一次，返回隐藏进程的检测结果"""
+        if not self.enabled:
+            return []
+        results = []
+        for hidden in self.sweep(snapshot):
+            name = hidden.stat.comm if hidden.stat is not None else 'unknown'
+            result = DetectionResult(process_id=hidden.pid, process_name=name)
+            result.total_score = 0.9
+            result.confidence = 0.9
+            result.status = "SUSPICIOUS"
+            result.details = {'hidden_process_score': 1.0}
+            if hidden.method == 'kill':
+                result.evidences.append(f"进程对 /proc 目录遍历不可见，但 kill(0) 与直接读取 /proc/{hidden.pid}/stat 成功")
+            else:
+                result.evidences.append(f"/proc/{hidden.pid} 出现在目录中但内容不可读（可能被挂载覆盖）")
+            print(f"[L2] 发现隐藏进程: {name} (PID: {hidden.pid})")
+            results.append(result)
+
+        percent = self.unexplained_cpu(snapshot, previous)
+        self.last_stats['unexplained_percent'] = percent or 0.0
+        if percent is not None and percent >= self.min_unexplained_percent:
+            self.unexplained_rounds += 1
+            print(f"[L2] CPU 记账差异: {percent:.0f}% 的 CPU 时间无法归属到可见进程 "
+                  f"(连续{self.unexplained_rounds}轮)")
+            if self.unexplained_rounds >= self.min_rounds and not results:
+                # 无法归属的 CPU 持续存在但本段 PID 未发现隐藏进程：下一轮扫描整个 PID 空间
+                self.full_sweep = True
+        else:
+            self.unexplained_rounds = 0
+        return results
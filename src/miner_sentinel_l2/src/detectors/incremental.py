@@ -0,0 +1,98 @@
+import dataclasses
+import os
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+from ..models.detection_result import DetectionResult
+from ..utils.process_state_store import ProcessStateStore
+from ..utils.procfs import ProcessKey, exe_inode
+
+
+# 进程特征指纹：(exe inode, cmdline 哈希, 套接字集合哈希, CPU 档位)；不跟踪套接字时第三项为 0
+Fingerprint = Tuple[int, int, int, int]
+
+
+def socket_set_hash(pid: int) -> int:
+    """/proc/[pid]/fd 中 socket inode 集合的哈希，连接建立或关闭时会变化"""
+    fd_dir = f'/proc/{pid}/fd'
+    inodes = []
+    try:
+        for fd in os.listdir(fd_dir):
+            try:
+                target = os.readlink(f'{fd_dir}/{fd}')
+            except OSError:
+                continue
+            if target.startswith('socket:['):
+                inodes.append(target[8:-1])
+    except OSError:
+        return 0
+    inodes.sort()
+    return zlib.crc32(','.join(inodes).encode())
+
+
+def cmdline_hash(pid: int) -> int:
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return zlib.crc32(f.read())
+    except OSError:
+        return 0
+
+
+class IncrementalScanCache:
+    """增量扫描：按 (pid, starttime) 记住上一次的检测结果和特征指纹
+
+    指纹未变化的进程直接复用上一次的 DetectionResult，只有新进程或指纹变化的进程才重新分析；
+    距上次完整分析超过 max_age_seconds 的结果即使指纹未变也不再复用（指纹覆盖不到的变化，
+    如环境变量、配置文件内容、IOC 规则更新，最迟在这一时间后被重新检测）。
+    没有启用的检测器使用 connections 特征时（track_sockets 为 False），指纹不读取 fd 链接。
+    结果保存在共享的 ProcessStateStore 中，随进程退出一起被淘汰。
+    """
+
+    FINGERPRINT_ATTR = 'incremental_fingerprint'
+    RESULT_ATTR = 'incremental_result'
+    ANALYZED_ATTR = 'incremental_analyzed'
+
+    def __init__(self, state_store: ProcessStateStore, config: Optional[Dict] = None):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.cpu_band_width = config.get('cpu_band_width', 25)
+        self.max_age_seconds = config.get('max_age_seconds', 600)
+        self.track_sockets = True
+        self.state_store = state_store
+        self.stats = {'reused': 0, 'analyzed': 0, 'expired': 0}
+
+    def reset_stats(self):
+        self.stats = {'reused': 0, 'analyzed': 0, 'expired': 0}
+
+    def fingerprint(self, pid: int, cpu_percent: float) -> Fingerprint:
+        band = int(cpu_percent // self.cpu_band_width) if self.cpu_band_width > 0 else 0
+        sockets = socket_set_hash(pid) if self.track_sockets else 0
+        return exe_inode(pid), cmdline_hash(pid), sockets, band
+
+    def lookup(self, key: ProcessKey, fingerprint: Fingerprint) -> Optional[DetectionResult]:
+        """指纹与上次一致且结果未过期时返回上次结果的副本（时间戳更新为当前）"""
+        if not self.enabled:
+            return None
+        state = self.state_store.peek(key)
+        if state is None or state.attrs.get(self.FINGERPRINT_ATTR) != fingerprint:
+            return None
+        result = state.attrs.get(self.RESULT_ATTR)
+        if result is None:
+            return None
+        analyzed = state.attrs.get(self.ANALYZED_ATTR, 0.0)
+        if self.max_age_seconds > 0 and time.monotonic() - analyzed >= self.max_age_seconds:
+            self.stats['expired'] += 1
+            return None
+        self.stats['reused'] += 1
+        return dataclasses.replace(result, timestamp=time.time(),
+                                   details=dict(result.details), evidences=list(result.evidences))
+
+    def store(self, key: ProcessKey, fingerprint: Fingerprint, result: DetectionResult):
+        self.stats['analyzed'] += 1
+        if not self.enabled:
+            return
+        state = self.state_store.get(key)
+        state.attrs[self.FINGERPRINT_ATTR] = fingerprint
+        state.attrs[self.RESULT_ATTR] = result
+        state.attrs[self.ANALYZED_ATTR] = time.monotonic()
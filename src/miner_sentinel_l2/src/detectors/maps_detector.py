@@ -0,0 +1,44 @@
+from typing import Dict
+from .base import BaseDetector, FeatureContext
+
+
+class MapsRWXDetector(BaseDetector):
+    """基于 /proc/[pid]/maps 的内存布局检测，只读取几 KB 的 maps 文本，不读取进程内存"""
+
+    name = 'maps'
+    features = ('maps_profile',)
+    score_key = 'maps_score'
+    confidence_key = 'maps_confidence'
+    default_weight = 0.05
+
+    def analyze(self, ctx: FeatureContext) -> Dict[str, float]:
+        score = 0.0
+        evidences = []
+        profile = ctx.get('maps_profile')
+
+        # JIT 编译的挖矿代码
+        if profile.anon_rwx:
+            score += 0.4
+            evidences.append(f"存在可写可执行的匿名内存映射: {profile.anon_rwx}个")
+        elif profile.anon_exec:
+            score += 0.2
+            evidences.append(f"存在可执行的匿名内存映射: {profile.anon_exec}个")
+
+        # 无文件落地执行
+        if profile.hidden_exec:
+            score += 0.4
+            evidences.append(f"可执行代码来自memfd或已删除文件: {profile.hidden_exec}个映射")
+
+        # 数据集
+        if profile.hugepage:
+            score += 0.2
+            evidences.append(f"使用hugetlbfs大页映射: {profile.hugepage}个")
+        if profile.large_anon_rw:
+            score += 0.1
+            evidences.append(f"超大匿名可写映射: {profile.large_anon_mb:.0f}MB")
+
+        return {
+            'maps_score': min(score, 1.0),
+            'maps_confidence': score * 0.7,
+            'evidences': evidences
+        }
@@ -1,8 +1,15 @@
 import psutil
 from typing import Dict
+from .base import BaseDetector, FeatureContext, standalone_context
 
 
-class MemoryMiningDetector:
+class MemoryMiningDetector(BaseDetector):
+    name = 'memory'
+    features = ('memory_info',)
+    score_key = 'process_memory_score'
+    confidence_key = 'process_memory_confidence'
+    per_process = True
+
     def __init__(self):
         self.memory_threshold = 0.9  # 90%内存使用率
 
@@ -27,8 +34,11 @@ class MemoryMiningDetector:
 
     def analyze_process_memory(self, process: psutil.Process) -> Dict[str, float]:
         """分析单个进程的内存使用"""
+        return self.analyze(standalone_context(process.pid))
+
+    def analyze(self, ctx: FeatureContext) -> Dict[str, float]:
         try:
-            memory_info = process.memory_info()
+            memory_info = ctx.get('memory_info')
             memory_usage = memory_info.rss / (1024 * 1024)  # MB
 
             score = 0.0
@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .batch_scorer import FEATURE_NAMES, FeatureMatrix
+
+
+DEFAULT_MODEL_PATH = os.path.join(Path(__file__).parent.parent, 'models/ml_detector.npz')
+
+
+class MLMiningClassifier:
+    """基于逻辑回归的挖矿进程分类器
+
+    模型以扁平 NumPy 数组保存在 .npz 中（不使用 pickle）：
+      feature_names  特征名（与 batch_scorer.FEATURE_NAMES 对齐）
+      mean / scale   标准化参数
+      weights / bias 逻辑回归参数
+    推理直接作用于 特征 × 进程 矩阵，一次矩阵乘法完成所有候选进程的打分。
+    """
+
+    def __init__(self, model_path: Optional[str] = None):
+        self.model_path = model_path or DEFAULT_MODEL_PATH
+        self.feature_names: Tuple[str, ...] = FEATURE_NAMES
+        self.mean = np.zeros(len(FEATURE_NAMES))
+        self.scale = np.ones(len(FEATURE_NAMES))
+        self.weights = np.zeros(len(FEATURE_NAMES))
+        self.bias = 0.0
+        self.loaded = False
+
+        self._load_model()
+
+    def _load_model(self):
+        """加载模型；模型文件不存在时分类器保持未加载状态"""
+        if not os.path.exists(self.model_path):
+            print(f"ML模型文件未找到，ML检测器未启用: {self.model_path}")
+            return
+        try:
+            with np.load(self.model_path, allow_pickle=False) as data:
+                names = tuple(str(name) for name in data['feature_names'])
+                mean = data['mean'].astype(np.float64)
+                scale = data['scale'].astype(np.float64)
+                weights = data['weights'].astype(np.float64)
+                bias = float(data['bias'])
+        except (OSError, KeyError, ValueError) as e:
+            print(f"ML模型加载失败: {e}")
+            return
+
+        unknown = [name for name in names if name not in FEATURE_NAMES]
+        if unknown:
+            print(f"ML模型包含未知特征，ML检测器未启用: {unknown}")
+            return
+
+        # 按当前特征矩阵的行序重排；模型未使用的特征权重为 0
+        self.mean = np.zeros(len(FEATURE_NAMES))
+        self.scale = np.ones(len(FEATURE_NAMES))
+        self.weights = np.zeros(len(FEATURE_NAMES))
+        for i, name in enumerate(names):
+            j = FEATURE_NAMES.index(name)
+            self.mean[j] = mean[i]
+            self.scale[j] = scale[i] if scale[i] > 0 else 1.0
+            self.weights[j] = weights[i]
+        self.bias = bias
+        self.loaded = True
+        print(f"ML模型已加载: {self.model_path}")
+
+    def predict_proba(self, fm: FeatureMatrix) -> np.ndarray:
+        """对矩阵中所有进程做批量推理，返回挖矿概率向量"""
+        if not self.loaded or len(fm) == 0:
+            return np.zeros(len(fm))
+        # (w / scale) · x - w · (mean / scale) + b，避免为标准化复制整个矩阵
+        coef = self.weights / self.scale
+        logits = coef @ fm.values + (self.bias - float(coef @ self.mean))
+        return 1.0 / (1.0 + np.exp(-np.clip(logits, -50, 50)))
+
+    @staticmethod
+    def save_model(path: str, feature_names: List[str], mean: np.ndarray, scale: np.ndarray,
+                   weights: np.ndarray, bias: float):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, feature_names=np.array(feature_names), mean=mean, scale=scale,
+                 weights=weights, bias=np.array(bias))
+
+
+def train_logistic_regression(X: np.ndarray, y: np.ndarray, l2: float = 1e-3, lr: float = 0.5,
+                              epochs: int = 2000) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+    """批量梯度下降训练逻辑回归（按类别频率加权），X 形状为 样本 × 特征"""
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    Xs = (X - mean) / scale
+
+    n_pos = max(int(y.sum()), 1)
+    n_neg = max(len(y) - n_pos, 1)
+    sample_weight = np.where(y > 0, len(y) / (2.0 * n_pos), len(y) / (2.0 * n_neg))
+
+    weights = np.zeros(X.shape[1])
+    bias = 0.0
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-np.clip(Xs @ weights + bias, -50, 50)))
+        err = (p - y) * sample_weight
+        weights -= lr * (Xs.T @ err / len(y) + l2 * weights)
+        bias -= lr * float(err.mean())
+    return mean, scale, weights, bias
+
+
+def load_labelled_export(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """读取带标签的扫描导出（JSONL，每行 {"features": {...}, "label": 0/1}）"""
+    rows, labels = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get('label') is None:
+                continue
+            features = record['features']
+            rows.append([float(features.get(name, 0.0)) for name in FEATURE_NAMES])
+            labels.append(1.0 if record['label'] else 0.0)
+    return np.array(rows, dtype=np.float64).reshape(-1, len(FEATURE_NAMES)), np.array(labels)
+
+
+def export_scan(output: str, interval: float = 1.0):
+    """导出当前主机所有用户态进程的特征，label 置空，人工标注后用于训练"""
+    from ..utils.ioc_matcher import IOCMatcher
+    from ..utils.process_state_store import ProcessStateStore
+    from ..utils.procfs import ProcessSnapshot, is_kernel_thread
+    from .batch_scorer import ProcessFeatureCollector
+    from .network_detector import NetworkMiningDetector
+
+    previous = ProcessSnapshot.take()
+    time.sleep(interval)
+    snapshot = ProcessSnapshot.take()
+    pids = [pid for pid, stat in snapshot.stats.items() if not is_kernel_thread(stat)]
+    collector = ProcessFeatureCollector(IOCMatcher(), ProcessStateStore(),
+                                        NetworkMiningDetector().known_mining_ports)
+    fm = collector.collect(snapshot, previous, pids)
+
+    with open(output, 'a', encoding='utf-8') as f:
+        for j, pid in enumerate(fm.pids):
+            record = {
+                'timestamp': snapshot.timestamp,
+                'pid': pid,
+                'name': fm.context[j]['name'],
+                'features': fm.column(j),
+                'label': None,
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    print(f"已导出 {len(fm)} 个进程特征到 {output}，请标注 label 后用于训练")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='L2 ML 检测器：导出扫描特征 / 训练模型')
+    sub = parser.add_subparsers(dest='command')
+
+    export_parser = sub.add_parser('export', help='导出当前主机进程特征（JSONL）')
+    export_parser.add_argument('--output', '-o', required=True, help='导出文件路径（追加写入）')
+    export_parser.add_argument('--interval', type=float, default=1.0, help='CPU 采样间隔（秒）')
+
+    train_parser = sub.add_parser('train', help='基于带标签的导出文件训练模型')
+    train_parser.add_argument('--data', '-d', required=True, nargs='+', help='带标签的 JSONL 文件')
+    train_parser.add_argument('--output', '-o', default=DEFAULT_MODEL_PATH, help='模型输出路径（.npz）')
+    train_parser.add_argument('--epochs', type=int, default=2000)
+    train_parser.add_argument('--l2', type=float, default=1e-3)
+
+    args = parser.parse_args()
+    if args.command == 'export':
+        export_scan(args.output, args.interval)
+    elif args.command == 'train':
+        parts = [load_labelled_export(path) for path in args.data]
+        X = np.vstack([p[0] for p in parts])
+        y = np.concatenate([p[1] for p in parts])
+        if len(y) == 0 or y.min() == y.max():
+            print("训练数据需要同时包含正负样本")
+            sys.exit(1)
+        mean, scale, weights, bias = train_logistic_regression(X, y, l2=args.l2, epochs=args.epochs)
+        MLMiningClassifier.save_model(args.output, list(FEATURE_NAMES), mean, scale, weights, bias)
+
+        classifier = MLMiningClassifier(args.output)
+        fm = FeatureMatrix(list(range(len(y))), X.T.copy(), [{}] * len(y))
+        accuracy = float(((classifier.predict_proba(fm) >= 0.5) == (y > 0)).mean())
+        print(f"训练完成: 样本{len(y)}个(正样本{int(y.sum())}个), 训练集准确率{accuracy:.3f}, 模型已保存到 {args.output}")
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
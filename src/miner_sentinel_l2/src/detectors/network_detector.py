@@ -2,16 +2,25 @@ import psutil
 import socket
 from typing import Dict, List
 from ..utils.system_utils import SystemUtils
+from .base import BaseDetector, FeatureContext, standalone_context
 
 
-class NetworkMiningDetector:
+class NetworkMiningDetector(BaseDetector):
+    name = 'network'
+    features = ('connections',)
+    score_key = 'network_score'
+    confidence_key = 'network_confidence'
+
     def __init__(self):
         self.utils = SystemUtils()
         self.known_mining_ports = {3333, 4444, 5555, 7777, 8888, 9999, 14444, 3032}
 
     def analyze_process(self, pid: int) -> Dict[str, float]:
         """分析进程的网络连接"""
-        connections = self.utils.get_network_connections(pid)
+        return self.analyze(standalone_context(pid))
+
+    def analyze(self, ctx: FeatureContext) -> Dict[str, float]:
+        connections = ctx.get('connections')
         score = 0.0
         evidences = []
 
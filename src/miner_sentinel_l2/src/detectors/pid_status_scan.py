@@ -1,101 +1,542 @@
 import os
-from typing import Dict, List, Optional
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from .cpu_detector import CPUMiningDetector
 from .network_detector import NetworkMiningDetector
 from .process_detector import ProcessBehaviorDetector
 from .memory_detector import MemoryMiningDetector
+from .sched_io_detector import SchedIODetector
+from .randomx_detector import RandomXFootprintDetector
+from .maps_detector import MapsRWXDetector
+from .exe_identity_detector import ExeIdentityDetector
+from .exe_signature_detector import ExeSignatureDetector
+from .environ_config_detector import EnvironConfigDetector
+from .prefilter import ProcessPreFilter
+from .topk_selector import TopKSelector
+from .incremental import IncrementalScanCache
+from .batch_scorer import BatchScorer, ProcessFeatureCollector
+from .grouping import ProcessGroup, ProcessGrouper
+from .process_tree_scorer import ProcessTreeScorer
+from .hidden_process import HiddenProcessDetector
+from .scan_budget import ScanBudget
+from .cascade import DetectorCascade, DetectorStage, StageOutput
+from .base import BaseDetector, FeatureContext, build_feature_graph, load_detector_plugin
 from ..models.detection_result import DetectionResult
 from ..utils.whitelist_manager import WhitelistManager
+from ..utils.ioc_matcher import IOCMatcher
+from ..utils.process_state_store import ProcessStateStore
+from ..utils.thread_profiler import ThreadCPUProfiler
+from ..utils.sched_io import SchedIOProfiler
+from ..utils.memory_maps import MapsAnalyzer
+from ..utils.exe_identity import ExeIdentityResolver
+from ..utils.exe_signatures import ExeSignatureScanner
+from ..utils.environ_config import EnvironConfigInspector
+from ..utils.procfs import ProcessSnapshot
+from ..utils.container import ContainerResolver
 import psutil
+import yaml
 from pathlib import Path
 
 # >>> NEW: 引入 ML 分类器
-#from .ml_detector import MLMiningClassifier
+from .ml_detector import MLMiningClassifier
 
 
 class PidStatusScanner:
     def __init__(self):
-        self.cpu_detector = CPUMiningDetector()
+        self.config = self._load_config()
+
+        # 所有检测器共享同一个 IOC 自动机，只在启动时构建一次
+        self.ioc_matcher = IOCMatcher()
+        # 检测器共享的进程状态存储，每轮扫描淘汰已退出进程
+        store_config = self.config.get('state_store', {})
+        self.state_store = ProcessStateStore(
+            history_size=store_config.get('history_size', 10),
+            max_memory_mb=store_config.get('max_memory_mb', 16),
+        )
+        # 线程级 CPU 分布：每进程读取的线程数有上限，上次采样保存在状态存储中
+        self.thread_profiler = ThreadCPUProfiler(self.config.get('thread_profiler', {}), self.state_store)
+        self.cpu_detector = CPUMiningDetector(
+            history_size=self.state_store.history_size,
+            ioc_matcher=self.ioc_matcher,
+            state_store=self.state_store,
+            thread_profiler=self.thread_profiler,
+        )
         self.network_detector = NetworkMiningDetector()
-        self.process_detector = ProcessBehaviorDetector()
+        self.process_detector = ProcessBehaviorDetector(ioc_matcher=self.ioc_matcher)
         self.memory_detector = MemoryMiningDetector()
+        self.sched_io_profiler = SchedIOProfiler(self.state_store)
+        self.sched_io_detector = SchedIODetector(self.config.get('sched_io', {}))
+        self.randomx_detector = RandomXFootprintDetector(self.config.get('randomx', {}))
+        # maps 分析同时为 L3 提供值得读取的内存区域排序
+        self.maps_analyzer = MapsAnalyzer(self.config.get('maps', {}))
+        self.maps_detector = MapsRWXDetector()
+        # 可执行文件身份：按 (dev, inode, size, mtime) 缓存 SHA-256，缓存跨重启保留
+        self.exe_identity = ExeIdentityResolver(self.config.get('exe_identity', {}))
+        self.exe_identity_detector = ExeIdentityDetector()
+        # 可执行文件静态签名：整个文件一次多模式扫描，结果按 inode 缓存
+        self.exe_signatures = ExeSignatureScanner(self.config.get('exe_signature', {}))
+        self.exe_signature_detector = ExeSignatureDetector()
+        # 环境变量与配置文件：有上限的读取，配置文件按 inode 每轮只读取一次
+        self.environ_inspector = EnvironConfigInspector(self.config.get('environ_config', {}), self.ioc_matcher)
+        self.environ_config_detector = EnvironConfigDetector()
         self.whitelist_manager = WhitelistManager(os.path.join(Path(__file__).parent.parent, 'config/pid_whitelist.yaml'))
+        # 预过滤：基于批量 /proc/*/stat 快照，按白名单配置的 options 丢弃大部分进程
+        self.prefilter = ProcessPreFilter(self.whitelist_manager.options)
+        # Top-K：只有 CPU 消耗靠前和命中 IOC 的进程进入深度分析
+        self.selector = TopKSelector(self.config.get('selection', {}), self.ioc_matcher)
+        # 增量扫描：指纹未变化的进程复用上一轮结果
+        self.incremental = IncrementalScanCache(self.state_store, self.config.get('incremental', {}))
+        # 进程分组：同构工作进程只对代表进程运行共享检测器
+        self.grouper = ProcessGrouper(self.config.get('grouping', {}))
+        # 容器归属：cgroup / 容器 ID / 命名空间按 cgroup 缓存，其他网络命名空间的套接字表每轮读取一次
+        self.container_resolver = ContainerResolver(self.config.get('container', {}))
+        # 时间预算：全局截止时间 + 每个进程的软预算与硬超时，未完成的进程延后到下一轮优先分析
+        self.scan_budget = ScanBudget(self.config.get('scan_budget', {}))
+        self.last_coverage: Dict[str, float] = {}
+        self.snapshot: Optional[ProcessSnapshot] = None
+        self.previous_snapshot: Optional[ProcessSnapshot] = None
+        # 进程事件分诊：新 exec 的进程只运行轻量检测器，可疑时在下一轮扫描中强制深度分析
+        events_config = self.config.get('proc_events', {})
+        self.triage_detectors = events_config.get('triage_detectors', ['process', 'exe_identity', 'exe_signature',
+                                                                         'environ_config'])
+        self.triage_threshold = events_config.get('triage_threshold', 0.2)
+        self.pending_pids: Set[int] = set()
 
-        # 检测器权重配置
+        # 检测器权重配置（可在 l2_scanner.yaml 中覆盖）
         self.weights = {
             'cpu': 0.35,
             'network': 0.30,
-            'process': 0.25,
+            'process': 0.30,
             'memory': 0.10,
         }
+        self.weights.update(self.config.get('weights', {}))
+        self.suspicious_threshold = self.config.get('suspicious_threshold', 0.5)
+        # 进程树 / 会话整体打分：负载分散到多个子进程时按子树聚合
+        self.tree_scorer = ProcessTreeScorer(self.config.get('process_tree', {}), self.suspicious_threshold)
+        # 对 /proc 目录遍历隐藏的进程：PID 空间扫描 + CPU 记账对账
+        self.hidden_detector = HiddenProcessDetector(self.config.get('hidden_process', {}))
+        self.hidden_results: List[DetectionResult] = []
+
+        # 特征图：每个进程的特征在一轮扫描内只采集一次，且只采集已启用检测器声明的特征
+        self.feature_graph = build_feature_graph()
+        self.feature_graph.register('cpu_percent', lambda ctx: self._cpu_percent(ctx.get('stat')))
+        self.feature_graph.register('connections', lambda ctx: self.container_resolver.connections(ctx.pid))
+        self.feature_graph.register('thread_profile', lambda ctx: self.thread_profiler.profile(ctx.get('stat')))
+        self.feature_graph.register('maps_profile', lambda ctx: self.maps_analyzer.analyze(ctx.pid))
+        self.feature_graph.register('exe_identity', lambda ctx: self.exe_identity.resolve(ctx.pid))
+        self.feature_graph.register('exe_signature', lambda ctx: self.exe_signatures.scan_pid(ctx.pid))
+        self.feature_graph.register('environ_config', lambda ctx: self.environ_inspector.inspect(
+            ctx.pid, ctx.get('cmdline')))
+        self.feature_graph.register('sched_io', lambda ctx: self.sched_io_profiler.profile(
+            ctx.get('stat'), ctx.get('thread_profile').busiest_tid))
+
+        # 检测器级联：按实测成本排序，无法再改变结论时提前退出
+        cascade_config = self.config.get('cascade', {})
+        self.cascade = DetectorCascade(
+            [],
+            threshold=self.suspicious_threshold,
+            early_exit=cascade_config.get('enabled', True),
+            cost_alpha=cascade_config.get('cost_alpha', 0.2),
+        )
+        self.detectors: Dict[str, BaseDetector] = {}
+        for detector in (self.cpu_detector, self.network_detector, self.process_detector, self.memory_detector,
+                         self.sched_io_detector, self.randomx_detector, self.maps_detector,
+                         self.exe_identity_detector, self.exe_signature_detector, self.environ_config_detector):
+            self.register_detector(detector)
+        for spec in self.config.get('detector_plugins', []) or []:
+            try:
+                self.register_detector(load_detector_plugin(spec))
+            except Exception as e:
+                print(f"检测器插件加载失败 {spec}: {e}")
+
+        # 批量评分：特征矩阵 + 向量化规则
+        self.batch_scorer = BatchScorer(self.config.get('batch_scoring', {}), self.weights)
+        self.feature_collector = ProcessFeatureCollector(
+            self.ioc_matcher, self.state_store, self.network_detector.known_mining_ports, self.container_resolver,
+            self.thread_profiler, lambda stat: self.feature_graph.context(stat.pid).get('thread_profile'))
+
+        # ML 检测器：每轮对所有候选进程做一次批量推理
+        ml_config = self.config.get('ml_detector', {})
+        self.ml_classifier = (MLMiningClassifier(ml_config.get('model_path') or None)
+                              if ml_config.get('enabled', True) else None)
+        self.ml_weight = ml_config.get('weight', 0.2)
+        self.ml_scores: Dict[int, float] = {}
+
+    def register_detector(self, detector: BaseDetector, weight: Optional[float] = None) -> bool:
+        """注册检测器插件；配置中 detectors.<name>.enabled 为 false 时不注册，返回是否已启用"""
+        if not self.config.get('detectors', {}).get(detector.name, {}).get('enabled', True):
+            print(f"[L2] 检测器 {detector.name} 已在配置中禁用")
+            return False
+        missing = self.feature_graph.missing(detector.features)
+        if missing:
+            raise ValueError(f"检测器 {detector.name} 依赖未注册的特征: {missing}")
+        if weight is None:
+            weight = self.weights.get(detector.name, detector.default_weight)
+        self.weights[detector.name] = weight
+        self.detectors[detector.name] = detector
+        self.cascade.stages = [stage for stage in self.cascade.stages if stage.name != detector.name]
+        self.cascade.stages.append(self._stage(detector, weight))
+        return True
+
+    @property
+    def required_features(self) -> List[str]:
+        """已启用检测器声明的全部特征"""
+        return sorted({name for detector in self.detectors.values() for name in detector.features})
+
+    @staticmethod
+    def _stage(detector: BaseDetector, weight: float) -> DetectorStage:
+        """把检测器的返回字典适配为级联阶段"""
+        def run(ctx: FeatureContext) -> StageOutput:
+            output = detector.analyze(ctx)
+            return StageOutput(output.get(detector.score_key, 0.0), output.get(detector.confidence_key, 0.0),
+                               output.get('evidences', []))
+        return DetectorStage(detector.name, weight, run)
+
+    def _load_config(self) -> Dict:
+        config_path = os.path.join(Path(__file__).parent.parent, 'config/l2_scanner.yaml')
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                return yaml.safe_load(f) or {}
+        except (FileNotFoundError, yaml.YAMLError) as e:
+            print(f"L2扫描配置加载失败，使用默认配置: {e}")
+            return {}
+
+    def select_candidates(self) -> List[int]:
+        """批量快照 + 预过滤 + Top-K 选择，返回需要进入检测器的 PID 列表"""
+        # 持久化上一轮新计算的可执行文件哈希
+        self.exe_identity.save()
+        # 白名单也可能在分诊线程的 is_whitelisted 中完成热加载，因此每轮都重新读取 options
+        self.whitelist_manager.reload_if_changed()
+        self.prefilter.options = self.whitelist_manager.options
+
+        snapshot, previous = self.prefilter.take_snapshot(commit=False)
+        budget = self.scan_budget
+        with budget.lock:
+            # 超时被放弃的候选选择线程不再覆盖快照：下一轮的 CPU 差值仍以最后一次成功提交的快照为基准
+            if budget.late():
+                return []
+            self.prefilter.previous_snapshot = snapshot
+            self.snapshot, self.previous_snapshot = snapshot, previous
+        self.incremental.reset_stats()
+        # 指纹只在有检测器使用网络连接时才包含套接字集合（避免每轮读取所有 fd 链接）
+        self.incremental.track_sockets = 'connections' in self.required_features
+        self.feature_graph.reset()
+        self.environ_inspector.reset()
+        candidates = self.prefilter.filter(snapshot, previous)
+        self.whitelist_manager.prune_cache(set(snapshot.stats))
+        self.state_store.evict_dead(snapshot.keys())
+        self.container_resolver.reset(snapshot.stats)
+        self.hidden_results = self.hidden_detector.check(snapshot, previous)
+
+        stats = self.prefilter.last_stats
+        print(f"[L2] 预过滤: 共{stats['total']}个进程, 内核线程{stats['kernel_thread']}个, "
+              f"短生命周期{stats['short_lived']}个, 低CPU{stats['low_cpu']}个, 剩余{stats['passed']}个")
+
+        selected = self.selector.select(snapshot, previous, candidates)
+        stats = self.selector.last_stats
+        if stats.get('mode_full'):
+            print(f"[L2] 全量深度扫描: {stats['selected']}个进程")
+        else:
+            print(f"[L2] Top-K选择: CPU前列{stats['by_process']}个, 进程树{stats['by_tree']}个, "
+                  f"IOC命中{stats['by_ioc']}个, 共{stats['selected']}个进入深度分析")
+
+        # 分诊判定可疑的进程不受预过滤和 Top-K 限制；待扫描集合在候选选择成功后由 _release_pending 清除
+        with budget.lock:
+            pending = set(self.pending_pids)
+        forced = [pid for pid in pending if pid in snapshot and pid not in selected]
+        if forced:
+            print(f"[L2] 分诊可疑进程{len(forced)}个强制进入深度分析: {forced}")
+        # 同一网络命名空间（容器）的进程相邻分析，命名空间级的读取（套接字表等）只做一次
+        ordered = self.container_resolver.order(forced + selected)
+        # 上一轮未完成（部分 / 延后）的进程排在新进程之前
+        return self.scan_budget.prioritize(ordered, snapshot.stats)
 
-    def analyze_process(self, pid: int) -> Optional[DetectionResult]:
-        """综合分析单个进程，如果进程在白名单中则返回None"""
+    def request_scan(self, pids):
+        """把进程加入下一轮扫描的深度分析列表（可在其他线程中调用）"""
+        with self.scan_budget.lock:
+            self.pending_pids.update(pids)
+
+    def _release_pending(self, candidates: List[int]):
+        """候选选择成功后，清除已进入本轮候选或已退出的待扫描进程；超时的一轮不清除，留到下一轮"""
+        selected = set(candidates)
+        with self.scan_budget.lock:
+            self.pending_pids = {pid for pid in self.pending_pids
+                                 if pid not in selected and pid in self.snapshot}
+
+    def triage(self, pid: int) -> Optional[DetectionResult]:
+        """对新 exec 的进程做轻量检测，只运行 triage_detectors 中的检测器
+
+        在事件线程中调用：使用独立的特征上下文，不写入本轮扫描的特征缓存。
+        得分按参与检测器的权重归一化，进程已退出或在白名单中时返回 None。
+        """
+        names = [name for name in self.triage_detectors if name in self.detectors]
         try:
-            process = psutil.Process(pid)
+            ctx = FeatureContext(pid, self.feature_graph)
+            if self.whitelist_manager.is_whitelisted(ctx.process):
+                return None
+            result = DetectionResult(process_id=pid, process_name=ctx.get('name'))
+            weighted = weights = 0.0
+            for name in names:
+                detector = self.detectors[name]
+                output = detector.analyze(ctx)
+                score = output.get(detector.score_key, 0.0)
+                weighted += score * self.weights[name]
+                weights += self.weights[name]
+                result.details[f'{name}_score'] = score
+                result.evidences.extend(output.get('evidences', []))
+        except (psutil.NoSuchProcess, psutil.AccessDenied, FileNotFoundError, ProcessLookupError):
+            return None
+
+        result.total_score = weighted / weights if weights > 0 else 0.0
+        result.confidence = result.total_score * 0.5
+        result.status = "SUSPICIOUS" if result.total_score >= self.triage_threshold else "NORMAL"
+        print(f"[L2分诊] 进程 {result.process_name} (PID: {pid}) 分诊得分: {result.total_score:.2f}, "
+              f"详细情况：{result.details}")
+        return result
+
+    def iter_scan(self) -> Iterator[DetectionResult]:
+        """流式扫描：每分析完一个进程立即产出结果，调用方无需等待整机扫描结束"""
+        for result in self._scan_results():
+            yield self.container_resolver.annotate(result)
+
+    def _scan_results(self) -> Iterator[DetectionResult]:
+        budget = self.scan_budget
+        budget.start_round()
+        if budget.blocked('prepare'):
+            print("[L2] 上一轮的候选选择仍阻塞在 /proc 读取中，跳过本轮扫描")
+            self._report_coverage()
+            return
+        # 快照、预过滤、分组同样读取 /proc（cmdline 等），在全局截止时间内完成
+        done, prepared = budget.call(self._prepare_scan, budget.remaining(), 'prepare')
+        if not done:
+            print("[L2] 候选选择在截止时间内未完成，本轮扫描结束")
+            self._report_coverage()
+            return
+        candidates, groups = prepared
+        self._release_pending(candidates)
+        budget.stats['candidates'] = len(candidates)
+        yield from self.hidden_results
+        if self.batch_scorer.enabled:
+            yield from self._budgeted_batch_scan(candidates)
+            self._report_coverage()
+            return
+        scores: Dict[int, float] = {}
+        reported = set()
+        for result in self._scan_groups(groups):
+            if result.scan_state != 'deferred':
+                scores[result.process_id] = result.total_score
+            if result.status == "SUSPICIOUS":
+                reported.add(result.process_id)
+            yield result
+
+        stats = self.grouper.last_stats
+        if stats['grouped']:
+            print(f"[L2] 进程分组: {stats['grouped']}个进程归入同构组, 共{stats['groups']}组, "
+                  f"离群成员{stats['outliers']}个")
+        self._report_coverage()
+        yield from self._score_trees(scores, self._collected_connections(scores), reported)
+
+    def _prepare_scan(self):
+        candidates = self.select_candidates()
+        if self.batch_scorer.enabled:
+            return candidates, []
+        self._predict_ml(candidates)
+        return candidates, self.grouper.group(candidates, self._snapshot_cpu)
+
+    def _report_coverage(self):
+        self.last_coverage = stats = self.scan_budget.finish()
+        if not self.scan_budget.enabled:
+            return
+        print(f"[L2] 扫描覆盖: 候选{stats['candidates']}个, 完整分析{stats['complete']}个, "
+              f"部分分析{stats['partial']}个, 延后{stats['deferred']}个, 超时{stats['timed_out']}次, "
+              f"用时{stats['elapsed']:.1f}秒")
+
+    def _scan_groups(self, groups: List[ProcessGroup]) -> Iterator[DetectionResult]:
+        for group in groups:
+            if not group.members:
+                result = self._budgeted_analyze(group.representative)
+                if result is not None:
+                    yield result
+                continue
+
+            # 代表进程完整分析，其共享检测器结果供组内其余成员复用
+            shared: Dict[str, StageOutput] = {}
+            result = self._budgeted_analyze(group.representative, collect=shared)
+            if result is not None:
+                yield result
+            for pid in group.members:
+                result = self._budgeted_analyze(pid, shared=shared or None)
+                if result is not None:
+                    yield result
+
+    def _budgeted_analyze(self, pid: int, shared: Optional[Dict[str, StageOutput]] = None,
+                          collect: Optional[Dict[str, StageOutput]] = None) -> Optional[DetectionResult]:
+        """在时间预算内分析进程：超过硬超时或截止时间已到时返回延后结果"""
+        budget = self.scan_budget
+        if budget.expired():
+            return self._deferred_result(pid, "本轮扫描截止时间已到")
+        if budget.saturated():
+            return self._deferred_result(pid, "阻塞的分析线程过多")
+        if budget.blocked(pid):
+            return self._deferred_result(pid, "上一次分析仍阻塞在 /proc 读取中")
+
+        deadline = budget.process_deadline()
+        done, result = budget.call(lambda: self.analyze_process(pid, shared, collect, deadline),
+                                   budget.process_timeout(), pid)
+        if not done:
+            return self._deferred_result(pid, f"分析超过{budget.process_timeout_seconds}秒未返回")
+        # 白名单等跳过的进程同样视为已覆盖
+        budget.record(pid, result.scan_state if result is not None else 'complete')
+        return result
+
+    def _deferred_result(self, pid: int, reason: str) -> DetectionResult:
+        stat = self.snapshot.get(pid) if self.snapshot is not None else None
+        result = DetectionResult(process_id=pid, process_name=stat.comm if stat is not None else "unknown")
+        result.scan_state = 'deferred'
+        result.evidences.append(f"未完成分析，延后到下一轮: {reason}")
+        self.scan_budget.record(pid, 'deferred', reason)
+        print(f"[L2] 进程 {result.process_name} (PID: {pid}) 延后到下一轮: {reason}")
+        return result
+
+    def _budgeted_batch_scan(self, candidates: List[int]) -> List[DetectionResult]:
+        budget = self.scan_budget
+        done, results = budget.call(lambda: self.batch_scan(candidates), budget.remaining(), 'batch')
+        if not done:
+            return [self._deferred_result(pid, "批量评分在截止时间内未完成") for pid in candidates]
+        budget.stats['complete'] += len(candidates)
+        for pid in candidates:
+            budget.deferred.pop(pid, None)
+        return results
+
+    def _collected_connections(self, pids) -> Dict[int, int]:
+        """本轮已采集过连接的进程的连接数；不为进程树额外采集"""
+        counts = {}
+        for pid in pids:
+            ctx = self.feature_graph.context(pid)
+            if ctx.has('connections'):
+                try:
+                    counts[pid] = len(ctx.get('connections'))
+                except Exception:
+                    pass
+        return counts
+
+    def _score_trees(self, scores: Dict[int, float], connections: Dict[int, int],
+                     reported) -> List[DetectionResult]:
+        if self.snapshot is None or not self.tree_scorer.enabled:
+            return []
+        results = self.tree_scorer.score(self.snapshot, self.previous_snapshot, scores, connections, reported)
+        stats = self.tree_scorer.last_stats
+        if results:
+            print(f"[L2] 进程树聚合: {stats['processes']}个进程, 可疑子树{stats['subtrees']}个, "
+                  f"可疑会话{stats['sessions']}个")
+        return results
+
+    def batch_scan(self, pids: List[int]) -> List[DetectionResult]:
+        """批量评分路径：一次采集特征矩阵并向量化打分，只返回达到阈值的进程"""
+        if self.snapshot is None:
+            self.snapshot = ProcessSnapshot.take()
+        pids = [pid for pid in pids if not self._is_whitelisted(pid)]
+        fm = self.feature_collector.collect(self.snapshot, self.previous_snapshot, pids)
+        scores = self.batch_scorer.score_matrix(fm)
+        if self._ml_active():
+            probs = self.ml_classifier.predict_proba(fm)
+            scores['ml'] = probs
+            scores['total'] = scores['total'] * (1 - self.ml_weight) + probs * self.ml_weight
+            scores['confidence'] = scores['confidence'] * (1 - self.ml_weight) + probs * self.ml_weight
+        results = self.batch_scorer.build_results(fm, scores)
+        self.incremental.stats['analyzed'] += len(fm)
+        print(f"[L2] 批量评分: {len(fm)}个进程, {len(results)}个达到可疑阈值")
+        connections = fm.row('connections')
+        results.extend(self._score_trees(
+            {pid: float(scores['total'][j]) for j, pid in enumerate(fm.pids)},
+            {pid: int(connections[j]) for j, pid in enumerate(fm.pids) if connections[j] > 0},
+            {result.process_id for result in results}))
+        return results
+
+    def batch_parity(self, pids: Optional[List[int]] = None,
+                     tolerance: float = 1e-6) -> Dict[int, Dict[str, Tuple[float, float]]]:
+        """核对批量规则与逐进程检测器的得分，返回不一致的项 {pid: {检测器名: (逐进程得分, 批量得分)}}
+
+        只核对批量规则表中有规则且已注册的检测器。先运行逐进程检测器（写入本轮 CPU 样本），
+        再以 record_history=False 采集特征矩阵，两条路径使用相同的 CPU 历史与线程采样。
+        """
+        if pids is None:
+            pids = self.select_candidates()
+        names = [name for name in self.batch_scorer.detectors if name in self.detectors]
+        expected: Dict[int, Dict[str, float]] = {}
+        for pid in pids:
+            ctx = self.feature_graph.context(pid)
+            try:
+                expected[pid] = {name: float(self.detectors[name].analyze(ctx).get(self.detectors[name].score_key, 0.0))
+                                 for name in names}
+            except (psutil.NoSuchProcess, psutil.AccessDenied, OSError):
+                continue
+        fm = self.feature_collector.collect(self.snapshot, self.previous_snapshot, list(expected), record_history=False)
+        scores = self.batch_scorer.score_matrix(fm)
+        mismatches = {}
+        for j, pid in enumerate(fm.pids):
+            diff = {name: (expected[pid][name], float(scores[name][j])) for name in names
+                    if abs(expected[pid][name] - float(scores[name][j])) > tolerance}
+            if diff:
+                mismatches[pid] = diff
+        return mismatches
+
+    def _ml_active(self) -> bool:
+        return self.ml_classifier is not None and self.ml_classifier.loaded and self.ml_weight > 0
+
+    def _predict_ml(self, pids: List[int]):
+        """逐进程路径下，先对全部候选进程做一次批量 ML 推理"""
+        self.ml_scores = {}
+        if not self._ml_active() or not pids:
+            return
+        if self.snapshot is None:
+            self.snapshot = ProcessSnapshot.take()
+        fm = self.feature_collector.collect(self.snapshot, self.previous_snapshot, pids, record_history=False)
+        probs = self.ml_classifier.predict_proba(fm)
+        self.ml_scores = {pid: float(p) for pid, p in zip(fm.pids, probs)}
+
+    def _is_whitelisted(self, pid: int) -> bool:
+        try:
+            return self.whitelist_manager.is_whitelisted(psutil.Process(pid))
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return True
+
+    def analyze_process(self, pid: int, shared: Optional[Dict[str, StageOutput]] = None,
+                        collect: Optional[Dict[str, StageOutput]] = None,
+                        deadline: Optional[float] = None) -> Optional[DetectionResult]:
+        """综合分析单个进程，如果进程在白名单中则返回None
+
+        shared: 同组代表进程的各检测器结果，共享检测器直接复用，只运行逐进程检测器
+        collect: 代表进程传入，收集本次全部检测器结果（含被提前退出跳过的共享检测器）
+        deadline: 软截止时间（time.monotonic），到期后不再启动新的检测器，返回部分结果
+        """
+        try:
+            ctx = self.feature_graph.context(pid)
 
             # 检查白名单
-            if self.whitelist_manager and self.whitelist_manager.is_whitelisted(process):
-                print(f"[L2] 进程 {process.name()} (PID: {pid}) 在白名单中，跳过检测")
+            if self.whitelist_manager and self.whitelist_manager.is_whitelisted(ctx.process):
+                print(f"[L2] 进程 {ctx.get('name')} (PID: {pid}) 在白名单中，跳过检测")
+                return None
+            if self._known_good(ctx):
+                print(f"[L2] 进程 {ctx.get('name')} (PID: {pid}) 可执行文件哈希属于已知正常程序，跳过检测")
                 return None
 
-            result = DetectionResult(process_id=pid, process_name=process.name())
-
-            # 各维度检测
-            cpu_result = self.cpu_detector.analyze_process(process)
-            network_result = self.network_detector.analyze_process(pid)
-            process_result = self.process_detector.analyze_process(pid)
-            memory_result = self.memory_detector.analyze_process_memory(process)
-
-            # 计算总分
-            total_score = (
-                    cpu_result['cpu_score'] * self.weights['cpu'] +
-                    network_result['network_score'] * self.weights['network'] +
-                    process_result['process_score'] * self.weights['process'] +
-                    memory_result['process_memory_score'] * self.weights['memory']
-            )
-
-            # 计算置信度
-            confidence = (
-                    cpu_result['cpu_confidence'] * self.weights['cpu'] +
-                    network_result['network_confidence'] * self.weights['network'] +
-                    process_result['process_confidence'] * self.weights['process'] +
-                    memory_result['process_memory_confidence'] * self.weights['memory']
-            )
-
-            # 收集证据
-            all_evidences = []
-            all_evidences.extend(cpu_result.get('evidences', []))
-            all_evidences.extend(network_result.get('evidences', []))
-            all_evidences.extend(process_result.get('evidences', []))
-            all_evidences.extend(memory_result.get('evidences', []))
-
-            # 设置结果
-            result.total_score = total_score
-            result.confidence = confidence
-            result.details = {
-                'cpu_score': cpu_result['cpu_score'],
-                'network_score': network_result['network_score'],
-                'process_score': process_result['process_score'],
-                'memory_score': memory_result['process_memory_score']
-            }
-            result.evidences = all_evidences
-            print(f"[L2] 进程 {process.name()} (PID: {pid}) 总分: {total_score:.2f}, 详细情况：{result.details}")
-
-            # # 确定状态
-            # if total_score >= 0.7:
-            #     result.status = "CONFIRMED"
-            # elif total_score >= 0.4:
-            #     result.status = "SUSPICIOUS"
-            # else:
-            #     result.status = "NORMAL"
-
-            # CONFIRM 还是交给第3层来确定
-            if total_score >= 0.5:
-                result.status = "SUSPICIOUS"
-            else:
-                result.status = "NORMAL"
+            # 增量扫描：指纹未变化时直接复用上一轮结果
+            stat = ctx.get('stat')
+            key = (pid, stat.starttime)
+            fingerprint = self.incremental.fingerprint(pid, ctx.get('cpu_percent'))
+            cached = self.incremental.lookup(key, fingerprint)
+            if cached is not None:
+                print(f"[L2] 进程 {cached.process_name} (PID: {pid}) 特征未变化，复用上轮结果 总分: {cached.total_score:.2f}")
+                return cached
 
+            result = self._run_detectors(ctx, shared, collect, deadline)
+            # 部分结果不缓存，下一轮重新完整分析
+            if result.scan_state == 'complete':
+                with self.scan_budget.lock:
+                    # 超时后才返回的分析结果已按延后处理，不写入增量缓存
+                    if not self.scan_budget.late():
+                        self.incremental.store(key, fingerprint, result)
             return result
 
         except Exception as e:
@@ -103,3 +544,120 @@ class PidStatusScanner:
             result = DetectionResult(process_id=pid, process_name="unknown")
             result.evidences.append(f"进程访问失败: {str(e)}")
             return result
+
+    def _exe_verdict(self, ctx: FeatureContext) -> Optional[str]:
+        if self.exe_identity_detector.name not in self.detectors:
+            return None
+        identity = ctx.get('exe_identity')
+        return identity.verdict if identity is not None else None
+
+    def _known_good(self, ctx: FeatureContext) -> bool:
+        return self._exe_verdict(ctx) == 'good'
+
+    def _cpu_percent(self, stat) -> float:
+        """基于本轮快照的 CPU 使用率，快照中没有该进程时按生命周期平均"""
+        if self.snapshot is None:
+            self.snapshot = ProcessSnapshot.take()
+        snap_stat = self.snapshot.get(stat.pid)
+        if snap_stat is not None and snap_stat.starttime == stat.starttime:
+            stat = snap_stat
+        return self.snapshot.cpu_percent(stat, self.previous_snapshot)
+
+    def _snapshot_cpu(self, pid: int) -> float:
+        stat = self.snapshot.get(pid) if self.snapshot is not None else None
+        return self.snapshot.cpu_percent(stat, self.previous_snapshot) if stat is not None else 0.0
+
+    def _shared_stage(self, name: str) -> bool:
+        return not self.detectors[name].per_process
+
+    def _run_cascade(self, ctx: FeatureContext, threshold: float,
+                     shared: Optional[Dict[str, StageOutput]] = None,
+                     collect: Optional[Dict[str, StageOutput]] = None,
+                     deadline: Optional[float] = None):
+        if shared is None:
+            outcome = self.cascade.run(ctx, threshold, deadline=deadline)
+        else:
+            precomputed = {name: output for name, output in shared.items() if self._shared_stage(name)}
+            outcome = self.cascade.run(ctx, threshold, precomputed, deadline)
+            # 逐进程得分明显高于代表进程：该成员与同组进程行为不同，不再复用共享结果
+            if self.grouper.is_outlier(outcome.outputs, shared,
+                                       [name for name in outcome.outputs if not self._shared_stage(name)]):
+                self.grouper.last_stats['outliers'] += 1
+                print(f"[L2] 进程 PID {ctx.pid} 与同组代表进程行为不一致，重新完整分析")
+                outcome = self.cascade.run(ctx, threshold, deadline=deadline)
+
+        if collect is not None:
+            collect.update(outcome.outputs)
+            # 补齐被提前退出跳过的共享检测器，组内成员不必各自运行；时间预算用完时由成员自行运行
+            for stage in self.cascade.stages:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                if stage.name not in collect and self._shared_stage(stage.name):
+                    collect[stage.name] = stage.run(ctx)
+        return outcome
+
+    def _run_detectors(self, ctx: FeatureContext, shared: Optional[Dict[str, StageOutput]] = None,
+                       collect: Optional[Dict[str, StageOutput]] = None,
+                       deadline: Optional[float] = None) -> DetectionResult:
+        """运行各维度检测器并汇总得分"""
+        pid = ctx.pid
+        result = DetectionResult(process_id=pid, process_name=ctx.get('name'))
+
+        # 按实测成本级联执行各维度检测，结论已确定时提前退出
+        ml_score = self.ml_scores.get(pid)
+        threshold = self.suspicious_threshold
+        if ml_score is not None and self.ml_weight < 1:
+            # 融合 ML 后总分 = 检测器总分 × (1 - w) + ML × w，换算出检测器总分需要达到的阈值
+            threshold = (threshold - ml_score * self.ml_weight) / (1 - self.ml_weight)
+        outcome = self._run_cascade(ctx, threshold, shared, collect, deadline)
+        total_score = outcome.total_score
+        confidence = outcome.confidence
+
+        # 按固定顺序收集各检测器得分与证据
+        all_evidences = []
+        result.details = {}
+        for stage in self.cascade.stages:
+            output = outcome.outputs.get(stage.name)
+            if output is None:
+                continue
+            result.details[f'{stage.name}_score'] = output.score
+            all_evidences.extend(output.evidences)
+
+        # 融合 ML 概率：其余检测器得分按 (1 - ml_weight) 缩放
+        if ml_score is not None:
+            total_score = total_score * (1 - self.ml_weight) + ml_score * self.ml_weight
+            confidence = confidence * (1 - self.ml_weight) + ml_score * self.ml_weight
+            result.details['ml_score'] = ml_score
+            if ml_score >= 0.5:
+                all_evidences.append(f"ML模型判定挖矿概率: {ml_score:.2f}")
+
+        # 设置结果
+        result.total_score = total_score
+        result.confidence = confidence
+        result.evidences = all_evidences
+        if outcome.early_exit == 'deadline':
+            result.scan_state = 'partial'
+            skipped = f", 超出时间预算未运行: {outcome.skipped}"
+        else:
+            skipped = f", 提前结束跳过: {outcome.skipped}" if outcome.skipped else ""
+        print(f"[L2] 进程 {result.process_name} (PID: {pid}) 总分: {total_score:.2f}, 详细情况：{result.details}{skipped}")
+
+        # # 确定状态
+        # if total_score >= 0.7:
+        #     result.status = "CONFIRMED"
+        # elif total_score >= 0.4:
+        #     result.status = "SUSPICIOUS"
+        # else:
+        #     result.status = "NORMAL"
+
+        # CONFIRM 还是交给第3层来确定
+        # 可执行文件哈希命中已知挖矿程序时不看加权总分（ML 融合、提前退出都不影响），直接判定为可疑
+        known_miner = self._exe_verdict(ctx) == 'miner'
+        if known_miner and 'exe_identity' not in outcome.outputs:
+            result.evidences.append("可执行文件哈希命中已知挖矿程序")
+        if total_score >= self.suspicious_threshold or known_miner:
+            result.status = "SUSPICIOUS"
+        else:
+            result.status = "NORMAL"
+
+        return result
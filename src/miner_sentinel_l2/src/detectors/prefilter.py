@@ -0,0 +1,71 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.procfs import ProcessSnapshot, is_kernel_thread
+
+
+class ProcessPreFilter:
+    """L2 检测器运行前的廉价预过滤
+
+    只使用一次批量 /proc/*/stat 快照，按 pid_whitelist.yaml 的 options 丢弃：
+      - 内核线程（PF_KTHREAD，对应 skip_system_processes）
+      - 存活时间不足 min_uptime_seconds 的进程（skip_short_lived_processes）
+      - CPU 使用率低于 cpu_threshold 的进程（skip_low_cpu_processes）
+    """
+
+    RULES = ('kernel_thread', 'short_lived', 'low_cpu')
+
+    def __init__(self, options: Optional[Dict] = None, cpu_sample_interval: float = 0.5):
+        self.options = options or {}
+        self.cpu_sample_interval = cpu_sample_interval
+        self.previous_snapshot: Optional[ProcessSnapshot] = None
+        self.last_stats: Dict[str, int] = {}
+
+    def take_snapshot(self, commit: bool = True) -> Tuple[ProcessSnapshot, Optional[ProcessSnapshot]]:
+        """返回 (当前快照, 用于计算 CPU 差值的上一次快照)
+
+        首次运行没有历史快照时，整体等待一个采样间隔再取第二次快照，
+        代替原先每个进程各自 cpu_percent(interval=0.1) 的阻塞采样。
+        commit=False 时不把当前快照记为下一次的 previous_snapshot，由调用方决定是否提交。
+        """
+        previous = self.previous_snapshot
+        if previous is None and self.options.get('skip_low_cpu_processes', False):
+            previous = ProcessSnapshot.take()
+        if previous is not None:
+            # 两次快照间隔过短时 ticks 精度不足，补足一个采样间隔
+            remaining = self.cpu_sample_interval - (time.time() - previous.timestamp)
+            if remaining > 0:
+                time.sleep(remaining)
+        current = ProcessSnapshot.take()
+        if commit:
+            self.previous_snapshot = current
+        return current, previous
+
+    def filter(self, snapshot: ProcessSnapshot,
+               previous: Optional[ProcessSnapshot] = None) -> List[int]:
+        """返回通过预过滤的 PID 列表，并在 last_stats 中记录各规则丢弃的数量"""
+        options = self.options
+        skip_system = options.get('skip_system_processes', False)
+        skip_short_lived = options.get('skip_short_lived_processes', False)
+        skip_low_cpu = options.get('skip_low_cpu_processes', False)
+        min_uptime = options.get('min_uptime_seconds', 300)
+        cpu_threshold = options.get('cpu_threshold', 1.0)
+
+        stats = {rule: 0 for rule in self.RULES}
+        candidates = []
+        for pid, stat in snapshot.stats.items():
+            if skip_system and is_kernel_thread(stat):
+                stats['kernel_thread'] += 1
+                continue
+            if skip_short_lived and snapshot.age_seconds(stat) < min_uptime:
+                stats['short_lived'] += 1
+                continue
+            if skip_low_cpu and snapshot.cpu_percent(stat, previous) < cpu_threshold:
+                stats['low_cpu'] += 1
+                continue
+            candidates.append(pid)
+
+        stats['total'] = len(snapshot)
+        stats['passed'] = len(candidates)
+        self.last_stats = stats
+        return candidates
@@ -1,58 +1,60 @@
 import psutil
-import re
-from typing import Dict, List
+from typing import Dict, List, Optional
 from ..utils.system_utils import SystemUtils
+from ..utils.ioc_matcher import IOCMatcher, get_shared_matcher
+from .base import BaseDetector, FeatureContext, standalone_context
 
 
-class ProcessBehaviorDetector:
-    def __init__(self):
+class ProcessBehaviorDetector(BaseDetector):
+    name = 'process'
+    features = ('name', 'cmdline', 'username')
+    score_key = 'process_score'
+    confidence_key = 'process_confidence'
+
+    def __init__(self, ioc_matcher: Optional[IOCMatcher] = None):
         self.utils = SystemUtils()
-        self.mining_keywords = {
-            'miner', 'xmrig', 'ccminer', 'ethminer', 'cpuminer',
-            'stratum', 'pool', 'mine', 'rig', 'crypto', 'coin'
-        }
-        self.suspicious_patterns = [
-            r'--pool=', r'--url=', r'--user=', r'--pass=',
-            r'stratum\+tcp://', r'stratum\+ssl://'
-        ]
+        # 关键词与可疑模式由共享的 IOC 自动机统一匹配（见 config/mining_iocs.yaml）
+        self.ioc_matcher = ioc_matcher or get_shared_matcher()
 
     def analyze_process(self, pid: int) -> Dict[str, float]:
         """分析进程行为特征"""
-        score = 0.0
-        evidences = []
-
         # 获取进程信息
         process = self.utils.get_process_info(pid)
         if not process:
             return {'process_score': 0, 'evidences': []}
+        return self.analyze(standalone_context(pid))
+
+    def analyze(self, ctx: FeatureContext) -> Dict[str, float]:
+        score = 0.0
+        evidences = []
 
         # 检查进程名
-        process_name = process.name().lower()
-        if any(keyword in process_name for keyword in self.mining_keywords):
+        process_name = ctx.get('name').lower()
+        if self.ioc_matcher.match_name(process_name).get('keyword'):
             score += 0.5
             evidences.append(f"可疑进程名: {process_name}")
 
         # 检查命令行参数
-        cmdline = ' '.join(self.utils.get_process_cmdline(pid)).lower()
+        cmdline = ' '.join(ctx.get('cmdline')).lower()
         if cmdline:
+            # 单次扫描同时得到关键词和模式命中
+            hits = self.ioc_matcher.match(cmdline)
+
             # 关键词匹配
-            keyword_matches = [kw for kw in self.mining_keywords if kw in cmdline]
+            keyword_matches = hits.get('keyword', [])
             if keyword_matches:
                 score += 0.4
                 evidences.append(f"命令行包含挖矿关键词: {', '.join(keyword_matches)}")
 
             # 模式匹配
-            pattern_matches = []
-            for pattern in self.suspicious_patterns:
-                if re.search(pattern, cmdline):
-                    pattern_matches.append(pattern)
+            pattern_matches = hits.get('pattern', [])
             if pattern_matches:
                 score += 0.3
                 evidences.append(f"命令行包含可疑模式: {', '.join(pattern_matches)}")
 
         # 检查运行权限和用户
         try:
-            if process.username() in ['root', 'system']:
+            if ctx.get('username') in ['root', 'system']:
                 score += 0.2
                 evidences.append("以高权限运行")
         except:
@@ -60,7 +62,7 @@ class ProcessBehaviorDetector:
 
         # 检查是否有GUI
         try:
-            if not process.windows():
+            if not ctx.process.windows():
                 score += 0.1
                 evidences.append("无GUI界面")
         except:
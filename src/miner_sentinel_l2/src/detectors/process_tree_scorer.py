@@ -0,0 +1,162 @@
+from typing import Dict, List, Optional, Set
+
+from ..models.detection_result import DetectionResult
+from ..utils.process_tree import ProcessTree
+from ..utils.procfs import ProcessSnapshot, is_kernel_thread
+
+
+class ProcessTreeScorer:
+    """把进程子树和会话作为整体打分
+
+    挖矿负载分散到多个子进程、或由包装脚本 / cron 任务启动时，单个进程都达不到可疑阈值。
+    基于本轮快照的 ppid 列一次构建进程树，自底向上 O(n) 聚合 CPU、连接数和各进程的 L2 得分：
+      子树得分 = 按 CPU 加权的平均得分 × (1 + cpu_boost × min(子树 CPU / saturation_cpu_percent, 1))
+                 + 连接集中在非计算进程时的 split_bonus
+    只统计至少包含 min_members 个已分析进程的子树；达到阈值且没有任何子节点的子树达到阈值的节点
+    即为最小可疑子树的根，作为罪魁进程上报。原父进程退出、工作进程被 init 收养时，按会话聚合兜底。
+    """
+
+    def __init__(self, config: Optional[Dict] = None, threshold: float = 0.5):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.threshold = config.get('threshold', threshold)
+        self.min_members = config.get('min_members', 2)
+        self.saturation_cpu_percent = config.get('saturation_cpu_percent', 200.0)
+        self.cpu_boost = config.get('cpu_boost', 0.5)
+        self.split_bonus = config.get('split_bonus', 0.1)
+        self.max_listed_members = config.get('max_listed_members', 5)
+        self.last_stats = {'processes': 0, 'subtrees': 0, 'sessions': 0}
+
+    @staticmethod
+    def _protected(snapshot: ProcessSnapshot, pid: int) -> bool:
+        """init、kthreadd 及内核线程不作为罪魁上报"""
+        stat = snapshot.get(pid)
+        return pid <= 2 or stat.ppid == 0 or is_kernel_thread(stat)
+
+    def _unit_score(self, units: Dict[str, Dict], key, connections: Dict[int, int]) -> float:
+        if units['members'].get(key, 0) < self.min_members:
+            return 0.0
+        # CPU 加权平均得分，权重加 1 使空闲成员也参与平均
+        mean = units['weighted'][key] / units['weight'][key]
+        cpu = units['cpu'][key]
+        cpu_factor = min(cpu / self.saturation_cpu_percent, 1.0) if self.saturation_cpu_percent > 0 else 0.0
+        score = mean * (1 + self.cpu_boost * cpu_factor)
+        busiest_pid = units['busiest'][key][1]
+        if units['connections'].get(key, 0) > 0 and connections.get(busiest_pid, 0) == 0:
+            score += self.split_bonus
+        return min(score, 1.0)
+
+    def score(self, snapshot: ProcessSnapshot, previous: Optional[ProcessSnapshot],
+              scores: Dict[int, float], connections: Optional[Dict[int, int]] = None,
+              reported: Optional[Set[int]] = None) -> List[DetectionResult]:
+        """scores 为本轮已分析进程的 L2 总分，connections 为已采集到的连接数；
+        reported 中的进程已单独上报，不再作为罪魁重复上报"""
+        if not self.enabled or not scores:
+            return []
+        connections = connections or {}
+        reported = reported or set()
+        tree = ProcessTree(snapshot)
+
+        cpu = {pid: snapshot.cpu_percent(stat, previous) for pid, stat in snapshot.stats.items()}
+        scored = [pid for pid in scores if pid in cpu]
+        columns = {
+            'members': {pid: 1 for pid in scored},
+            'weight': {pid: cpu[pid] + 1.0 for pid in scored},
+            'weighted': {pid: scores[pid] * (cpu[pid] + 1.0) for pid in scored},
+            'connections': connections,
+        }
+        subtree = {name: tree.aggregate(values) for name, values in columns.items()}
+        subtree['cpu'] = tree.aggregate(cpu, default=0.0)
+        subtree['busiest'] = tree.aggregate({pid: (value, pid) for pid, value in cpu.items()}, max, (0.0, 0))
+
+        flagged = {}
+        for pid, members in subtree['members'].items():
+            if members >= self.min_members and not self._protected(snapshot, pid):
+                score = self._unit_score(subtree, pid, connections)
+                if score >= self.threshold:
+                    flagged[pid] = score
+        # 最小可疑子树：任一子节点的子树已达到阈值时，由子节点上报
+        has_flagged_child = {tree.parent[pid] for pid in flagged}
+        culprits = [pid for pid in flagged if pid not in has_flagged_child]
+
+        results = [self._result(snapshot, tree, pid, flagged[pid], subtree, scores, '进程树')
+                   for pid in culprits if pid not in reported]
+
+        # 会话兜底：会话内的可疑进程没有被任何子树覆盖时，以会话首进程为罪魁
+        session = self._sessions(snapshot, columns, cpu, {snapshot.stats[pid].session for pid in culprits})
+        session_results = 0
+        for sid in session['members']:
+            score = self._unit_score(session, sid, connections)
+            if score < self.threshold:
+                continue
+            root = tree.session_root(sid)
+            if root is None or root in reported or self._protected(snapshot, root):
+                continue
+            results.append(self._result(snapshot, tree, root, score, session, scores, '会话', sid))
+            session_results += 1
+
+        self.last_stats = {'processes': len(tree), 'subtrees': len(results) - session_results,
+                           'sessions': session_results}
+        return results
+
+    @staticmethod
+    def _sessions(snapshot: ProcessSnapshot, columns: Dict[str, Dict], cpu: Dict[int, float],
+                  covered: Set[int]) -> Dict[str, Dict]:
+        """只聚合包含已分析进程且未被可疑子树覆盖的会话"""
+        sessions = {snapshot.stats[pid].session for pid in columns['members']} - covered
+        sessions.discard(0)
+        units: Dict[str, Dict] = {name: {} for name in list(columns) + ['cpu', 'busiest']}
+        for name, values in columns.items():
+            target = units[name]
+            for pid, value in values.items():
+                stat = snapshot.get(pid)
+                if stat is not None and stat.session in sessions:
+                    target[stat.session] = target.get(stat.session, 0) + value
+        for pid, stat in snapshot.stats.items():
+            if stat.session in sessions:
+                units['cpu'][stat.session] = units['cpu'].get(stat.session, 0.0) + cpu[pid]
+                units['busiest'][stat.session] = max(units['busiest'].get(stat.session, (0.0, 0)), (cpu[pid], pid))
+        return units
+
+    def _result(self, snapshot: ProcessSnapshot, tree: ProcessTree, root: int, score: float,
+                units: Dict[str, Dict], scores: Dict[int, float], kind: str,
+                key: Optional[int] = None) -> DetectionResult:
+        key = root if key is None else key
+        if kind == '会话':
+            members = [pid for pid in scores if pid in snapshot and snapshot.stats[pid].session == key]
+        else:
+            members = self._subtree_members(tree, root, scores)
+        members.sort(key=lambda pid: scores[pid], reverse=True)
+
+        stat = snapshot.get(root)
+        result = DetectionResult(process_id=root, process_name=stat.comm)
+        result.total_score = score
+        result.confidence = score * 0.8
+        result.status = "SUSPICIOUS"
+        result.related_pids = members
+        result.details = {
+            'tree_score': score,
+            'tree_cpu_percent': units['cpu'][key],
+            'tree_members': float(units['members'][key]),
+            'tree_connections': float(units['connections'].get(key, 0)),
+        }
+        listed = ', '.join(f"{snapshot.stats[pid].comm}({pid}) {scores[pid]:.2f}"
+                           for pid in members[:self.max_listed_members])
+        result.evidences = [
+            f"{kind} {stat.comm}(PID: {root}) 下{len(members)}个进程合计CPU {units['cpu'][key]:.0f}%, "
+            f"整体得分 {score:.2f}",
+            f"得分最高的成员: {listed}",
+        ]
+        print(f"[L2] {kind}整体可疑: {stat.comm} (PID: {root}) 得分: {score:.2f}, 成员: {members}")
+        return result
+
+    @staticmethod
+    def _subtree_members(tree: ProcessTree, root: int, scores: Dict[int, float]) -> List[int]:
+        members = []
+        stack = [root]
+        while stack:
+            pid = stack.pop()
+            if pid in scores:
+                members.append(pid)
+            stack.extend(tree.children.get(pid, ()))
+        return members
@@ -0,0 +1,88 @@
+from typing import Dict, Optional
+from .base import BaseDetector, FeatureContext
+
+
+class RandomXFootprintDetector(BaseDetector):
+    """RandomX 内存足迹检测
+
+    Monero 矿工使用 RandomX：完整模式分配约 2080MB 数据集 + 256MB 缓存，
+    轻量模式只有 256MB 缓存，每个挖矿线程另有 2MB 暂存区，且通常申请大页。
+    每个候选进程只读取一次 smaps_rollup（匿名内存、透明大页、hugetlb 汇总），
+    内核不支持 smaps_rollup 时退回 status 中的 RssAnon / HugetlbPages；
+    /proc/meminfo 作为全局特征每轮扫描只读取一次。
+    轻量模式的 256MB 左右与大量 JVM、浏览器、Node 进程的匿名内存重叠，
+    只有同时大量使用大页时才按轻量模式计分；容差也只覆盖矿工自身的少量额外内存。
+    """
+
+    name = 'randomx'
+    features = ('stat', 'smaps_rollup', 'proc_status', 'meminfo')
+    score_key = 'randomx_score'
+    confidence_key = 'randomx_confidence'
+    default_weight = 0.15
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.dataset_mb = config.get('dataset_mb', 2080)
+        self.cache_mb = config.get('cache_mb', 256)
+        self.scratchpad_mb = config.get('scratchpad_mb', 2)
+        self.tolerance_mb = config.get('tolerance_mb', 32)
+
+    def _footprint_kb(self, ctx: FeatureContext):
+        """返回 (匿名内存 kB, 透明大页 kB, hugetlb kB)；hugetlb 页不计入 Anonymous，透明大页是其一部分"""
+        rollup = ctx.get('smaps_rollup')
+        if rollup:
+            hugetlb = rollup.get('Private_Hugetlb', 0) + rollup.get('Shared_Hugetlb', 0)
+            return rollup.get('Anonymous', 0), rollup.get('AnonHugePages', 0), hugetlb
+        status = ctx.get('proc_status')
+        return _kb(status.get('RssAnon')), 0, _kb(status.get('HugetlbPages'))
+
+    def _matches(self, footprint_mb: float, base_mb: float, threads: int) -> bool:
+        upper = base_mb + self.scratchpad_mb * threads + self.tolerance_mb
+        return base_mb * 0.95 <= footprint_mb <= upper
+
+    def analyze(self, ctx: FeatureContext) -> Dict[str, float]:
+        score = 0.0
+        evidences = []
+
+        threads = ctx.get('stat').num_threads
+        anon_kb, thp_kb, hugetlb_kb = self._footprint_kb(ctx)
+        footprint_mb = (anon_kb + hugetlb_kb) / 1024
+        huge_mb = (thp_kb + hugetlb_kb) / 1024
+
+        # 大页覆盖了大部分匿名内存，且至少覆盖每个线程的暂存区
+        huge_pages = huge_mb >= self.scratchpad_mb * max(threads, 1) and huge_mb >= footprint_mb * 0.5
+
+        # 匿名内存与 RandomX 数据集 + 缓存（完整模式）或仅缓存（轻量模式，需大页佐证）吻合
+        if self._matches(footprint_mb, self.dataset_mb, threads) or \
+                self._matches(footprint_mb, self.dataset_mb + self.cache_mb, threads):
+            score += 0.5
+            evidences.append(f"匿名内存与RandomX数据集吻合: {footprint_mb:.0f}MB")
+        elif huge_pages and self._matches(footprint_mb, self.cache_mb, threads):
+            score += 0.3
+            evidences.append(f"匿名内存与RandomX轻量模式缓存吻合: {footprint_mb:.0f}MB")
+
+        if huge_pages:
+            score += 0.3
+            evidences.append(f"大量使用大页内存: {huge_mb:.0f}MB")
+
+        # 进程占用了系统 hugetlb 池已分配部分的多数
+        meminfo = ctx.get('meminfo')
+        pool_used_kb = (meminfo.get('HugePages_Total', 0) - meminfo.get('HugePages_Free', 0)) \
+            * meminfo.get('Hugepagesize', 2048)
+        if pool_used_kb > 0 and hugetlb_kb >= pool_used_kb * 0.5:
+            score += 0.2
+            evidences.append(f"占用系统大页池: {hugetlb_kb / 1024:.0f}MB / {pool_used_kb / 1024:.0f}MB")
+
+        return {
+            'randomx_score': min(score, 1.0),
+            'randomx_confidence': score * 0.85,
+            'evidences': evidences
+        }
+
+
+def _kb(value: Optional[str]) -> int:
+    """"123 kB" -> 123"""
+    try:
+        return int(value.split()[0]) if value else 0
+    except ValueError:
+        return 0
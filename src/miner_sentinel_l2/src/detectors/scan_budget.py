@@ -0,0 +1,133 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class ScanBudget:
+    """L2 扫描的时间预算
+
+    /proc 读取可能无限期阻塞：进程卡在 NFS 等 D 状态时，读取其 cmdline / environ / maps 会等待 mmap 锁；
+    套接字极多时 psutil.connections() 可能耗时数十秒。为保证 L2 延迟有上限：
+      - 全局截止时间 deadline_seconds：到期后剩余进程不再分析，作为延后结果产出；
+      - 每个进程的软预算 per_process_seconds：级联在预算用完后不再启动新的检测器，已有得分作为部分结果；
+      - 每个进程的硬超时 process_timeout_seconds：分析在守护线程中执行，超时后放弃等待
+        （阻塞在内核中的读取无法取消），进程作为延后结果产出。
+    部分与延后的进程下一轮排在新进程之前优先分析；仍未返回的进程在其线程结束前不再重试，
+    仍阻塞的线程达到 max_stuck_workers 时本轮剩余进程全部延后。
+
+    被放弃的线程返回后不得再改动共享状态：超时时在 lock 内把线程标记为 abandoned，
+    工作线程提交结果（增量缓存、快照等）前在 lock 内检查 late()，已放弃或不属于当前轮次（round）的结果直接丢弃。
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.deadline_seconds = config.get('deadline_seconds', 60.0)
+        self.per_process_seconds = config.get('per_process_seconds', 2.0)
+        self.process_timeout_seconds = config.get('process_timeout_seconds', 10.0)
+        self.max_stuck_workers = config.get('max_stuck_workers', 8)
+        self.started = time.monotonic()
+        self.deadline = self.started + self.deadline_seconds
+        self.deferred: Dict[int, str] = {}                  # PID -> 原因，按延后的先后顺序
+        self.stuck: Dict[Hashable, threading.Thread] = {}   # 超时后仍未返回的工作线程
+        self.stats = self._empty_stats()
+        self.round = 0
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, float]:
+        return {'candidates': 0, 'complete': 0, 'partial': 0, 'deferred': 0, 'timed_out': 0, 'elapsed': 0.0}
+
+    def start_round(self):
+        with self.lock:
+            self.round += 1
+        self.started = time.monotonic()
+        self.deadline = self.started + self.deadline_seconds
+        self.stats = self._empty_stats()
+        self.stuck = {key: thread for key, thread in self.stuck.items() if thread.is_alive()}
+
+    def remaining(self) -> float:
+        if not self.enabled:
+            return float('inf')
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.enabled and time.monotonic() >= self.deadline
+
+    def saturated(self) -> bool:
+        return self.enabled and sum(thread.is_alive() for thread in self.stuck.values()) >= self.max_stuck_workers
+
+    def blocked(self, key: Hashable) -> bool:
+        """该进程（或阶段）上一次的工作线程仍未返回"""
+        thread = self.stuck.get(key)
+        return thread is not None and thread.is_alive()
+
+    def late(self) -> bool:
+        """调用线程是否为已被放弃或属于之前轮次的工作线程；应在 lock 内调用，之后再提交结果"""
+        thread = threading.current_thread()
+        return getattr(thread, 'abandoned', False) or getattr(thread, 'scan_round', self.round) != self.round
+
+    def process_deadline(self) -> Optional[float]:
+        """单个进程的软截止时间（time.monotonic），不超过全局截止时间"""
+        if not self.enabled:
+            return None
+        return min(time.monotonic() + self.per_process_seconds, self.deadline)
+
+    def process_timeout(self) -> float:
+        return min(self.process_timeout_seconds, self.remaining())
+
+    def call(self, fn: Callable[[], Any], timeout: float, key: Hashable) -> Tuple[bool, Any]:
+        """在守护线程中执行 fn，timeout 秒内完成返回 (True, 结果)，否则返回 (False, None)
+
+        fn 抛出的异常在调用方线程中重新抛出。超时后线程被标记为 abandoned，其后续提交由 late() 拦截。
+        """
+        if not self.enabled:
+            return True, fn()
+        outcome: Dict[str, Any] = {}
+
+        def run():
+            try:
+                value = fn()
+            except BaseException as e:
+                with self.lock:
+                    outcome['error'] = e
+            else:
+                with self.lock:
+                    outcome['value'] = value
+
+        thread = threading.Thread(target=run, name=f'l2-budget-{key}', daemon=True)
+        thread.scan_round = self.round
+        thread.start()
+        thread.join(timeout)
+        with self.lock:
+            # 结果与放弃标记都在锁内判定：要么结果已交回，要么此后的提交全部被丢弃
+            if not outcome:
+                thread.abandoned = True
+                self.stuck[key] = thread
+                self.stats['timed_out'] += 1
+                return False, None
+        if 'error' in outcome:
+            raise outcome['error']
+        return True, outcome['value']
+
+    def prioritize(self, pids: List[int], alive: Iterable[int]) -> List[int]:
+        """上一轮部分分析或延后的进程排在最前（仍存活的才保留），其余保持原顺序"""
+        alive = set(alive)
+        self.deferred = {pid: reason for pid, reason in self.deferred.items() if pid in alive}
+        if not self.deferred:
+            return pids
+        carried = list(self.deferred)
+        carried_set = set(carried)
+        return carried + [pid for pid in pids if pid not in carried_set]
+
+    def record(self, pid: int, state: str, reason: str = ''):
+        """记录进程本轮的分析结果：complete / partial / deferred"""
+        self.stats[state] += 1
+        if state == 'complete':
+            self.deferred.pop(pid, None)
+        else:
+            self.deferred[pid] = reason or state
+
+    def finish(self) -> Dict[str, float]:
+        self.stats['elapsed'] = time.monotonic() - self.started
+        return dict(self.stats)
@@ -0,0 +1,58 @@
+from typing import Dict, Optional
+from .base import BaseDetector, FeatureContext
+
+
+class SchedIODetector(BaseDetector):
+    """调度与 I/O 行为检测
+
+    矿工的工作线程几乎从不主动让出 CPU（主动上下文切换极少、被动切换很多），
+    schedstat 运行时间持续接近满载，而读写字节数相对 CPU 时间可以忽略。
+    编译、数据库等正常的计算密集服务通常伴随大量 I/O 或阻塞等待。
+    """
+
+    name = 'sched_io'
+    features = ('cpu_percent', 'sched_io')
+    score_key = 'sched_io_score'
+    confidence_key = 'sched_io_confidence'
+    default_weight = 0.1
+    per_process = True
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.min_cpu_percent = config.get('min_cpu_percent', 30.0)
+        self.max_voluntary_ratio = config.get('max_voluntary_ratio', 0.05)
+        self.min_run_share = config.get('min_run_share', 0.8)
+        self.max_io_bytes_per_cpu_sec = config.get('max_io_bytes_per_cpu_sec', 64 * 1024)
+        self.min_nonvoluntary_rate = config.get('min_nonvoluntary_rate', 10.0)
+
+    def analyze(self, ctx: FeatureContext) -> Dict[str, float]:
+        score = 0.0
+        evidences = []
+
+        # 只对计算密集的进程有意义，空闲进程同样几乎没有 I/O
+        if ctx.get('cpu_percent') < self.min_cpu_percent:
+            return {'sched_io_score': 0.0, 'sched_io_confidence': 0.0, 'evidences': []}
+
+        profile = ctx.get('sched_io')
+
+        if profile.voluntary + profile.nonvoluntary > 0 and profile.voluntary_ratio < self.max_voluntary_ratio:
+            score += 0.3
+            evidences.append(f"几乎没有主动上下文切换: 主动{profile.voluntary}次/被动{profile.nonvoluntary}次")
+
+        if profile.nonvoluntary_rate > self.min_nonvoluntary_rate:
+            score += 0.1
+            evidences.append(f"频繁被调度器抢占: {profile.nonvoluntary_rate:.0f}次/秒")
+
+        if profile.run_share >= self.min_run_share:
+            score += 0.3
+            evidences.append(f"线程持续处于运行状态: {profile.run_share * 100:.0f}%")
+
+        if profile.io_bytes_per_cpu_sec < self.max_io_bytes_per_cpu_sec:
+            score += 0.3
+            evidences.append(f"CPU密集但几乎无I/O: {profile.io_bytes_per_cpu_sec / 1024:.1f}KB/CPU秒")
+
+        return {
+            'sched_io_score': min(score, 1.0),
+            'sched_io_confidence': score * 0.8,
+            'evidences': evidences
+        }
@@ -0,0 +1,126 @@
+import heapq
+import time
+from typing import Dict, List, Optional
+
+from ..utils.ioc_matcher import IOCMatcher
+from ..utils.procfs import ProcessSnapshot, is_kernel_thread, read_cmdline
+from ..utils.process_tree import ProcessTree
+
+
+class TopKSelector:
+    """按最近 CPU 时间增量挑选需要深度分析的进程
+
+    挖矿进程几乎总在 CPU 消耗排行的前列，因此只把以下进程送入检测器：
+      - CPU 时间增量最高的 top_k 个进程（且占比不低于 min_cpu_share）
+      - CPU 时间增量最高的 top_k_trees 棵进程树中占比达标的成员
+      - 进程名或命令行命中 force_select_tags 中 IOC 标签的进程（默认只有挖矿程序名与可疑模式，
+        rig / mine / pool 等通用关键词会命中 origin 之类的普通单词，不强制入选）
+    全量深度扫描按 full_scan_interval_seconds 周期执行，启动后的第一轮即为全量扫描。
+    """
+
+    def __init__(self, config: Optional[Dict] = None, ioc_matcher: Optional[IOCMatcher] = None):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.top_k = config.get('top_k', 20)
+        self.top_k_trees = config.get('top_k_trees', 5)
+        self.min_cpu_share = config.get('min_cpu_share', 0.02)
+        self.full_scan_interval = config.get('full_scan_interval_seconds', 3600)
+        self.force_select_tags = tuple(config.get('force_select_tags', ['name_keyword', 'pattern']))
+        self.ioc_matcher = ioc_matcher
+        self.last_full_scan = 0.0
+        self.last_stats: Dict[str, int] = {}
+
+    @staticmethod
+    def cpu_deltas(snapshot: ProcessSnapshot, previous: Optional[ProcessSnapshot]) -> Dict[int, int]:
+        """每个进程在两次快照间消耗的 CPU ticks；新进程按其全部 CPU 时间计"""
+        deltas = {}
+        for pid, stat in snapshot.stats.items():
+            ticks = stat.utime + stat.stime
+            prev = previous.get(pid) if previous is not None else None
+            if prev is not None and prev.starttime == stat.starttime:
+                ticks -= prev.utime + prev.stime
+            deltas[pid] = max(ticks, 0)
+        return deltas
+
+    @staticmethod
+    def subtree_totals(snapshot: ProcessSnapshot, deltas: Dict[int, int]) -> Dict[int, int]:
+        """沿 ppid 自底向上累加子树 CPU 增量，O(n)"""
+        return ProcessTree(snapshot).aggregate(deltas)
+
+    def select(self, snapshot: ProcessSnapshot, previous: Optional[ProcessSnapshot],
+               candidates: List[int]) -> List[int]:
+        """从预过滤后的候选中选出深度分析对象，保持 CPU 增量降序"""
+        now = time.time()
+        if not self.enabled or now - self.last_full_scan >= self.full_scan_interval:
+            self.last_full_scan = now
+            self.last_stats = {'mode_full': 1, 'selected': len(candidates)}
+            return candidates
+
+        deltas = self.cpu_deltas(snapshot, previous)
+        total = sum(deltas.values()) or 1
+        min_ticks = total * self.min_cpu_share
+        candidate_set = set(candidates)
+
+        # 单进程 Top-K
+        selected = {
+            pid for pid in heapq.nlargest(self.top_k, candidate_set, key=lambda p: deltas.get(p, 0))
+            if deltas.get(pid, 0) >= min_ticks
+        }
+        by_process = len(selected)
+
+        # 进程树 Top-K：以 init/kthreadd 的直接子进程为树根
+        tree_members = 0
+        if self.top_k_trees > 0:
+            totals = self.subtree_totals(snapshot, deltas)
+            roots = [pid for pid, stat in snapshot.stats.items()
+                     if stat.ppid in (0, 1, 2) and not is_kernel_thread(stat)]
+            top_roots = [pid for pid in heapq.nlargest(self.top_k_trees, roots, key=totals.get)
+                         if totals[pid] >= min_ticks]
+            root_of = self._root_lookup(snapshot, set(top_roots))
+            for pid in candidate_set - selected:
+                if root_of(pid) is not None and deltas.get(pid, 0) >= min_ticks:
+                    selected.add(pid)
+                    tree_members += 1
+
+        # 命中挖矿程序名或可疑模式的进程始终进入深度分析
+        ioc_hits = 0
+        if self.ioc_matcher is not None:
+            for pid in candidate_set - selected:
+                text = f"{snapshot.stats[pid].comm} {read_cmdline(pid)}"
+                hits = self.ioc_matcher.match(text)
+                if any(hits.get(tag) for tag in self.force_select_tags):
+                    selected.add(pid)
+                    ioc_hits += 1
+
+        self.last_stats = {
+            'mode_full': 0,
+            'by_process': by_process,
+            'by_tree': tree_members,
+            'by_ioc': ioc_hits,
+            'selected': len(selected),
+        }
+        return sorted(selected, key=lambda p: deltas.get(p, 0), reverse=True)
+
+    @staticmethod
+    def _root_lookup(snapshot: ProcessSnapshot, roots: set):
+        """返回 pid -> 所属选中树根 的查询函数（带记忆化，整体 O(n)）"""
+        memo: Dict[int, Optional[int]] = {}
+
+        def lookup(pid: int) -> Optional[int]:
+            path = []
+            current = pid
+            result = None
+            while current in snapshot.stats:
+                if current in memo:
+                    result = memo[current]
+                    break
+                path.append(current)
+                if current in roots:
+                    result = current
+                    break
+                current = snapshot.stats[current].ppid
+            for node in path:
+                memo[node] = result
+            return result
+
+        return lookup
@@ -13,6 +13,9 @@ class DetectionResult:
     status: str = "NORMAL"  # NORMAL, SUSPICIOUS, CONFIRMED
     details: Dict[str, float] = field(default_factory=dict)
     evidences: List[str] = field(default_factory=list)
+    related_pids: List[int] = field(default_factory=list)  # 进程树 / 会话整体上报时的成员进程
+    context: Dict[str, str] = field(default_factory=dict)  # 容器 / cgroup / 命名空间归属
+    scan_state: str = "complete"  # complete / partial（时间预算用完，部分检测器未运行）/ deferred（未分析，延后到下一轮）
 
     def to_dict(self):
         return {
@@ -23,5 +26,8 @@ class DetectionResult:
             "confidence": round(self.confidence, 2),
             "status": self.status,
             "details": {k: round(v, 3) for k, v in self.details.items()},
-            "evidences": self.evidences
+            "evidences": self.evidences,
+            "related_pids": self.related_pids,
+            "context": self.context,
+            "scan_state": self.scan_state
         }
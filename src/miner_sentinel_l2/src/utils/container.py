@@ -0,0 +1,277 @@
+import os
+import re
+import socket
+import struct
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import psutil
+
+from .procfs import read_cgroup, read_status
+from .system_utils import SystemUtils
+
+
+NAMESPACES = ('pid', 'net', 'mnt')
+
+# cgroup 路径中的容器标识：systemd 驱动（docker-<id>.scope）与 cgroupfs 驱动（/docker/<id>）
+_CONTAINER_PATTERNS = [
+    re.compile(r'(docker|cri-containerd|crio|libpod)-([0-9a-f]{64})\.scope'),
+    re.compile(r'/(docker|containerd|crio|libpod|actions_job)/([0-9a-f]{64})'),
+    re.compile(r'/(kubepods)[^\n]*?/pod[^/\n]+/([0-9a-f]{64})'),
+    re.compile(r'/(lxc)(?:\.payload)?[./]([^/\n]+)'),
+]
+_POD_PATTERN = re.compile(r'pod([0-9a-f]{8}[-_][0-9a-f]{4}[-_][0-9a-f]{4}[-_][0-9a-f]{4}[-_][0-9a-f]{12})')
+
+# include/net/tcp_states.h
+_TCP_STATES = {
+    '01': psutil.CONN_ESTABLISHED, '02': psutil.CONN_SYN_SENT, '03': psutil.CONN_SYN_RECV,
+    '04': psutil.CONN_FIN_WAIT1, '05': psutil.CONN_FIN_WAIT2, '06': psutil.CONN_TIME_WAIT,
+    '07': psutil.CONN_CLOSE, '08': psutil.CONN_CLOSE_WAIT, '09': psutil.CONN_LAST_ACK,
+    '0A': psutil.CONN_LISTEN, '0B': psutil.CONN_CLOSING,
+}
+_SOCKET_FILES = [
+    ('tcp', socket.AF_INET, socket.SOCK_STREAM), ('tcp6', socket.AF_INET6, socket.SOCK_STREAM),
+    ('udp', socket.AF_INET, socket.SOCK_DGRAM), ('udp6', socket.AF_INET6, socket.SOCK_DGRAM),
+]
+
+class Address(NamedTuple):
+    """套接字地址，字段与 psutil 连接的 laddr / raddr 一致"""
+    ip: str
+    port: int
+
+
+class Connection(NamedTuple):
+    """从命名空间套接字表还原的连接，字段与 psutil.Process.connections() 的返回值一致"""
+    fd: int
+    family: int
+    type: int
+    laddr: Address
+    raddr: tuple                # 没有对端时为空元组
+    status: str
+    pid: int
+
+
+# 套接字 inode -> (family, type, laddr, raddr, status)
+SocketTable = Dict[int, Tuple[int, int, Address, tuple, str]]
+
+
+class ContainerInfo(NamedTuple):
+    cgroup: str                 # 进程的 cgroup 路径（cgroup v1 时为全部层级）
+    container_id: str           # 无法从 cgroup 识别时为空
+    runtime: str                # docker / cri-containerd / crio / libpod / lxc ...
+    pod_uid: str                # Kubernetes Pod UID
+    pid_ns: int                 # 各命名空间的 inode 号
+    net_ns: int
+    mnt_ns: int
+
+
+def namespace_ids(pid) -> Dict[str, int]:
+    """读取 /proc/[pid]/ns/* 的 inode 号，无权限或进程已退出时为 0"""
+    ids = {}
+    for name in NAMESPACES:
+        try:
+            ids[name] = os.stat(f'/proc/{pid}/ns/{name}').st_ino
+        except OSError:
+            ids[name] = 0
+    return ids
+
+
+def _parse_address(text: str, family: int) -> Address:
+    host, port = text.split(':')
+    if family == socket.AF_INET:
+        packed = struct.pack('<I', int(host, 16))
+    else:
+        packed = struct.pack('<4I', *(int(host[i:i + 8], 16) for i in range(0, 32, 8)))
+    return Address(socket.inet_ntop(family, packed), int(port, 16))
+
+
+def read_socket_table(pid: int) -> SocketTable:
+    """读取 pid 所在网络命名空间的 /proc/[pid]/net/{tcp,tcp6,udp,udp6}"""
+    table: SocketTable = {}
+    for name, family, type_ in _SOCKET_FILES:
+        try:
+            with open(f'/proc/{pid}/net/{name}', 'r') as f:
+                f.readline()
+                for line in f:
+                    fields = line.split()
+                    inode = int(fields[9])
+                    if inode == 0:
+                        continue
+                    laddr = _parse_address(fields[1], family)
+                    raddr = _parse_address(fields[2], family)
+                    if raddr.port == 0:
+                        raddr = ()
+                    status = _TCP_STATES.get(fields[3], psutil.CONN_NONE) if type_ == socket.SOCK_STREAM \
+                        else psutil.CONN_NONE
+                    table[inode] = (family, type_, laddr, raddr, status)
+        except (OSError, ValueError, IndexError):
+            continue
+    return table
+
+
+def socket_inodes(pid: int) -> List[Tuple[int, int]]:
+    """进程打开的套接字：(fd, inode)"""
+    inodes = []
+    try:
+        fds = os.listdir(f'/proc/{pid}/fd')
+    except OSError:
+        return inodes
+    for fd in fds:
+        try:
+            target = os.readlink(f'/proc/{pid}/fd/{fd}')
+        except OSError:
+            continue
+        if target.startswith('socket:['):
+            inodes.append((int(fd), int(target[8:-1])))
+    return inodes
+
+
+class ContainerResolver:
+    """把进程归属到容器 / Pod 与命名空间
+
+    容器 ID、运行时与命名空间按 cgroup 缓存：同一容器的进程只在首次遇到时读取一次 ns 链接，
+    其余进程只需读取 /proc/[pid]/cgroup；容器内 PID（status 的 NSpid 最内层）按 cgroup 分表记录。
+    每轮开始时丢弃上一轮没有任何进程解析到的 cgroup，容器退出后缓存不会无限增长。
+    没有识别出容器 ID 的 cgroup（宿主机进程）不缓存命名空间，按进程读取，
+    以免 unshare 到独立命名空间的进程被归入同一 cgroup 的宿主机命名空间。
+
+    psutil 的连接信息只读取扫描器自身网络命名空间的 /proc/net/*，看不到其他容器的套接字；
+    其他命名空间的进程改为读取 /proc/[pid]/net/*，每个网络命名空间每轮只读取一次。
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.host_ns = namespace_ids('self')
+        self.by_cgroup: Dict[str, ContainerInfo] = {}
+        self.ns_pids: Dict[str, Dict[int, int]] = {}
+        self.socket_tables: Dict[int, SocketTable] = {}
+        self._pid_info: Dict[int, Optional[ContainerInfo]] = {}
+        self.seen_cgroups: Set[str] = set()      # 上一次 reset 之后解析到的 cgroup
+
+    def reset(self, alive: Iterable[int]):
+        """每轮扫描开始时调用：丢弃本轮的进程与套接字表缓存，清理上一轮没有出现的 cgroup 与已退出的进程"""
+        alive = set(alive)
+        self._pid_info = {}
+        self.socket_tables = {}
+        self.by_cgroup = {cgroup: info for cgroup, info in self.by_cgroup.items() if cgroup in self.seen_cgroups}
+        for cgroup in list(self.ns_pids):
+            pids = {pid: ns_pid for pid, ns_pid in self.ns_pids[cgroup].items() if pid in alive}
+            if pids and cgroup in self.seen_cgroups:
+                self.ns_pids[cgroup] = pids
+            else:
+                del self.ns_pids[cgroup]
+        self.seen_cgroups = set()
+
+    @staticmethod
+    def parse_cgroup(cgroup: str) -> Tuple[str, str, str]:
+        """从 cgroup 路径解析 (运行时, 容器 ID, Pod UID)"""
+        runtime = container_id = ''
+        for pattern in _CONTAINER_PATTERNS:
+            match = pattern.search(cgroup)
+            if match:
+                runtime, container_id = match.group(1), match.group(2)
+                break
+        pod = _POD_PATTERN.search(cgroup)
+        return runtime, container_id, pod.group(1).replace('_', '-') if pod else ''
+
+    def resolve(self, pid: int) -> Optional[ContainerInfo]:
+        if pid in self._pid_info:
+            return self._pid_info[pid]
+        info = None
+        cgroup = read_cgroup(pid)
+        if cgroup:
+            self.seen_cgroups.add(cgroup)
+            info = self.by_cgroup.get(cgroup)
+            if info is None:
+                runtime, container_id, pod_uid = self.parse_cgroup(cgroup)
+                ns = namespace_ids(pid)
+                info = ContainerInfo(cgroup, container_id, runtime, pod_uid, ns['pid'], ns['net'], ns['mnt'])
+                if container_id:
+                    self.by_cgroup[cgroup] = info
+        self._pid_info[pid] = info
+        return info
+
+    def ns_pid(self, pid: int) -> int:
+        """容器内看到的 PID；不在独立 PID 命名空间中时即为宿主机 PID"""
+        info = self.resolve(pid)
+        if info is None:
+            return pid
+        pids = self.ns_pids.setdefault(info.cgroup, {})
+        if pid not in pids:
+            nspid = read_status(pid).get('NSpid', '').split()
+            pids[pid] = int(nspid[-1]) if nspid else pid
+        return pids[pid]
+
+    def in_container(self, info: Optional[ContainerInfo]) -> bool:
+        if info is None:
+            return False
+        # 命名空间无法读取（inode 为 0）时只依据容器 ID 判断
+        return bool(info.container_id) or info.pid_ns not in (0, self.host_ns['pid']) \
+            or info.net_ns not in (0, self.host_ns['net'])
+
+    def order(self, pids: Iterable[int]) -> List[int]:
+        """按网络命名空间聚集，命名空间之间保持首个进程的先后顺序，同一命名空间内保持原顺序"""
+        if not self.enabled:
+            return list(pids)
+        buckets: Dict[int, List[int]] = {}
+        for pid in pids:
+            info = self.resolve(pid)
+            buckets.setdefault(info.net_ns if info is not None else 0, []).append(pid)
+        return [pid for members in buckets.values() for pid in members]
+
+    def foreign_netns(self, pid: int) -> bool:
+        info = self.resolve(pid) if self.enabled else None
+        return info is not None and info.net_ns not in (0, self.host_ns['net'])
+
+    def socket_table(self, pid: int) -> SocketTable:
+        net_ns = self.resolve(pid).net_ns
+        table = self.socket_tables.get(net_ns)
+        if table is None:
+            table = self.socket_tables[net_ns] = read_socket_table(pid)
+        return table
+
+    def connections(self, pid: int) -> List:
+        """进程的网络连接，格式与 psutil 一致；扫描器网络命名空间之外的进程从其命名空间的套接字表读取"""
+        if not self.foreign_netns(pid):
+            return SystemUtils.get_network_connections(pid)
+        table = self.socket_table(pid)
+        connections = []
+        for fd, inode in socket_inodes(pid):
+            entry = table.get(inode)
+            if entry is not None:
+                family, type_, laddr, raddr, status = entry
+                connections.append(Connection(fd, family, type_, laddr, raddr, status, pid))
+        return connections
+
+    def context(self, pid: int) -> Dict[str, str]:
+        """检测结果中附带的归属信息；宿主机进程只记录 cgroup"""
+        info = self.resolve(pid) if self.enabled else None
+        if info is None:
+            return {}
+        # 优先取统一层级（0::）的路径；混合模式下统一层级常为根，改取第一个非根的 v1 层级
+        paths = sorted((not line.startswith('0::'), line.split(':', 2)[-1]) for line in info.cgroup.splitlines())
+        context = {'cgroup': next((path for _, path in paths if path != '/'), '/')}
+        if not self.in_container(info):
+            return context
+        context.update({
+            'container_id': info.container_id,
+            'runtime': info.runtime,
+            'pod_uid': info.pod_uid,
+            'pid_ns': str(info.pid_ns),
+            'net_ns': str(info.net_ns),
+            'mnt_ns': str(info.mnt_ns),
+            'ns_pid': str(self.ns_pid(pid)),
+        })
+        return {key: value for key, value in context.items() if value and value != '0'}
+
+    def annotate(self, result):
+        """为检测结果附加容器归属，容器内进程追加一条证据"""
+        if not self.enabled or result.context:
+            return result
+        result.context = self.context(result.process_id)
+        if 'ns_pid' in result.context:
+            owner = result.context.get('container_id', '')[:12] or f"netns {result.context.get('net_ns')}"
+            runtime = result.context.get('runtime')
+            result.evidences.append(f"进程位于容器 {runtime + ':' if runtime else ''}{owner}"
+                                    f"（容器内 PID {result.context['ns_pid']}）")
+        return result
@@ -0,0 +1,189 @@
+import configparser
+import json
+import os
+import re
+import stat
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .ioc_matcher import IOCMatcher, get_shared_matcher
+
+
+# Monero 标准地址 / 集成地址（Base58，以 4 或 8 开头）
+_WALLET_PATTERN = re.compile(r'(?<![1-9A-Za-z])[48][0-9AB][1-9A-HJ-NP-Za-km-z]{93}(?:[1-9A-HJ-NP-Za-km-z]{11})?'
+                             r'(?![1-9A-Za-z])')
+# XMRig 风格配置中的矿池字段
+_POOL_KEYS = {'pools', 'pool', 'url', 'stratum'}
+_CREDENTIAL_KEYS = {'user', 'wallet', 'pass', 'rig-id', 'worker'}
+
+
+class InspectionResult(NamedTuple):
+    """环境变量与命令行引用的配置文件的检查结果"""
+    score: float
+    evidences: Tuple[str, ...]
+    files: Tuple[str, ...]          # 实际检查过的配置文件
+    truncated: bool                 # environ 或配置文件超过读取上限被截断
+
+
+def read_bounded(path: str, limit: int) -> Optional[Tuple[bytes, bool]]:
+    """最多读取 limit 字节的普通文件，返回 (内容, 是否截断)
+
+    以 O_NONBLOCK 打开并用 fstat 校验，命令行指向 FIFO 或设备文件时不会阻塞扫描。
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK | getattr(os, 'O_CLOEXEC', 0))
+    except OSError:
+        return None
+    try:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        chunks, size = [], 0
+        while size <= limit:
+            chunk = os.read(fd, limit + 1 - size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    data = b''.join(chunks)
+    return data[:limit], len(data) > limit
+
+
+class EnvironConfigInspector:
+    """检查进程环境变量与命令行引用的配置文件中的挖矿 IOC
+
+    矿工常把矿池地址、钱包放在环境变量或 -c / --config 指定的配置文件中，命令行本身看不到。
+    /proc/[pid]/environ 与配置文件都只读取前若干字节（max_environ_kb / max_config_kb），
+    使用与进程行为检测器相同的 IOC 自动机匹配；环境变量与配置文件中的通用关键词（pool、coin 等）
+    误报过多，只统计矿池 URL 等可疑模式、额外 IOC、进程名关键词与钱包地址。
+    配置文件按 (st_dev, st_ino, size, mtime) 缓存，每轮扫描开始时清空：
+    多个进程共享的配置文件每轮只读取与匹配一次。路径经 /proc/[pid]/root 与 /proc/[pid]/cwd 解析，
+    容器内进程引用的是容器文件系统中的文件。
+    """
+
+    def __init__(self, config: Optional[Dict] = None, ioc_matcher: Optional[IOCMatcher] = None):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.max_environ = int(config.get('max_environ_kb', 16) * 1024)
+        self.max_config = int(config.get('max_config_kb', 64) * 1024)
+        self.max_files = config.get('max_files_per_process', 2)
+        self.config_flags = set(config.get('config_flags', ['-c', '--config', '--config-file', '-config']))
+        self.config_suffixes = tuple(config.get('config_suffixes', ['.json', '.ini', '.conf', '.cfg']))
+        self.ioc_matcher = ioc_matcher or get_shared_matcher()
+        self.file_cache: Dict[tuple, Tuple[Tuple[str, ...], float, bool]] = {}
+        self.stats = {'environ': 0, 'files': 0, 'cached': 0}
+
+    def reset(self):
+        """每轮扫描开始时调用"""
+        self.file_cache = {}
+
+    def _match(self, text: str, source: str) -> Tuple[List[str], float]:
+        hits = self.ioc_matcher.match(text)
+        evidences = []
+        score = 0.0
+        if hits.get('pattern'):
+            score += 0.5
+            evidences.append(f"{source}包含可疑模式: {', '.join(hits['pattern'])}")
+        if hits.get('ioc'):
+            score += 0.5
+            evidences.append(f"{source}命中IOC: {', '.join(hits['ioc'][:5])}")
+        if hits.get('name_keyword'):
+            score += 0.3
+            evidences.append(f"{source}包含挖矿程序名: {', '.join(hits['name_keyword'])}")
+        wallets = _WALLET_PATTERN.findall(text)
+        if wallets:
+            score += 0.4
+            evidences.append(f"{source}包含门罗币钱包地址: {wallets[0][:12]}...")
+        return evidences, score
+
+    @staticmethod
+    def _structure(text: str, path: str) -> bool:
+        """配置文件是否具有矿池配置结构：JSON 中的 pools / url + user，或 ini 中同时包含 url 与 user 的节"""
+        if path.endswith('.json') or text.lstrip().startswith('{'):
+            try:
+                data = json.loads(text)
+            except ValueError:
+                return False
+            if not isinstance(data, dict):
+                return False
+            if isinstance(data.get('pools'), list):
+                return True
+            return bool(_POOL_KEYS & set(data)) and bool(_CREDENTIAL_KEYS & set(data))
+        parser = configparser.ConfigParser(strict=False, interpolation=None)
+        try:
+            parser.read_string(text)
+        except configparser.Error:
+            return False
+        for section in parser.sections():
+            keys = set(parser[section])
+            if _POOL_KEYS & keys and _CREDENTIAL_KEYS & keys:
+                return True
+        return False
+
+    def config_paths(self, cmdline: List[str]) -> List[str]:
+        """命令行中引用的配置文件：-c path、--config=path，以及以配置文件后缀结尾的参数"""
+        paths = []
+        for i, arg in enumerate(cmdline[1:], start=1):
+            flag, sep, value = arg.partition('=')
+            if sep and flag in self.config_flags:
+                paths.append(value)
+            elif arg in self.config_flags and i + 1 < len(cmdline):
+                paths.append(cmdline[i + 1])
+            elif arg.endswith(self.config_suffixes) and not arg.startswith('-'):
+                paths.append(arg)
+        return list(dict.fromkeys(p for p in paths if p))[:self.max_files]
+
+    def _inspect_file(self, pid: int, path: str) -> Optional[Tuple[Tuple[str, ...], float, bool]]:
+        resolved = f'/proc/{pid}/root{path}' if path.startswith('/') else f'/proc/{pid}/cwd/{path}'
+        try:
+            st = os.stat(resolved)
+        except OSError:
+            return None
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        cached = self.file_cache.get(key)
+        if cached is not None:
+            self.stats['cached'] += 1
+            return cached
+
+        read = read_bounded(resolved, self.max_config)
+        if read is None:
+            return None
+        data, truncated = read
+        text = data.decode('utf-8', errors='replace')
+        name = os.path.basename(path)
+        evidences, score = self._match(text, f"配置文件 {name} ")
+        if not truncated and self._structure(text, path):
+            score += 0.3
+            evidences.append(f"配置文件 {name} 具有矿池配置结构（pools / url + user）")
+        self.stats['files'] += 1
+        self.file_cache[key] = (tuple(evidences), score, truncated)
+        return self.file_cache[key]
+
+    def inspect(self, pid: int, cmdline: List[str]) -> Optional[InspectionResult]:
+        """检查进程的环境变量与配置文件，无法读取 environ（已退出 / 无权限）时返回 None"""
+        if not self.enabled:
+            return None
+        read = read_bounded(f'/proc/{pid}/environ', self.max_environ)
+        if read is None:
+            return None
+        data, truncated = read
+        self.stats['environ'] += 1
+        # 变量之间以 NUL 分隔，替换为换行避免跨变量拼接出伪命中
+        evidences, score = self._match(data.replace(b'\0', b'\n').decode('utf-8', errors='replace'), "环境变量")
+
+        files = []
+        for path in self.config_paths(cmdline):
+            inspected = self._inspect_file(pid, path)
+            if inspected is None:
+                continue
+            files.append(path)
+            file_evidences, file_score, file_truncated = inspected
+            evidences.extend(file_evidences)
+            score += file_score
+            truncated = truncated or file_truncated
+        if not evidences:
+            return InspectionResult(0.0, (), tuple(files), truncated)
+        return InspectionResult(min(score, 1.0), tuple(evidences), tuple(files), truncated)
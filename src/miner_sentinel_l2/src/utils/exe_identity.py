@@ -0,0 +1,173 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Set
+
+import yaml
+
+
+DEFAULT_HASHES_PATH = os.path.join(Path(__file__).parent.parent, 'config/exe_hashes.yaml')
+DEFAULT_CACHE_PATH = '/var/lib/miner-sentinel/exe_identity.json'
+
+# 流式哈希每次送入 SHA-256 的块大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ExeIdentity(NamedTuple):
+    """进程可执行文件的身份"""
+    path: str
+    dev: int
+    ino: int
+    size: int
+    mtime_ns: int
+    ctime_ns: int
+    sha256: Optional[str]     # 文件超过大小上限或无法读取时为 None
+    verdict: str              # "miner" / "good" / "unknown"
+
+    @property
+    def file_key(self) -> str:
+        return file_key(self.dev, self.ino, self.size, self.mtime_ns, self.ctime_ns)
+
+
+def file_key(dev: int, ino: int, size: int, mtime_ns: int, ctime_ns: int) -> str:
+    """哈希缓存键；ctime 无法通过 utimensat 回拨，文件被改写后即使 mtime 被还原键也会变化"""
+    return f"{dev}:{ino}:{size}:{mtime_ns}:{ctime_ns}"
+
+
+def sha256_file(path: str) -> str:
+    """mmap 后分块计算 SHA-256，不把整个文件读入 Python 对象"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mm)
+            try:
+                for offset in range(0, size, HASH_CHUNK_SIZE):
+                    digest.update(view[offset:offset + HASH_CHUNK_SIZE])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+class ExeIdentityResolver:
+    """解析 /proc/[pid]/exe 并按内容哈希识别可执行文件
+
+    哈希结果按 (st_dev, st_ino, size, mtime, ctime) 缓存：共享同一个二进制的大量进程只计算一次，
+    文件被替换或修改后键随之变化（改写后用 utimensat 还原 mtime 也会更新 ctime）。
+    缓存最多保留 max_cache_entries 项，超出时淘汰最久未使用的项，以 JSON 持久化，重启后无需重新计算。
+    分诊线程与扫描线程共用本对象，缓存的读写与保存前的复制都在锁内进行。
+    哈希与 config/exe_hashes.yaml 中的已知挖矿程序 / 已知正常程序集合比对。
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.cache_path = config.get('cache_path') or DEFAULT_CACHE_PATH
+        self.hashes_path = config.get('hashes_path') or DEFAULT_HASHES_PATH
+        self.max_size = config.get('max_size_mb', 512) * 1024 * 1024
+        self.max_cache_entries = config.get('max_cache_entries', 4096)
+        self.known_miner: Set[str] = set()
+        self.known_good: Set[str] = set()
+        self.cache: 'OrderedDict[str, Optional[str]]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.stats = {'hashed': 0, 'cached': 0}
+
+        self._load_hashes()
+        self._load_cache()
+
+    def _load_hashes(self):
+        try:
+            with open(self.hashes_path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f) or {}
+        except (FileNotFoundError, yaml.YAMLError) as e:
+            print(f"可执行文件哈希库加载失败: {e}")
+            return
+        self.known_miner = {str(h).lower() for h in data.get('known_miner', []) or []}
+        self.known_good = {str(h).lower() for h in data.get('known_good', []) or []}
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"可执行文件哈希缓存读取失败，将重新计算: {e}")
+            return
+        if not isinstance(data, dict):
+            return
+        # 旧版本的键不含 ctime，直接丢弃；文件中靠后的项较新，超出上限时保留最后的部分
+        entries = [(key, sha) for key, sha in data.items() if key.count(':') == 4]
+        self.cache = OrderedDict(entries[-self.max_cache_entries:] if self.max_cache_entries > 0 else [])
+
+    def _evict(self):
+        while len(self.cache) > self.max_cache_entries:
+            self.cache.popitem(last=False)
+
+    def save(self):
+        """有新增哈希时原子写回缓存文件"""
+        with self.lock:
+            if not self.dirty:
+                return
+            # 分诊线程可能同时插入新项：在锁内复制后再序列化
+            cache = dict(self.cache)
+            self.dirty = False
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            Path(self.cache_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            self.dirty = True
+            print(f"可执行文件哈希缓存保存失败: {e}")
+
+    def verdict(self, sha256: Optional[str]) -> str:
+        if sha256 in self.known_miner:
+            return 'miner'
+        if sha256 in self.known_good:
+            return 'good'
+        return 'unknown'
+
+    def resolve(self, pid: int) -> Optional[ExeIdentity]:
+        """返回进程可执行文件的身份，内核线程或无权限时返回 None"""
+        if not self.enabled:
+            return None
+        exe = f'/proc/{pid}/exe'
+        try:
+            st = os.stat(exe)
+            path = os.readlink(exe)
+        except OSError:
+            return None
+
+        key = file_key(st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+        with self.lock:
+            cached = key in self.cache
+            if cached:
+                sha = self.cache[key]
+                self.cache.move_to_end(key)
+                self.stats['cached'] += 1
+        if not cached:
+            sha = None
+            if st.st_size <= self.max_size:
+                # 通过 /proc/[pid]/exe 读取，文件已被删除或位于其他挂载命名空间时同样可用
+                try:
+                    sha = sha256_file(exe)
+                except (OSError, ValueError):
+                    return None
+            with self.lock:
+                self.cache[key] = sha
+                self._evict()
+                self.dirty = True
+                self.stats['hashed'] += 1
+        return ExeIdentity(path, st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns,
+                           sha, self.verdict(sha))
@@ -0,0 +1,171 @@
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+import yaml
+
+from .ioc_matcher import AhoCorasickAutomaton
+
+
+DEFAULT_SIGNATURES_PATH = os.path.join(Path(__file__).parent.parent, 'config/exe_signatures.yaml')
+
+
+class SignatureRule(NamedTuple):
+    name: str
+    description: str
+    score: float
+    min_matches: int
+    patterns: Tuple[bytes, ...]
+
+
+class SignatureResult(NamedTuple):
+    """一个可执行文件的签名扫描结果"""
+    rules: Tuple[str, ...]                  # 命中的规则名
+    score: float
+    evidences: Tuple[str, ...]
+    matched: int                            # 命中的不同模式数
+
+
+EMPTY_RESULT = SignatureResult((), 0.0, (), 0)
+
+
+def _decode_pattern(entry: Dict) -> Optional[bytes]:
+    """规则中的模式：{text: "..."} 为字面文本，{hex: "52 61 ..."} 为十六进制字节"""
+    if 'text' in entry:
+        return str(entry['text']).encode('utf-8')
+    if 'hex' in entry:
+        return bytes.fromhex(str(entry['hex']).replace(' ', ''))
+    return None
+
+
+class ExeSignatureScanner:
+    """可执行文件静态签名扫描
+
+    规则文件（config/exe_signatures.yaml）中所有规则的模式构建为一个 Aho-Corasick 自动机
+    （utils/ioc_matcher.py，与 IOC 匹配共用实现），报告包括部分重叠（如 cn/rx/0 中的 cn/r 与 rx/0）在内的全部命中。
+    纯 Python 自动机逐字节遍历整个文件过慢，因此先用合并后的 bytes 正则交替式在 mmap 上定位候选区域
+    （C 实现，文件内容不复制到 Python 对象），只把候选区域交给自动机：
+    交替式的匹配互不重叠，但任一模式的出现位置要么是某个匹配的起点、要么落在某个匹配内部，
+    所以每个匹配向后延伸“最长模式长度 - 1”字节的区域覆盖全部出现。
+    结果按 (st_dev, st_ino, size, mtime, ctime) 缓存，同一文件只扫描一次，因此可以对主机上出现的每个新可执行文件做扫描。
+    缓存最多保留 max_cache_entries 项，超出时淘汰最久未使用的项；分诊线程与扫描线程共用本对象，缓存读写在锁内进行。
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.rules_path = config.get('rules_path') or DEFAULT_SIGNATURES_PATH
+        self.max_size = config.get('max_size_mb', 256) * 1024 * 1024
+        self.max_cache_entries = config.get('max_cache_entries', 4096)
+        self.rules: List[SignatureRule] = []
+        self.pattern_rules: Dict[bytes, List[int]] = {}
+        self.regex: Optional[re.Pattern] = None
+        self.automaton = AhoCorasickAutomaton()
+        self.max_pattern = 0
+        self.cache: 'OrderedDict[Tuple[int, int, int, int, int], SignatureResult]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'scanned': 0, 'cached': 0, 'bytes': 0}
+
+        self._load_rules()
+
+    def _load_rules(self):
+        try:
+            with open(self.rules_path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f) or {}
+        except (FileNotFoundError, yaml.YAMLError) as e:
+            print(f"可执行文件签名规则加载失败: {e}")
+            return
+
+        for raw in data.get('rules', []) or []:
+            patterns = tuple(p for p in (_decode_pattern(entry) for entry in raw.get('strings', [])) if p)
+            if not patterns:
+                continue
+            self.rules.append(SignatureRule(
+                name=raw['name'],
+                description=raw.get('description', raw['name']),
+                score=float(raw.get('score', 0.0)),
+                min_matches=int(raw.get('min_matches', 1)),
+                patterns=patterns,
+            ))
+
+        for i, rule in enumerate(self.rules):
+            for pattern in rule.patterns:
+                self.pattern_rules.setdefault(pattern, []).append(i)
+        if self.pattern_rules:
+            # 长模式在前，交替式优先匹配最长的字面量
+            ordered = sorted(self.pattern_rules, key=len, reverse=True)
+            self.regex = re.compile(b'|'.join(re.escape(p) for p in ordered))
+            for pattern in ordered:
+                self.automaton.add(pattern, 'signature')
+            self.automaton.build()
+            self.max_pattern = len(ordered[0])
+
+    def _search(self, data) -> Set[bytes]:
+        """正则定位候选区域（相邻区域合并），自动机在区域内报告全部命中"""
+        found: Set[bytes] = set()
+        start = end = -1
+        for m in self.regex.finditer(data):
+            if m.start() >= end >= 0:
+                found |= self.automaton.search(data[start:end]).get('signature', set())
+                start = -1
+            if start < 0:
+                start = m.start()
+            end = max(end, m.end() + self.max_pattern - 1)
+        if start >= 0:
+            found |= self.automaton.search(data[start:end]).get('signature', set())
+        return found
+
+    def _evaluate(self, found: Set[bytes]) -> SignatureResult:
+        rules, evidences = [], []
+        score = 0.0
+        for rule in self.rules:
+            hits = [p for p in rule.patterns if p in found]
+            if len(hits) >= rule.min_matches:
+                rules.append(rule.name)
+                score += rule.score
+                shown = ', '.join(p.decode('utf-8', errors='replace') if p.isascii() else p.hex() for p in hits[:3])
+                evidences.append(f"{rule.description}: {shown}")
+        return SignatureResult(tuple(rules), min(score, 1.0), tuple(evidences), len(found))
+
+    def scan_file(self, path: str) -> Optional[SignatureResult]:
+        """扫描文件（可以是 /proc/[pid]/exe），无法读取时返回 None"""
+        if not self.enabled or self.regex is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        # ctime 无法用 utimensat 回拨：改写文件后还原 mtime 也不会命中旧结果
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.stats['cached'] += 1
+                return cached
+
+        result = EMPTY_RESULT
+        if 0 < st.st_size <= self.max_size:
+            try:
+                with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    result = self._evaluate(self._search(mm))
+            except (OSError, ValueError):
+                return None
+        with self.lock:
+            if 0 < st.st_size <= self.max_size:
+                self.stats['bytes'] += st.st_size
+            self.stats['scanned'] += 1
+            self.cache[key] = result
+            self._evict()
+        return result
+
+    def _evict(self):
+        while len(self.cache) > self.max_cache_entries:
+            self.cache.popitem(last=False)
+
+    def scan_pid(self, pid: int) -> Optional[SignatureResult]:
+        return self.scan_file(f'/proc/{pid}/exe')
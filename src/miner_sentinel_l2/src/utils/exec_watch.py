@@ -0,0 +1,266 @@
+import ctypes
+import ctypes.util
+import glob
+import os
+import re
+import select
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from .procfs import list_pids, read_starttime
+from .triage_queue import PRIORITY_HIGH, TriageQueue
+
+
+# include/uapi/linux/fanotify.h
+FAN_CLASS_NOTIF = 0x00000000
+FAN_CLOEXEC = 0x00000001
+FAN_NONBLOCK = 0x00000002
+FAN_MARK_ADD = 0x00000001
+FAN_MARK_MOUNT = 0x00000010
+FAN_OPEN_EXEC = 0x00001000
+FAN_EVENT_ON_CHILD = 0x08000000
+FAN_NOFD = -1
+AT_FDCWD = -100
+
+# include/uapi/linux/inotify.h
+IN_OPEN = 0x00000020
+IN_CREATE = 0x00000100
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_FAN_METADATA = struct.Struct('=IBBHQii')   # event_len, vers, reserved, metadata_len, mask, fd, pid
+_INOTIFY_EVENT = struct.Struct('=iIII')     # wd, mask, cookie, len
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        _libc.fanotify_init.argtypes = [ctypes.c_uint, ctypes.c_uint]
+        _libc.fanotify_mark.argtypes = [ctypes.c_int, ctypes.c_uint, ctypes.c_uint64, ctypes.c_int, ctypes.c_char_p]
+        _libc.inotify_init1.argtypes = [ctypes.c_int]
+        _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return _libc
+
+
+def _check(ret: int, what: str) -> int:
+    if ret < 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"{what}: {os.strerror(errno)}")
+    return ret
+
+
+class ExecWatcher:
+    """监视可写目录中的可执行文件执行，把执行进程直接放入高优先级分诊队列
+
+    挖矿木马的投放器几乎总是从 /tmp、/var/tmp、/dev/shm 或家目录下的隐藏目录执行。
+    优先使用 fanotify FAN_OPEN_EXEC（需要 CAP_SYS_ADMIN）：对配置路径所在的挂载点打标记，
+    内核在 exec 时推送事件并给出执行进程的 PID，再按路径前缀过滤；没有 exec 时线程阻塞在 select 上。
+    fanotify 不可用时退回 inotify IN_OPEN / IN_CREATE（只覆盖被监视目录的直接子项，且不提供 PID，
+    事件到达后扫描 /proc/[pid]/exe 找出执行进程），并按 poll_interval_seconds 周期扫描兜底。
+    /tmp 等目录中的普通文件打开同样产生 IN_OPEN，事件密集时两次 /proc 扫描的间隔不小于 min_sweep_interval_seconds。
+    """
+
+    INOTIFY_RESCAN_DELAY = 0.1
+    DEFAULT_EXCLUDE_HIDDEN_DIRS = ['.pyenv', '.nvm', '.cargo', '.rustup', '.vscode-server']
+
+    def __init__(self, config: Optional[Dict] = None, triage_queue: Optional[TriageQueue] = None):
+        config = config or {}
+        self.paths = [os.path.realpath(p) for p in config.get('paths', ['/tmp', '/var/tmp', '/dev/shm'])]
+        self.hidden_home = config.get('hidden_home', True)
+        self.home_roots = config.get('home_roots', ['/root', '/home/*'])
+        self.poll_interval = config.get('poll_interval_seconds', 5.0)
+        self.min_sweep_interval = config.get('min_sweep_interval_seconds', 1.0)
+        self.use_fanotify = config.get('use_fanotify', True)
+        self.use_inotify = config.get('use_inotify', True)
+        self.queue = triage_queue if triage_queue is not None else TriageQueue()
+        self.homes = sorted({os.path.realpath(p) for pattern in self.home_roots for p in glob.glob(pattern)
+                             if os.path.isdir(p)})
+        self.hidden_pattern = re.compile(
+            '^(' + '|'.join(re.escape(home) for home in self.homes) + r')/(.*/)?\.[^/]+/') if self.homes else None
+        # 语言工具链等常见的隐藏目录不作为投放路径
+        self.exclude = [os.path.realpath(p) for p in config.get('exclude_paths', [])]
+        self.exclude.extend(os.path.join(home, name) for home in self.homes
+                            for name in config.get('exclude_hidden_dirs', self.DEFAULT_EXCLUDE_HIDDEN_DIRS))
+        self.mode = ''
+        self.stats = {'events': 0, 'queued': 0, 'sweeps': 0}
+        self.seen: Set[tuple] = set()
+        self._last_sweep = 0.0
+        self._fd = -1
+        self._wake_r, self._wake_w = os.pipe()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watched(self, path: str) -> bool:
+        """路径位于配置的可写目录下，或位于家目录下的隐藏目录中"""
+        for prefix in self.exclude:
+            if path.startswith(prefix + '/'):
+                return False
+        for prefix in self.paths:
+            if path.startswith(prefix + '/'):
+                return True
+        return bool(self.hidden_home and self.hidden_pattern is not None and self.hidden_pattern.match(path))
+
+    def _watch_roots(self) -> List[str]:
+        roots = [p for p in self.paths if os.path.isdir(p)]
+        if self.hidden_home:
+            roots.extend(self.homes)
+        return roots
+
+    def _open_fanotify(self):
+        libc = _load_libc()
+        fd = _check(libc.fanotify_init(FAN_CLASS_NOTIF | FAN_CLOEXEC | FAN_NONBLOCK,
+                                       os.O_RDONLY | getattr(os, 'O_LARGEFILE', 0)), 'fanotify_init')
+        try:
+            for root in self._watch_roots():
+                # 挂载点标记覆盖整个子树；同一挂载点重复标记无副作用
+                _check(libc.fanotify_mark(fd, FAN_MARK_ADD | FAN_MARK_MOUNT, FAN_OPEN_EXEC, AT_FDCWD,
+                                          root.encode()), f'fanotify_mark {root}')
+        except OSError:
+            os.close(fd)
+            raise
+        self._fd = fd
+        self.mode = 'fanotify'
+
+    def _open_inotify(self):
+        libc = _load_libc()
+        fd = _check(libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC), 'inotify_init1')
+        self._wd_paths: Dict[int, str] = {}
+        dirs = [p for p in self.paths if os.path.isdir(p)]
+        if self.hidden_home:
+            for home in self.homes:
+                try:
+                    dirs.extend(entry.path for entry in os.scandir(home)
+                                if entry.name.startswith('.') and entry.is_dir(follow_symlinks=False))
+                except OSError:
+                    continue
+        for path in dirs:
+            wd = libc.inotify_add_watch(fd, path.encode(), IN_OPEN | IN_CREATE | IN_MOVED_TO)
+            if wd >= 0:
+                self._wd_paths[wd] = path
+        if not self._wd_paths:
+            os.close(fd)
+            raise OSError('inotify 没有可监视的目录')
+        self._fd = fd
+        self.mode = 'inotify'
+
+    def start(self) -> 'ExecWatcher':
+        if self.use_fanotify:
+            try:
+                self._open_fanotify()
+            except (OSError, AttributeError) as e:
+                print(f"[exec监视] fanotify 不可用: {e}")
+        if self._fd < 0 and self.use_inotify:
+            try:
+                self._open_inotify()
+            except (OSError, AttributeError) as e:
+                print(f"[exec监视] inotify 不可用: {e}")
+        if self._fd < 0:
+            self.mode = 'poll'
+        # 启动前已在监视路径下运行的进程同样分诊一次
+        self._scan_proc()
+        self._thread = threading.Thread(target=self._run, name='exec-watch', daemon=True)
+        self._thread.start()
+        print(f"[exec监视] 已启动，方式: {self.mode}，路径: {self._watch_roots()}")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        os.write(self._wake_w, b'x')
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _run(self):
+        # fanotify 模式不需要周期扫描，select 无超时，没有 exec 时不唤醒
+        idle_timeout = None if self.mode == 'fanotify' else self.poll_interval
+        fds = [self._wake_r] + ([self._fd] if self._fd >= 0 else [])
+        next_sweep: Optional[float] = None
+        while not self._stop.is_set():
+            timeout = idle_timeout if next_sweep is None else max(next_sweep - time.monotonic(), 0.0)
+            readable, _, _ = select.select(fds, [], [], timeout)
+            if self._stop.is_set():
+                return
+            if self.mode == 'fanotify':
+                self._read_fanotify()
+                continue
+            if self._fd in readable:
+                self._read_inotify()
+                # IN_OPEN 发生在 execve 完成之前，/proc/[pid]/exe 可能尚未切换，稍后再扫描；
+                # 期间到达的事件并入同一次扫描
+                due = max(time.monotonic() + self.INOTIFY_RESCAN_DELAY, self._last_sweep + self.min_sweep_interval)
+                next_sweep = due if next_sweep is None else min(next_sweep, due)
+            if next_sweep is not None and time.monotonic() < next_sweep:
+                continue
+            next_sweep = None
+            self._scan_proc()
+
+    def _push(self, pid: int, path: str):
+        self.queue.put(pid, PRIORITY_HIGH, f"exec_watch:{self.mode}", path)
+        self.stats['queued'] += 1
+        print(f"[exec监视] PID {pid} 执行了 {path}")
+
+    def _read_fanotify(self):
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                print(f"[exec监视] fanotify 读取失败: {e}")
+                return
+            offset = 0
+            while offset + _FAN_METADATA.size <= len(data):
+                event_len, _, _, _, mask, fd, pid = _FAN_METADATA.unpack_from(data, offset)
+                if event_len < _FAN_METADATA.size:
+                    break
+                offset += event_len
+                if fd == FAN_NOFD:
+                    continue
+                try:
+                    path = os.readlink(f'/proc/self/fd/{fd}')
+                except OSError:
+                    path = ''
+                finally:
+                    os.close(fd)
+                self.stats['events'] += 1
+                if mask & FAN_OPEN_EXEC and self.watched(path):
+                    self._push(pid, path)
+
+    def _read_inotify(self):
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset + _INOTIFY_EVENT.size <= len(data):
+                _, _, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size + length
+                self.stats['events'] += 1
+
+    def _scan_proc(self):
+        """扫描 /proc/[pid]/exe，新出现的位于监视路径下的可执行文件进程入队"""
+        self._last_sweep = time.monotonic()
+        self.stats['sweeps'] += 1
+        alive = set()
+        for pid in list_pids():
+            try:
+                path = os.readlink(f'/proc/{pid}/exe')
+            except OSError:
+                continue
+            if not self.watched(path):
+                continue
+            starttime = read_starttime(pid)
+            key = (pid, starttime, path)
+            alive.add(key)
+            if key not in self.seen:
+                self._push(pid, path)
+        self.seen = alive
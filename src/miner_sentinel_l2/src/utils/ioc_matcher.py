@@ -0,0 +1,160 @@
+import os
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import yaml
+
+
+DEFAULT_IOC_CONFIG = os.path.join(Path(__file__).parent.parent, 'config/mining_iocs.yaml')
+
+
+class AhoCorasickAutomaton:
+    """多模式字符串匹配自动机（Aho-Corasick）
+
+    每个模式带一个标签（如 keyword / pattern），一次扫描输入即可返回所有命中，
+    耗时与输入长度线性相关，与模式数量无关。
+    模式与输入可以是 str，也可以是 bytes（按字节值转移，可执行文件签名扫描使用）。
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, str]]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, tag: str):
+        """添加一个模式（构建前调用）"""
+        if not pattern:
+            return
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = nxt
+        if (tag, pattern) not in self._output[node]:
+            self._output[node].append((tag, pattern))
+        self._built = False
+
+    def build(self):
+        """按 BFS 计算失败指针，并把失败链上的输出合并到各节点"""
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+        self._built = True
+
+    def search(self, text: str) -> Dict[str, Set[str]]:
+        """单次扫描 text，返回 {标签: 命中的模式集合}"""
+        if not self._built:
+            self.build()
+
+        hits: Dict[str, Set[str]] = {}
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if output[node]:
+                for tag, pattern in output[node]:
+                    hits.setdefault(tag, set()).add(pattern)
+        return hits
+
+    def __len__(self):
+        return len(self._goto)
+
+
+class IOCMatcher:
+    """挖矿 IOC 匹配器：从配置一次性构建自动机，供所有检测器共享
+
+    进程名和命令行都统一转小写后匹配，返回的标签：
+      - name_keyword:    进程名挖矿关键词（CPU 检测器）
+      - keyword:         通用挖矿关键词（进程行为检测器）
+      - pattern:         命令行可疑参数模式
+      - ioc:             额外 IOC（矿池域名、钱包前缀等），同时计入 keyword
+    """
+
+    TAGS = ('name_keyword', 'keyword', 'pattern', 'ioc')
+
+    def __init__(self, config_path: Optional[str] = None):
+        self.config_path = config_path or DEFAULT_IOC_CONFIG
+        self.name_keywords: Set[str] = set()
+        self.mining_keywords: Set[str] = set()
+        self.suspicious_patterns: List[str] = []
+        self.extra_iocs: Set[str] = set()
+        self.automaton = AhoCorasickAutomaton()
+
+        self._load_config()
+
+    def _load_config(self):
+        """加载 IOC 配置并构建自动机"""
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            print(f"IOC配置文件未找到: {self.config_path}")
+            config = {}
+        except yaml.YAMLError as e:
+            print(f"IOC配置文件解析错误: {e}")
+            config = {}
+
+        self.name_keywords = {kw.lower() for kw in config.get('name_keywords', [])}
+        # 额外 IOC（可有成千上万条）按通用关键词处理
+        self.mining_keywords = {kw.lower() for kw in config.get('mining_keywords', [])}
+        self.extra_iocs = {kw.lower() for kw in config.get('extra_iocs', []) or []}
+        self.mining_keywords.update(self.extra_iocs)
+        self.suspicious_patterns = [p.lower() for p in config.get('suspicious_patterns', [])]
+
+        automaton = AhoCorasickAutomaton()
+        self._add_all(automaton, self.name_keywords, 'name_keyword')
+        self._add_all(automaton, self.mining_keywords, 'keyword')
+        self._add_all(automaton, self.suspicious_patterns, 'pattern')
+        self._add_all(automaton, self.extra_iocs, 'ioc')
+        automaton.build()
+        self.automaton = automaton
+
+    @staticmethod
+    def _add_all(automaton: AhoCorasickAutomaton, patterns: Iterable[str], tag: str):
+        for pattern in patterns:
+            automaton.add(pattern, tag)
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """对任意字符串做一次匹配，返回 {标签: 排序后的命中列表}"""
+        if not text:
+            return {}
+        hits = self.automaton.search(text.lower())
+        return {tag: sorted(patterns) for tag, patterns in hits.items()}
+
+    def match_name(self, process_name: str) -> Dict[str, List[str]]:
+        return self.match(process_name)
+
+    def match_cmdline(self, cmdline: List[str]) -> Dict[str, List[str]]:
+        return self.match(' '.join(cmdline))
+
+
+_shared_matcher: Optional[IOCMatcher] = None
+
+
+def get_shared_matcher() -> IOCMatcher:
+    """返回进程内共享的 IOC 匹配器（首次调用时构建）"""
+    global _shared_matcher
+    if _shared_matcher is None:
+        _shared_matcher = IOCMatcher()
+    return _shared_matcher
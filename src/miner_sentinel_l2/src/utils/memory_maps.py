@@ -0,0 +1,155 @@
+from typing import Dict, List, NamedTuple, Optional
+
+
+class MapRegion(NamedTuple):
+    """/proc/[pid]/maps 中的一行"""
+    start: int
+    end: int
+    perms: str
+    inode: int
+    pathname: str
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+    @property
+    def addr_range(self) -> str:
+        return f"{self.start:x}-{self.end:x}"
+
+    @property
+    def anonymous(self) -> bool:
+        return self.inode == 0 and (not self.pathname or self.pathname.startswith('[anon'))
+
+
+class MapsProfile(NamedTuple):
+    """只基于 maps 文本的内存布局分类结果"""
+    regions: int                # 映射总数
+    anon_rwx: int               # 可写可执行的匿名映射（JIT 代码）
+    anon_exec: int              # 不可写但可执行的匿名映射（W→X 切换后的 JIT 代码）
+    hidden_exec: int            # memfd / 已删除文件的可执行映射
+    hugepage: int               # hugetlbfs 映射
+    large_anon_rw: int          # 超过 large_anon_mb 的匿名可写映射
+    large_anon_mb: float        # 上述映射的总大小（MB）
+    ranked: List[MapRegion]     # L3 值得读取的区域，按优先级排序
+
+
+def parse_maps_line(line: str) -> Optional[MapRegion]:
+    parts = line.split(None, 5)
+    if len(parts) < 5:
+        return None
+    try:
+        start, end = parts[0].split('-')
+        return MapRegion(int(start, 16), int(end, 16), parts[1], int(parts[4]),
+                         parts[5].strip() if len(parts) > 5 else '')
+    except ValueError:
+        return None
+
+
+def read_maps(pid: int) -> List[MapRegion]:
+    """读取 /proc/[pid]/maps，失败时返回空列表"""
+    try:
+        with open(f'/proc/{pid}/maps', 'r') as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    regions = []
+    for line in lines:
+        region = parse_maps_line(line)
+        if region is not None:
+            regions.append(region)
+    return regions
+
+
+class MapsAnalyzer:
+    """对 /proc/[pid]/maps 做分类，不读取任何进程内存
+
+    RandomX 等矿工把 JIT 代码写入匿名 RWX（或先写后改为可执行）映射，
+    无文件落地的矿工常见 memfd / 已删除文件的可执行映射，数据集使用大页或超大匿名映射。
+    同时为 L3 给出值得读取的区域排序：JIT 与隐藏代码 > 堆 > 中小匿名可写映射 > 其余；
+    共享库等普通文件映射不进入列表。
+    """
+
+    # 区域优先级，数值越大越先读取
+    PRIORITY_ANON_RWX = 6
+    PRIORITY_HIDDEN_EXEC = 5
+    PRIORITY_ANON_EXEC = 4
+    PRIORITY_HEAP = 3
+    PRIORITY_ANON_RW = 2
+    PRIORITY_OTHER = 1
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.large_anon_mb = config.get('large_anon_mb', 200)
+        self.max_ranked_regions = config.get('max_ranked_regions', 64)
+
+    @staticmethod
+    def _hugepage(region: MapRegion) -> bool:
+        # MAP_HUGETLB 匿名映射显示为 "/anon_hugepage (deleted)"
+        return region.pathname.startswith('/anon_hugepage') or region.pathname.startswith('/dev/hugepages')
+
+    def _anonymous(self, region: MapRegion) -> bool:
+        # MAP_SHARED 匿名映射显示为 "/dev/zero (deleted)"
+        return region.anonymous or self._hugepage(region) or region.pathname.startswith('/dev/zero')
+
+    def _hidden(self, region: MapRegion) -> bool:
+        if self._anonymous(region):
+            return False
+        return region.pathname.startswith('/memfd:') or region.pathname.endswith('(deleted)')
+
+    def _priority(self, region: MapRegion) -> int:
+        """返回区域优先级，0 表示 L3 无需读取"""
+        perms = region.perms
+        if 'r' not in perms:
+            return 0
+        if self._anonymous(region):
+            if 'w' in perms and 'x' in perms:
+                return self.PRIORITY_ANON_RWX
+            if 'x' in perms:
+                return self.PRIORITY_ANON_EXEC
+            if 'w' in perms:
+                if region.size > self.large_anon_mb * 1024 * 1024:
+                    # 数据集等超大映射内容近似随机，排在最后
+                    return self.PRIORITY_OTHER
+                return self.PRIORITY_ANON_RW
+            return 0
+        if self._hidden(region):
+            return self.PRIORITY_HIDDEN_EXEC if 'x' in perms else self.PRIORITY_ANON_RW
+        if region.pathname == '[heap]':
+            return self.PRIORITY_HEAP
+        if region.pathname == '[stack]':
+            return self.PRIORITY_OTHER
+        return 0
+
+    def analyze(self, pid: int) -> MapsProfile:
+        regions = read_maps(pid)
+        anon_rwx = anon_exec = hidden_exec = hugepage = large_anon_rw = 0
+        large_anon_bytes = 0
+        prioritized = []
+        for region in regions:
+            perms = region.perms
+            anonymous = self._anonymous(region)
+            if anonymous and 'w' in perms and 'x' in perms:
+                anon_rwx += 1
+            elif anonymous and 'x' in perms:
+                anon_exec += 1
+            if 'x' in perms and self._hidden(region):
+                hidden_exec += 1
+            if self._hugepage(region):
+                hugepage += 1
+            if anonymous and 'w' in perms and region.size > self.large_anon_mb * 1024 * 1024:
+                large_anon_rw += 1
+                large_anon_bytes += region.size
+
+            priority = self._priority(region)
+            if priority:
+                prioritized.append((priority, region))
+
+        # 同优先级内小区域在前：L3 每个区域只读取有限字节，小区域读得完整
+        prioritized.sort(key=lambda item: (-item[0], item[1].size))
+        ranked = [region for _, region in prioritized[:self.max_ranked_regions]]
+        return MapsProfile(len(regions), anon_rwx, anon_exec, hidden_exec, hugepage,
+                           large_anon_rw, large_anon_bytes / (1024 * 1024), ranked)
+
+    def ranked_regions(self, pid: int) -> List[MapRegion]:
+        return self.analyze(pid).ranked
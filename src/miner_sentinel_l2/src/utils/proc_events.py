@@ -0,0 +1,210 @@
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from .procfs import ProcessKey, list_pids, read_starttime
+from .triage_queue import PRIORITY_NORMAL, TriageQueue
+
+
+# include/uapi/linux/netlink.h / connector.h / cn_proc.h
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+NLMSG_DONE = 3
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+
+PROC_EVENT_FORK = 0x00000001
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_EXIT = 0x80000000
+
+_NLMSGHDR = struct.Struct('=IHHII')         # len, type, flags, seq, pid
+_CN_MSG = struct.Struct('=IIIIHH')          # idx, val, seq, ack, len, flags
+_PROC_EVENT = struct.Struct('=IIQ')         # what, cpu, timestamp_ns
+_FORK = struct.Struct('=IIII')              # parent_pid, parent_tgid, child_pid, child_tgid
+_EXEC_EXIT = struct.Struct('=II')           # process_pid, process_tgid
+
+
+class ProcEvent(NamedTuple):
+    kind: str           # "fork" / "exec" / "exit"
+    pid: int            # 进程（线程组）ID
+    ppid: int           # fork 事件的父进程，其余为 0
+    timestamp: float
+
+
+class ProcConnector:
+    """NETLINK_CONNECTOR 进程事件订阅（需要 CAP_NET_ADMIN）
+
+    内核在 fork / exec / exit 时主动推送事件，无事件时 recv 阻塞，不产生任何开销。
+    只产出进程级事件：线程的创建与退出（pid != tgid）被过滤掉。
+    """
+
+    def __init__(self, recv_size: int = 65536):
+        self.recv_size = recv_size
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+        try:
+            self.sock.bind((0, CN_IDX_PROC))
+            self._control(PROC_CN_MCAST_LISTEN)
+        except OSError:
+            self.sock.close()
+            raise
+
+    def _control(self, op: int):
+        payload = struct.pack('=I', op)
+        cn = _CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(payload), 0)
+        header = _NLMSGHDR.pack(_NLMSGHDR.size + len(cn) + len(payload), NLMSG_DONE, 0, 0, 0)
+        self.sock.send(header + cn + payload)
+
+    def close(self):
+        try:
+            self._control(PROC_CN_MCAST_IGNORE)
+        except OSError:
+            pass
+        self.sock.close()
+
+    @staticmethod
+    def parse(data: bytes) -> List[ProcEvent]:
+        """解析一个 netlink 数据报，可能包含多条消息"""
+        events = []
+        offset = 0
+        while offset + _NLMSGHDR.size <= len(data):
+            length = _NLMSGHDR.unpack_from(data, offset)[0]
+            if length < _NLMSGHDR.size:
+                break
+            # 截断的数据报中 nlmsg_len 可能超出实际收到的长度
+            end = min(offset + length, len(data))
+            base = offset + _NLMSGHDR.size + _CN_MSG.size
+            if base + _PROC_EVENT.size <= end:
+                what, _, timestamp_ns = _PROC_EVENT.unpack_from(data, base)
+                body = base + _PROC_EVENT.size
+                if what == PROC_EVENT_FORK and body + _FORK.size <= end:
+                    _, parent_tgid, child_pid, child_tgid = _FORK.unpack_from(data, body)
+                    if child_pid == child_tgid:
+                        events.append(ProcEvent('fork', child_tgid, parent_tgid, timestamp_ns / 1e9))
+                elif what in (PROC_EVENT_EXEC, PROC_EVENT_EXIT) and body + _EXEC_EXIT.size <= end:
+                    pid, tgid = _EXEC_EXIT.unpack_from(data, body)
+                    if pid == tgid:
+                        kind = 'exec' if what == PROC_EVENT_EXEC else 'exit'
+                        events.append(ProcEvent(kind, tgid, 0, timestamp_ns / 1e9))
+            offset += (length + 3) & ~3
+        return events
+
+    def events(self, timeout: float, stop: threading.Event) -> Iterator[ProcEvent]:
+        while not stop.is_set():
+            readable, _, _ = select.select([self.sock], [], [], timeout)
+            if not readable:
+                continue
+            try:
+                data = self.sock.recv(self.recv_size)
+            except OSError as e:
+                # ENOBUFS：事件突发时内核丢弃了消息，遗漏的进程由 L2 周期扫描兜底
+                print(f"[进程事件] netlink 接收失败: {e}")
+                continue
+            yield from self.parse(data)
+
+
+class ProcDiffPoller:
+    """无法使用 proc connector 时的退化方案：周期性对比 /proc 中的 (pid, starttime) 集合
+
+    新出现的进程按 exec 事件处理（无法区分 fork 与 exec），消失的进程产出 exit 事件。
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.known: Dict[int, int] = self._scan()
+
+    @staticmethod
+    def _scan() -> Dict[int, int]:
+        current = {}
+        for pid in list_pids():
+            starttime = read_starttime(pid)
+            if starttime is not None:
+                current[pid] = starttime
+        return current
+
+    def events(self, timeout: float, stop: threading.Event) -> Iterator[ProcEvent]:
+        while not stop.wait(self.interval):
+            current = self._scan()
+            now = time.time()
+            for pid, starttime in self.known.items():
+                if current.get(pid) != starttime:
+                    yield ProcEvent('exit', pid, 0, now)
+            for pid, starttime in current.items():
+                if self.known.get(pid) != starttime:
+                    yield ProcEvent('exec', pid, 0, now)
+            self.known = current
+
+
+class ProcessEventMonitor:
+    """事件驱动的进程表
+
+    优先订阅 netlink proc connector，不可用（非 root、内核未启用 CONFIG_PROC_EVENTS）时
+    退回周期性 /proc 对比。进程表随事件增量维护：exec 的新进程立即放入分诊队列做轻量检测，
+    退出的进程从进程表和分诊队列中移除。
+    """
+
+    def __init__(self, config: Optional[Dict] = None, triage_queue: Optional[TriageQueue] = None):
+        config = config or {}
+        self.poll_interval = config.get('poll_interval_seconds', 1.0)
+        self.use_connector = config.get('use_connector', True)
+        self.queue = triage_queue if triage_queue is not None else TriageQueue(config.get('triage_queue_size', 4096))
+        self.table: Dict[int, ProcessKey] = {}
+        self.source = ''
+        self.stats = {'fork': 0, 'exec': 0, 'exit': 0}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._source = None
+
+    def _open_source(self):
+        if self.use_connector:
+            try:
+                self._source = ProcConnector()
+                self.source = 'proc_connector'
+                return
+            except OSError as e:
+                print(f"[进程事件] proc connector 不可用，退回 /proc 轮询: {e}")
+        self._source = ProcDiffPoller(self.poll_interval)
+        self.source = 'proc_diff'
+
+    def start(self) -> 'ProcessEventMonitor':
+        self._open_source()
+        # 初始进程表；connector 订阅已建立，此后的变化都会以事件形式到达
+        for pid in list_pids():
+            starttime = read_starttime(pid)
+            if starttime is not None:
+                self.table[pid] = (pid, starttime)
+        self._thread = threading.Thread(target=self._run, name='proc-events', daemon=True)
+        self._thread.start()
+        print(f"[进程事件] 已启动，事件来源: {self.source}，当前{len(self.table)}个进程")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * self.poll_interval + 1)
+        if isinstance(self._source, ProcConnector):
+            self._source.close()
+
+    def _run(self):
+        for event in self._source.events(self.poll_interval, self._stop):
+            self.handle(event)
+
+    def handle(self, event: ProcEvent):
+        self.stats[event.kind] += 1
+        if event.kind == 'exit':
+            self.table.pop(event.pid, None)
+            self.queue.discard(event.pid)
+            return
+
+        starttime = read_starttime(event.pid)
+        if starttime is None:
+            # 事件到达前进程已退出
+            self.table.pop(event.pid, None)
+            return
+        self.table[event.pid] = (event.pid, starttime)
+        if event.kind == 'exec':
+            self.queue.put(event.pid, PRIORITY_NORMAL, self.source)
@@ -0,0 +1,148 @@
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from .procfs import ProcessKey
+
+
+class RingBuffer:
+    """定长环形缓冲区，底层为 array('d')，容量固定、不随时间增长"""
+
+    __slots__ = ('_data', '_capacity', '_index', '_count')
+
+    def __init__(self, capacity: int):
+        self._capacity = max(int(capacity), 1)
+        self._data = array('d', bytes(8 * self._capacity))
+        self._index = 0
+        self._count = 0
+
+    def append(self, value: float):
+        self._data[self._index] = value
+        self._index = (self._index + 1) % self._capacity
+        if self._count < self._capacity:
+            self._count += 1
+
+    def values(self):
+        """按写入顺序返回当前有效数据"""
+        if self._count < self._capacity:
+            return self._data[:self._count]
+        return self._data[self._index:] + self._data[:self._index]
+
+    def __len__(self):
+        return self._count
+
+    def mean(self) -> float:
+        return sum(self.values()) / self._count if self._count else 0.0
+
+    def std(self) -> float:
+        if self._count < 2:
+            return 0.0
+        values = self.values()
+        mean = sum(values) / self._count
+        return (sum((x - mean) ** 2 for x in values) / self._count) ** 0.5
+
+    def max(self) -> float:
+        return max(self.values()) if self._count else 0.0
+
+    def last(self) -> Optional[float]:
+        if not self._count:
+            return None
+        return self._data[(self._index - 1) % self._capacity]
+
+    @property
+    def nbytes(self) -> int:
+        return self._capacity * self._data.itemsize
+
+
+class ProcessState:
+    """单个进程（按 pid + starttime 区分）的检测状态"""
+
+    __slots__ = ('key', 'rings', 'attrs', 'nbytes')
+
+    # 每个条目的固定开销估算（对象、字典、LRU 节点）
+    BASE_BYTES = 512
+
+    def __init__(self, key: ProcessKey):
+        self.key = key
+        self.rings: Dict[str, RingBuffer] = {}
+        self.attrs: Dict[str, object] = {}
+        self.nbytes = self.BASE_BYTES
+
+
+class ProcessStateStore:
+    """L2 检测器共享的进程状态存储
+
+    - 以 (pid, starttime) 为键，PID 复用时不会串用历史
+    - 每轮扫描按存活进程集合淘汰已退出进程
+    - 历史数据保存在定长环形缓冲区中
+    - 超出全局内存上限时按 LRU 淘汰
+    - 分诊线程与超时后仍在运行的分析线程也会访问，增删条目与遍历都在锁内进行
+    """
+
+    def __init__(self, history_size: int = 10, max_memory_mb: float = 16):
+        self.history_size = history_size
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.states: 'OrderedDict[ProcessKey, ProcessState]' = OrderedDict()
+        self.total_bytes = 0
+        self.evicted_dead = 0
+        self.evicted_lru = 0
+        self.lock = threading.RLock()
+
+    def get(self, key: ProcessKey) -> ProcessState:
+        """获取（不存在则创建）进程状态，并标记为最近使用"""
+        with self.lock:
+            state = self.states.get(key)
+            if state is None:
+                state = ProcessState(key)
+                self.states[key] = state
+                self.total_bytes += state.nbytes
+                self._enforce_cap()
+            else:
+                self.states.move_to_end(key)
+            return state
+
+    def peek(self, key: ProcessKey) -> Optional[ProcessState]:
+        """只读访问，不影响 LRU 顺序"""
+        return self.states.get(key)
+
+    def ring(self, key: ProcessKey, name: str) -> RingBuffer:
+        """获取进程的某个历史序列"""
+        with self.lock:
+            state = self.get(key)
+            ring = state.rings.get(name)
+            if ring is None:
+                ring = RingBuffer(self.history_size)
+                state.rings[name] = ring
+                state.nbytes += ring.nbytes
+                self.total_bytes += ring.nbytes
+                self._enforce_cap()
+            return ring
+
+    def evict_dead(self, alive_keys: Iterable[ProcessKey]) -> int:
+        """淘汰不在存活集合中的进程状态，返回淘汰数量"""
+        alive = alive_keys if isinstance(alive_keys, (set, frozenset)) else set(alive_keys)
+        with self.lock:
+            dead = [key for key in self.states if key not in alive]
+            for key in dead:
+                self._remove(key)
+            self.evicted_dead += len(dead)
+        return len(dead)
+
+    def _remove(self, key: ProcessKey):
+        state = self.states.pop(key, None)
+        if state is not None:
+            self.total_bytes -= state.nbytes
+
+    def _enforce_cap(self):
+        # 至少保留最近使用的一个条目
+        while self.total_bytes > self.max_bytes and len(self.states) > 1:
+            key = next(iter(self.states))
+            self._remove(key)
+            self.evicted_lru += 1
+
+    def __len__(self):
+        return len(self.states)
+
+    def __contains__(self, key: ProcessKey):
+        return key in self.states
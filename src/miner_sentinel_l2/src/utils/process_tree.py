@@ -0,0 +1,55 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from .procfs import ProcessSnapshot
+
+
+class ProcessTree:
+    """由一次批量快照的 ppid 列构建的进程树
+
+    构建与每次聚合都是 O(n)：先建立子进程表，再从根（父进程不在快照中的进程）
+    做一次迭代遍历得到拓扑序，聚合时按逆序把子节点的值并入父节点。
+    PID 复用等竞态可能使少量节点从任何根都不可达，这些节点只保留自身的值。
+    """
+
+    def __init__(self, snapshot: ProcessSnapshot):
+        self.snapshot = snapshot
+        self.parent: Dict[int, int] = {}
+        self.children: Dict[int, List[int]] = {}
+        for pid, stat in snapshot.stats.items():
+            self.parent[pid] = stat.ppid
+            self.children.setdefault(stat.ppid, []).append(pid)
+
+        # 父节点总在子节点之前
+        self.order: List[int] = []
+        stack = [pid for pid, ppid in self.parent.items() if ppid not in self.parent]
+        while stack:
+            pid = stack.pop()
+            self.order.append(pid)
+            stack.extend(self.children.get(pid, ()))
+        # 聚合时按 (子, 父) 逆拓扑序合并
+        self.edges = [(pid, self.parent[pid]) for pid in reversed(self.order) if self.parent[pid] in self.parent]
+
+    def __len__(self):
+        return len(self.parent)
+
+    def aggregate(self, values: Dict[int, Any], op: Callable[[Any, Any], Any] = None,
+                  default: Any = 0) -> Dict[int, Any]:
+        """自底向上聚合每棵子树的值（默认求和），values 中没有的节点取 default"""
+        totals = dict.fromkeys(self.parent, default)
+        totals.update((pid, value) for pid, value in values.items() if pid in totals)
+        if op is None:
+            for pid, ppid in self.edges:
+                totals[ppid] += totals[pid]
+        else:
+            for pid, ppid in self.edges:
+                totals[ppid] = op(totals[ppid], totals[pid])
+        return totals
+
+    def session_root(self, session: int) -> Optional[int]:
+        """会话首进程仍在时返回它，否则返回会话内父进程不属于该会话的第一个进程"""
+        if session in self.parent and self.snapshot.stats[session].session == session:
+            return session
+        for pid in self.order:
+            if self.snapshot.stats[pid].session == session:
+                return pid
+        return None
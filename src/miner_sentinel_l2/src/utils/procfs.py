@@ -0,0 +1,255 @@
+import os
+import time
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+
+# 进程唯一标识：(pid, starttime)，可区分 PID 复用
+ProcessKey = Tuple[int, int]
+
+# PF_KTHREAD：内核线程标志（include/linux/sched.h）
+PF_KTHREAD = 0x00200000
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+class ProcStat(NamedTuple):
+    """/proc/[pid]/stat 中 L2 用到的字段（时间单位为 clock ticks）"""
+    pid: int
+    comm: str
+    state: str
+    ppid: int
+    session: int
+    flags: int
+    utime: int
+    stime: int
+    cutime: int
+    cstime: int
+    num_threads: int
+    starttime: int
+    rss_pages: int
+
+
+def parse_stat(pid: int, content: str) -> Optional[ProcStat]:
+    """解析 stat 文本；comm 可能包含空格和括号，以最后一个 ')' 为界"""
+    try:
+        lpar = content.index('(')
+        rpar = content.rindex(')')
+        comm = content[lpar + 1:rpar]
+        fields = content[rpar + 2:].split()
+        return ProcStat(
+            pid=pid,
+            comm=comm,
+            state=fields[0],
+            ppid=int(fields[1]),
+            session=int(fields[3]),
+            flags=int(fields[6]),
+            utime=int(fields[11]),
+            stime=int(fields[12]),
+            cutime=int(fields[13]),
+            cstime=int(fields[14]),
+            num_threads=int(fields[17]),
+            starttime=int(fields[19]),
+            rss_pages=int(fields[21]),
+        )
+    except (ValueError, IndexError):
+        return None
+
+
+def read_stat(pid: int) -> Optional[ProcStat]:
+    """读取单个进程的 stat，进程不存在或无权限时返回 None"""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            return parse_stat(pid, f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def read_starttime(pid: int) -> Optional[int]:
+    stat = read_stat(pid)
+    return stat.starttime if stat else None
+
+
+def process_key(pid: int) -> Optional[ProcessKey]:
+    """返回 (pid, starttime)，进程已退出时返回 None"""
+    starttime = read_starttime(pid)
+    if starttime is None:
+        return None
+    return pid, starttime
+
+
+def read_cmdline(pid: int) -> str:
+    """读取命令行（参数以空格连接），失败时返回空串"""
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return f.read().replace(b'\0', b' ').decode('utf-8', errors='ignore').strip()
+    except OSError:
+        return ''
+
+
+def exe_inode(pid: int) -> int:
+    """返回 /proc/[pid]/exe 指向文件的 inode，内核线程或无权限时返回 0"""
+    try:
+        return os.stat(f'/proc/{pid}/exe').st_ino
+    except OSError:
+        return 0
+
+
+def read_status(pid: int, tid: Optional[int] = None) -> Dict[str, str]:
+    """读取 /proc/[pid]/status（或 task/[tid]/status）为 {字段: 值} 字典，失败时返回空字典"""
+    path = f'/proc/{pid}/status' if tid is None else f'/proc/{pid}/task/{tid}/status'
+    fields: Dict[str, str] = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                key, sep, value = line.partition(':')
+                if sep:
+                    fields[key] = value.strip()
+    except OSError:
+        pass
+    return fields
+
+
+def read_cgroup(pid: int) -> str:
+    try:
+        with open(f'/proc/{pid}/cgroup', 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def read_io(pid: int) -> Dict[str, int]:
+    """读取 /proc/[pid]/io（整个线程组的累计 I/O），无权限时返回空字典"""
+    counters: Dict[str, int] = {}
+    try:
+        with open(f'/proc/{pid}/io', 'r') as f:
+            for line in f:
+                key, sep, value = line.partition(':')
+                if sep:
+                    counters[key] = int(value)
+    except (OSError, ValueError):
+        pass
+    return counters
+
+
+def _read_kb_fields(path: str) -> Dict[str, int]:
+    """解析 "字段: 数值 [kB]" 格式的文件（meminfo、smaps_rollup），失败时返回空字典"""
+    fields: Dict[str, int] = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                key, sep, value = line.partition(':')
+                if not sep:
+                    continue
+                parts = value.split()
+                if parts and parts[0].isdigit():
+                    fields[key] = int(parts[0])
+    except OSError:
+        pass
+    return fields
+
+
+def read_smaps_rollup(pid: int) -> Dict[str, int]:
+    """读取 /proc/[pid]/smaps_rollup（内核 4.14+，单位 kB），不可用时返回空字典"""
+    return _read_kb_fields(f'/proc/{pid}/smaps_rollup')
+
+
+def read_meminfo() -> Dict[str, int]:
+    """读取 /proc/meminfo（除 HugePages_* 计数外单位为 kB）"""
+    return _read_kb_fields('/proc/meminfo')
+
+
+def read_schedstat(pid: int, tid: Optional[int] = None) -> Optional[Tuple[int, int, int]]:
+    """读取 schedstat：(运行时间 ns, 就绪等待时间 ns, 时间片数)"""
+    path = f'/proc/{pid}/schedstat' if tid is None else f'/proc/{pid}/task/{tid}/schedstat'
+    try:
+        with open(path, 'r') as f:
+            fields = f.read().split()
+        return int(fields[0]), int(fields[1]), int(fields[2])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def is_kernel_thread(stat: ProcStat) -> bool:
+    return bool(stat.flags & PF_KTHREAD)
+
+
+def read_uptime() -> float:
+    """系统启动以来的秒数（/proc/uptime）"""
+    with open('/proc/uptime', 'r') as f:
+        return float(f.readline().split()[0])
+
+
+def list_pids() -> List[int]:
+    return [int(name) for name in os.listdir('/proc') if name.isdigit()]
+
+
+def read_pid_max() -> int:
+    try:
+        with open('/proc/sys/kernel/pid_max', 'r') as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return 32768
+
+
+def read_cpu_busy_ticks() -> Optional[int]:
+    """/proc/stat 中全部 CPU 的 user + nice + system ticks（可归属到进程的 CPU 时间）"""
+    try:
+        with open('/proc/stat', 'r') as f:
+            fields = f.readline().split()
+        return int(fields[1]) + int(fields[2]) + int(fields[3])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ProcessSnapshot:
+    """一次批量读取所有 /proc/[pid]/stat 得到的进程快照"""
+
+    def __init__(self, stats: Dict[int, ProcStat], timestamp: float, uptime: float,
+                 listed: Optional[Set[int]] = None, busy_ticks: Optional[int] = None):
+        self.stats = stats
+        self.timestamp = timestamp
+        self.uptime = uptime
+        self.listed = listed if listed is not None else set(stats)   # 目录遍历看到的全部 PID
+        self.busy_ticks = busy_ticks                                  # 同一时刻 /proc/stat 的进程可归属 ticks
+
+    @classmethod
+    def take(cls) -> 'ProcessSnapshot':
+        stats: Dict[int, ProcStat] = {}
+        listed = list_pids()
+        for pid in listed:
+            stat = read_stat(pid)
+            if stat is not None:
+                stats[pid] = stat
+        return cls(stats, time.time(), read_uptime(), set(listed), read_cpu_busy_ticks())
+
+    def __len__(self):
+        return len(self.stats)
+
+    def __contains__(self, pid: int):
+        return pid in self.stats
+
+    def get(self, pid: int) -> Optional[ProcStat]:
+        return self.stats.get(pid)
+
+    def keys(self) -> Set[ProcessKey]:
+        return {(pid, stat.starttime) for pid, stat in self.stats.items()}
+
+    def age_seconds(self, stat: ProcStat) -> float:
+        """进程真实存活时间（基于内核 starttime）"""
+        return max(self.uptime - stat.starttime / CLOCK_TICKS, 0.0)
+
+    def cpu_percent(self, stat: ProcStat, previous: Optional['ProcessSnapshot'] = None) -> float:
+        """CPU 使用率（单核 100%，与 psutil 口径一致）
+
+        有上一次快照且为同一进程时按两次快照的差值计算，否则按进程整个生命周期平均。
+        """
+        ticks = stat.utime + stat.stime
+        if previous is not None:
+            prev = previous.get(stat.pid)
+            elapsed = self.timestamp - previous.timestamp
+            if prev is not None and prev.starttime == stat.starttime and elapsed > 0:
+                return (ticks - prev.utime - prev.stime) / CLOCK_TICKS / elapsed * 100
+        age = self.age_seconds(stat)
+        if age <= 0:
+            return 0.0
+        return ticks / CLOCK_TICKS / age * 100
@@ -0,0 +1,81 @@
+import time
+from typing import NamedTuple, Optional
+
+from .process_state_store import ProcessStateStore
+from .procfs import CLOCK_TICKS, ProcStat, read_io, read_schedstat, read_status, read_uptime
+
+
+class SchedIOProfile(NamedTuple):
+    """进程的调度与 I/O 行为特征"""
+    tid: int                    # 读取 status / schedstat 的线程（多线程进程取最忙的线程）
+    voluntary: int              # 采样区间内的主动上下文切换次数
+    nonvoluntary: int           # 采样区间内的被动（抢占）上下文切换次数
+    voluntary_ratio: float      # 主动切换占比，计算密集且从不阻塞的线程接近 0
+    nonvoluntary_rate: float    # 每秒被动切换次数
+    run_share: float            # 该线程在采样区间内处于运行状态的时间占比（schedstat）
+    io_bytes: int               # 采样区间内整个进程的读写字节数（rchar + wchar）
+    io_bytes_per_cpu_sec: float  # 每 CPU 秒对应的读写字节数
+    from_history: bool          # True 为两次采样的差值，False 为生命周期累计
+
+
+class SchedIOProfiler:
+    """一次读取 status（上下文切换）、io、schedstat 三个小文件，得到调度与 I/O 特征
+
+    /proc/[pid]/status 和 schedstat 只反映单个线程，多线程进程读取最忙线程
+    （由 thread_profile 给出）的 task 文件；io 为整个线程组的累计值。
+    上一次读数保存在共享状态存储中，没有历史时按进程生命周期累计值计算。
+    """
+
+    SAMPLE_ATTR = 'sched_io_sample'
+
+    def __init__(self, state_store: Optional[ProcessStateStore] = None):
+        self.state_store = state_store
+
+    def profile(self, stat: ProcStat, tid: int = 0) -> SchedIOProfile:
+        tid = tid or stat.pid
+        task = None if tid == stat.pid else tid
+        status = read_status(stat.pid, task)
+        sched = read_schedstat(stat.pid, task) or (0, 0, 0)
+        io = read_io(stat.pid)
+
+        now = time.monotonic()
+        sample = (
+            tid,
+            int(status.get('voluntary_ctxt_switches', 0)),
+            int(status.get('nonvoluntary_ctxt_switches', 0)),
+            sched[0],
+            io.get('rchar', 0) + io.get('wchar', 0),
+            stat.utime + stat.stime,
+            now,
+        )
+
+        previous = None
+        if self.state_store is not None:
+            state = self.state_store.get((stat.pid, stat.starttime))
+            previous = state.attrs.get(self.SAMPLE_ATTR)
+            state.attrs[self.SAMPLE_ATTR] = sample
+
+        if previous is not None and previous[0] == tid and now > previous[6]:
+            elapsed = now - previous[6]
+            deltas = [cur - prev for cur, prev in zip(sample[1:6], previous[1:6])]
+            from_history = True
+        else:
+            # 没有历史或最忙线程发生变化：按生命周期累计
+            elapsed = max(read_uptime() - stat.starttime / CLOCK_TICKS, 0.0)
+            deltas = list(sample[1:6])
+            from_history = False
+
+        voluntary, nonvoluntary, run_ns, io_bytes, cpu_ticks = deltas
+        switches = voluntary + nonvoluntary
+        cpu_seconds = cpu_ticks / CLOCK_TICKS
+        return SchedIOProfile(
+            tid=tid,
+            voluntary=voluntary,
+            nonvoluntary=nonvoluntary,
+            voluntary_ratio=voluntary / switches if switches else 1.0,
+            nonvoluntary_rate=nonvoluntary / elapsed if elapsed > 0 else 0.0,
+            run_share=min(run_ns / 1e9 / elapsed, 1.0) if elapsed > 0 else 0.0,
+            io_bytes=io_bytes,
+            io_bytes_per_cpu_sec=io_bytes / cpu_seconds if cpu_seconds > 0 else 0.0,
+            from_history=from_history,
+        )
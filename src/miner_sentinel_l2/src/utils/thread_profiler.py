@@ -0,0 +1,108 @@
+import os
+import time
+from typing import Dict, NamedTuple, Optional
+
+from .process_state_store import ProcessStateStore
+from .procfs import CLOCK_TICKS, ProcStat, parse_stat, read_uptime
+
+
+class ThreadProfile(NamedTuple):
+    """进程内线程级 CPU 分布"""
+    threads: int            # 进程的线程总数
+    sampled: int            # 实际读取的线程数（受 max_threads 限制）
+    active: int             # CPU 使用率不低于 active_percent 的线程数
+    saturated: int          # CPU 使用率不低于 saturation_percent 的线程数
+    mean_cpu: float         # 活跃线程的平均 CPU 使用率
+    cv: float               # 活跃线程 CPU 使用率的离散系数（标准差 / 均值）
+    from_history: bool      # True 为两次采样的差值，False 为线程生命周期平均
+    busiest_tid: int = 0    # CPU 使用率最高的线程
+
+
+EMPTY_PROFILE = ThreadProfile(0, 0, 0, 0, 0.0, 0.0, False)
+
+
+class ThreadCPUProfiler:
+    """读取 /proc/[pid]/task/*/stat，分析多线程进程的线程 CPU 分布
+
+    XMRig 等矿工的 N 个工作线程各自接近满载且 CPU 时间几乎相同，
+    表现为满载线程数多、离散系数小。每个进程最多读取 max_threads 个线程，
+    JVM 等上千线程的进程开销仍然有限。上一次的线程 ticks 保存在共享状态存储中，
+    没有历史时按线程生命周期平均。
+    """
+
+    TICKS_ATTR = 'thread_ticks'
+
+    def __init__(self, config: Optional[Dict] = None, state_store: Optional[ProcessStateStore] = None):
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.max_threads = config.get('max_threads', 256)
+        self.active_percent = config.get('active_percent', 10.0)
+        self.saturation_percent = config.get('saturation_percent', 90.0)
+        self.min_saturated = config.get('min_saturated_threads', 2)
+        self.max_cv = config.get('max_cv', 0.15)
+        self.state_store = state_store
+
+    def _read_threads(self, pid: int) -> Dict[int, ProcStat]:
+        task_dir = f'/proc/{pid}/task'
+        try:
+            tids = os.listdir(task_dir)
+        except OSError:
+            return {}
+        stats: Dict[int, ProcStat] = {}
+        for name in tids[:self.max_threads]:
+            try:
+                with open(f'{task_dir}/{name}/stat', 'r') as f:
+                    stat = parse_stat(int(name), f.read())
+            except (OSError, ValueError):
+                continue
+            if stat is not None:
+                stats[stat.pid] = stat
+        return stats
+
+    def profile(self, stat: ProcStat) -> ThreadProfile:
+        """stat 为进程本身的 /proc/[pid]/stat；线程数不足 min_saturated 时不读取 task 目录"""
+        if not self.enabled or stat.num_threads < self.min_saturated:
+            return ThreadProfile(stat.num_threads, 0, 0, 0, 0.0, 0.0, False)
+
+        threads = self._read_threads(stat.pid)
+        if not threads:
+            return EMPTY_PROFILE
+        now = time.monotonic()
+        ticks = {tid: t.utime + t.stime for tid, t in threads.items()}
+
+        previous, elapsed = {}, 0.0
+        if self.state_store is not None:
+            state = self.state_store.get((stat.pid, stat.starttime))
+            saved = state.attrs.get(self.TICKS_ATTR)
+            if saved is not None:
+                previous, elapsed = saved[0], now - saved[1]
+            state.attrs[self.TICKS_ATTR] = (ticks, now)
+
+        from_history = bool(previous) and elapsed > 0
+        uptime = None
+        usages = {}
+        for tid, t in threads.items():
+            prev = previous.get(tid) if from_history else None
+            if prev is not None:
+                usages[tid] = (ticks[tid] - prev) / CLOCK_TICKS / elapsed * 100
+            else:
+                # 新线程或没有历史：按线程生命周期平均
+                if uptime is None:
+                    uptime = read_uptime()
+                age = uptime - t.starttime / CLOCK_TICKS
+                usages[tid] = ticks[tid] / CLOCK_TICKS / age * 100 if age > 0 else 0.0
+
+        active = [u for u in usages.values() if u >= self.active_percent]
+        saturated = sum(1 for u in active if u >= self.saturation_percent)
+        if active:
+            mean = sum(active) / len(active)
+            std = (sum((u - mean) ** 2 for u in active) / len(active)) ** 0.5
+            cv = std / mean if mean > 0 else 0.0
+        else:
+            mean, cv = 0.0, 0.0
+        busiest = max(usages, key=usages.get)
+        return ThreadProfile(stat.num_threads, len(threads), len(active), saturated, mean, cv, from_history, busiest)
+
+    def is_uniform(self, profile: ThreadProfile) -> bool:
+        """多个线程同时满载且 CPU 时间几乎一致"""
+        return profile.saturated >= self.min_saturated and profile.cv <= self.max_cv
@@ -0,0 +1,77 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+# 优先级数值越小越先处理
+PRIORITY_HIGH = 0       # 可写目录中的 exec（fanotify / inotify）
+PRIORITY_NORMAL = 1     # 进程事件中新 exec 的进程
+
+
+class TriageItem(NamedTuple):
+    pid: int
+    priority: int
+    source: str             # 事件来源，如 "proc_connector" / "proc_diff"
+    path: str               # 已知时为可执行文件路径
+    enqueued: float
+
+
+class TriageQueue:
+    """按 PID 去重的线程安全优先队列
+
+    同一 PID 在出队前重复入队只保留一项；新的入队优先级更高时提升该项的优先级
+    （堆中的旧项在出队时按惰性删除跳过）。队列满时丢弃新项并计数，不阻塞事件源。
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._heap: List[Tuple[int, int, int]] = []
+        self._items: Dict[int, TriageItem] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.stats = {'queued': 0, 'deduplicated': 0, 'dropped': 0}
+
+    def put(self, pid: int, priority: int = PRIORITY_NORMAL, source: str = '', path: str = '') -> bool:
+        with self._cond:
+            queued = self._items.get(pid)
+            if queued is not None:
+                self.stats['deduplicated'] += 1
+                if priority >= queued.priority:
+                    return False
+                self._items[pid] = queued._replace(priority=priority, source=source, path=path or queued.path)
+            elif len(self._items) >= self.maxsize:
+                self.stats['dropped'] += 1
+                return False
+            else:
+                self._items[pid] = TriageItem(pid, priority, source, path, time.time())
+                self.stats['queued'] += 1
+            heapq.heappush(self._heap, (priority, next(self._seq), pid))
+            self._cond.notify()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[TriageItem]:
+        """取出优先级最高的一项，超时返回 None"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                while self._heap:
+                    priority, _, pid = heapq.heappop(self._heap)
+                    item = self._items.get(pid)
+                    if item is not None and item.priority == priority:
+                        del self._items[pid]
+                        return item
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def discard(self, pid: int):
+        """进程已退出，无需再分诊"""
+        with self._cond:
+            self._items.pop(pid, None)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
@@ -1,23 +1,45 @@
+import os
 import yaml
 from pathlib import Path
-from typing import List, Set, Dict, Optional
+from typing import List, Set, Dict, Optional, Tuple
 import psutil
+import threading
 import time
 
+from .ioc_matcher import AhoCorasickAutomaton
+from .procfs import read_starttime, exe_inode
+
 
 class WhitelistManager:
-    def __init__(self, config_path: Path):
+    def __init__(self, config_path: Path, reload_check_interval: float = 5.0, max_cache_size: int = 65536):
         self.config_path = config_path
         self.trusted_keywords: Set[str] = set()
         self.exact_matches: Set[str] = set()
         self.user_whitelist: Set[str] = set()
         self.options: Dict = {}
 
+        # 预编译的白名单：小写关键词统一放入一个自动机，标签区分来源
+        self.keyword_automaton = AhoCorasickAutomaton()
+
+        # 判定缓存：(pid, starttime, exe inode) -> 是否白名单，进程生命周期内只判定一次
+        self.decision_cache: Dict[Tuple[int, int, int], bool] = {}
+        self.max_cache_size = max_cache_size
+        # 分诊线程与扫描线程同时读写缓存、热加载配置，所有修改都在锁内进行
+        self.lock = threading.RLock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # 热加载：定期检查配置文件 mtime
+        self.reload_check_interval = reload_check_interval
+        self._config_mtime: Optional[float] = None
+        self._last_reload_check = 0.0
+
         self._load_config()
 
     def _load_config(self):
         """加载白名单配置"""
         try:
+            self._config_mtime = os.path.getmtime(self.config_path)
             with open(self.config_path, 'r', encoding='utf-8') as f:
                 config = yaml.safe_load(f) or {}
             # print(f'config:{config}')
@@ -31,78 +53,106 @@ class WhitelistManager:
         except yaml.YAMLError as e:
             print(f"白名单配置文件解析错误: {e}")
 
-    def is_whitelisted(self, process: psutil.Process) -> bool:
-        """检查进程是否在白名单中"""
-        try:
-            process_name = process.name()
-            cmdline = ' '.join(process.cmdline()).lower()
-
-            # 1. 精确匹配检查
-            if process_name in self.exact_matches:
-                # print(f"精确匹配: {process_name}")
-                return True
+        self._compile()
+
+    def _compile(self):
+        """把关键词预编译为一个自动机，并使旧的判定缓存失效"""
+        automaton = AhoCorasickAutomaton()
+        for keyword in self.trusted_keywords:
+            automaton.add(keyword.lower(), 'trusted')
+        for keyword in self.user_whitelist:
+            automaton.add(keyword.lower(), 'user')
+        automaton.build()
+        with self.lock:
+            self.keyword_automaton = automaton
+            self.decision_cache.clear()
+
+    def reload_if_changed(self) -> bool:
+        """配置文件有变化时热加载，返回是否发生了重新加载"""
+        with self.lock:
+            now = time.time()
+            if now - self._last_reload_check < self.reload_check_interval:
+                return False
+            self._last_reload_check = now
 
-            # 2. 关键词匹配检查
-            if any(keyword.lower() in process_name.lower() for keyword in self.trusted_keywords):
-                # print(f"关键词匹配: {process_name}")
-                return True
-
-            if any(keyword.lower() in cmdline for keyword in self.trusted_keywords):
-                # print(f"关键词匹配: {cmdline}")
-                return True
+            try:
+                mtime = os.path.getmtime(self.config_path)
+            except OSError:
+                return False
+            if mtime == self._config_mtime:
+                return False
 
-            # 3. 用户自定义白名单检查
-            if any(keyword.lower() in process_name.lower() for keyword in self.user_whitelist):
-                # print(f"用户自定义白名单: {process_name}")
-                return True
+            print(f"白名单配置已变更，重新加载: {self.config_path}")
+            self._load_config()
+            return True
 
-            if any(keyword.lower() in cmdline for keyword in self.user_whitelist):
-                # print(f"用户自定义白名单: {cmdline}")
-                return True
+    def is_whitelisted(self, process: psutil.Process) -> bool:
+        """检查进程是否在白名单中（按进程生命周期缓存判定结果）"""
+        self.reload_if_changed()
+
+        pid = process.pid
+        starttime = read_starttime(pid)
+        if starttime is None:
+            return False
+
+        key = (pid, starttime, exe_inode(pid))
+        with self.lock:
+            decision = self.decision_cache.get(key)
+            if decision is not None:
+                self.cache_hits += 1
+                return decision
+            self.cache_misses += 1
+
+        # 判定需要读取 /proc，不在锁内进行
+        try:
+            decision = self._evaluate(process)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            # 无法判定时不缓存，下次重试
+            return False
 
-            # # 4. 根据选项进行智能过滤
-            # if self._should_skip_by_options(process):
-            #     print(f"根据选项跳过: {process_name}")
-            #     return True
+        with self.lock:
+            if len(self.decision_cache) >= self.max_cache_size:
+                self.prune_cache()
+            self.decision_cache[key] = decision
+        return decision
 
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
+    def _evaluate(self, process: psutil.Process) -> bool:
+        """实际的白名单判定：先查进程名，只有必要时才读取 cmdline"""
+        process_name = process.name()
 
-        return False
+        # 1. 精确匹配检查
+        if process_name in self.exact_matches:
+            # print(f"精确匹配: {process_name}")
+            return True
 
-    def _should_skip_by_options(self, process: psutil.Process) -> bool:
-        """根据配置选项判断是否跳过进程"""
-        options = self.options
+        # 2/3. 可信关键词和用户自定义白名单：进程名一次扫描
+        if self.keyword_automaton.search(process_name.lower()):
+            # print(f"关键词匹配: {process_name}")
+            return True
 
-        # 跳过系统进程
-        if options.get('skip_system_processes', False):
-            try:
-                if process.username() in ['root', 'system'] and process.ppid() == 1:
-                    return True
-            except:
-                pass
+        # 进程名未命中时才读取 cmdline
+        cmdline = ' '.join(process.cmdline()).lower()
+        if cmdline and self.keyword_automaton.search(cmdline):
+            # print(f"关键词匹配: {cmdline}")
+            return True
 
-        # 跳过低CPU进程
-        if options.get('skip_low_cpu_processes', False):
-            try:
-                cpu_percent = process.cpu_percent(interval=0.1)
-                if cpu_percent < options.get('cpu_threshold', 1.0):
-                    return True
-            except:
-                pass
-
-        # 跳过短生命周期进程
-        if options.get('skip_short_lived_processes', False):
-            try:
-                create_time = process.create_time()
-                uptime = time.time() - create_time
-                if uptime < options.get('min_uptime_seconds', 300):
-                    return True
-            except:
-                pass
+        # 4. 基于 options 的过滤（系统/低CPU/短生命周期）由 ProcessPreFilter 在检测前批量完成
 
         return False
 
+    def prune_cache(self, alive_pids: Optional[Set[int]] = None):
+        """清理已退出进程的判定缓存"""
+        if alive_pids is None:
+            alive_pids = set(psutil.pids())
+        with self.lock:
+            self.decision_cache = {
+                key: decision for key, decision in self.decision_cache.items()
+                if key[0] in alive_pids
+            }
+            # PID 全部存活但缓存仍然过大时直接清空
+            if len(self.decision_cache) >= self.max_cache_size:
+                self.decision_cache.clear()
+
     # def add_to_whitelist(self, process_name: str, list_type: str = "user"):
     #     """动态添加进程到白名单"""
     #     if list_type == "exact":
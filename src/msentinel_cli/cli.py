@@ -31,6 +31,10 @@ try:
     from miner_sentinel_l2.src.utils.system_utils import SystemUtils
     from miner_sentinel_l2.src.models.detection_result import DetectionResult
     from miner_sentinel_l2.src.utils.whitelist_manager import WhitelistManager
+    from miner_sentinel_l2.src.utils.proc_events import ProcessEventMonitor
+    from miner_sentinel_l2.src.utils.exec_watch import ExecWatcher
+    from miner_sentinel_l2.src.utils.triage_queue import PRIORITY_HIGH, TriageQueue
+    from miner_sentinel_l2.src.utils.procfs import ProcessKey, process_key
     from miner_sentinel_l3.src import listenbitcoin
     from miner_sentinel_l3.src.memory_info import search_in_memory_maps
 except ImportError as e:
@@ -54,6 +58,17 @@ class CryptoJackingDetector:
         # 检测结果和历史记录
         self.detection_history = []
         self.suspicious_pids = set()  # 可疑进程PID集合
+        # L2扫描期间已被早期L3验证确认的进程：(pid, starttime) -> 提交验证的L2轮次
+        self.confirmed_pids: Dict[ProcessKey, int] = {}
+        self.confirmed_lock = threading.Lock()
+        self.l2_round = 0
+        self.l3_queue: queue.Queue = queue.Queue()
+
+        # 进程事件分诊：可疑的新进程不等 L1 触发直接启动 L2 扫描
+        self.proc_events: Optional[ProcessEventMonitor] = None
+        self.exec_watcher: Optional[ExecWatcher] = None
+        self.triage_queue: Optional[TriageQueue] = None
+        self.triage_alert = threading.Event()
 
         # 统计信息
         self.stats = {
@@ -61,9 +76,12 @@ class CryptoJackingDetector:
             'l1_alerts': 0,
             'l2_scans': 0,
             'l2_suspicious': 0,
+            'l2_deferred': 0,
             'l3_verifications': 0,
             'l3_detections': 0,
-            'confirmed_miners': 0
+            'confirmed_miners': 0,
+            'triaged': 0,
+            'triage_alerts': 0
         }
 
 
@@ -111,28 +129,92 @@ class CryptoJackingDetector:
                     self.current_state = "L2_SCANNING"  # 切换到L2状态
                     return  # 退出L1监控，进入L2扫描
 
-                time.sleep(self.l1_detector.config['sampling_interval_seconds'])
+                # 等待下一次采样，期间分诊发现可疑新进程时立即进入L2
+                if self.triage_alert.wait(self.l1_detector.config['sampling_interval_seconds']):
+                    self.triage_alert.clear()
+                    print("🔔 [分诊→L2] 发现可疑新进程，跳过L1触发直接启动L2进程扫描")
+                    self.current_state = "L2_SCANNING"
+                    return
 
             except Exception as e:
                 print(f"[L1] 监控出错: {e}")
                 time.sleep(self.l1_detector.config['sampling_interval_seconds'])
 
+    def _ensure_triage(self) -> TriageQueue:
+        """创建分诊队列并启动分诊线程（进程事件与 exec 监视共用）"""
+        if self.triage_queue is None:
+            config = self.l2_detector.config.get('proc_events', {})
+            self.triage_queue = TriageQueue(config.get('triage_queue_size', 4096))
+            threading.Thread(target=self._triage_worker, name="triage", daemon=True).start()
+        return self.triage_queue
+
+    def start_proc_events(self):
+        """启动进程事件订阅"""
+        config = self.l2_detector.config.get('proc_events', {})
+        self.proc_events = ProcessEventMonitor(config, self._ensure_triage()).start()
+
+    def start_exec_watch(self):
+        """启动可写目录 exec 监视，命中的进程以高优先级分诊"""
+        config = self.l2_detector.config.get('exec_watch', {})
+        self.exec_watcher = ExecWatcher(config, self._ensure_triage()).start()
+
+    def _triage_worker(self):
+        """消费分诊队列：新进程只运行轻量检测器，可疑时加入下一轮L2深度分析"""
+        while True:
+            item = self.triage_queue.get(timeout=1.0)
+            if item is None:
+                continue
+            try:
+                result = self.l2_detector.triage(item.pid)
+            except Exception as e:
+                print(f"[分诊] PID {item.pid} 分诊出错: {e}")
+                continue
+            self.stats['triaged'] += 1
+            if result is None:
+                continue
+            # 可写目录中的 exec 本身即为高风险信号，不论分诊得分都绕过L1直接进入L2
+            if result.status == "SUSPICIOUS" or item.priority == PRIORITY_HIGH:
+                self.stats['triage_alerts'] += 1
+                where = f" {item.path}" if item.path else ""
+                print(f"⚠️  [分诊可疑] {item.pid} ({item.source}{where}) 得分: {result.total_score:.2f}")
+                self.l2_detector.request_scan([item.pid])
+                self.triage_alert.set()
+
     def run_l2_scanning(self):
-        """L2层进程扫描 - 扫描所有进程寻找可疑行为"""
+        """L2层进程扫描 - 流式扫描进程，高分可疑进程立即送入L3验证"""
         print("\n\n\n[L2] 启动全进程扫描...")
+        streaming_config = self.l2_detector.config.get('streaming', {})
+        early_threshold = streaming_config.get('early_l3_threshold', 0.7)
+        early_l3_timeout = streaming_config.get('early_l3_timeout_seconds', 60)
+        self.l2_round += 1
+        with self.confirmed_lock:
+            self.confirmed_pids.clear()
+        worker = self._start_early_l3_worker()
         try:
             self.stats['l2_scans'] += 1
-            processes = self.system_utils.get_all_processes()
-            print('[L2] 总共有{}个进程待确认！'.format(len(processes)))
-            for process in processes:
-                try:
-                    result = self.l2_detector.analyze_process(process.pid)
-                    if result and result.status in ["SUSPICIOUS"]:
-                        self.suspicious_pids.add(process.pid)
-                        print(f"⚠️  [L2可疑] {process.pid}")
-                except Exception as e:
-                    print(f"[L2] 分析进程 {process.pid} 出错: {e}")
-                    continue
+            for result in self.l2_detector.iter_scan():
+                pid = result.process_id
+                if result.status in ["SUSPICIOUS"]:
+                    self.suspicious_pids.add(pid)
+                    # 进程树 / 会话整体可疑时，成员进程同样需要 L3 内存验证
+                    self.suspicious_pids.update(result.related_pids)
+                    print(f"⚠️  [L2可疑] {pid}")
+                    # 高分进程不等整机扫描结束，立即进行一次L3内存验证
+                    if result.total_score >= early_threshold:
+                        key = process_key(pid)
+                        if key is not None:
+                            self.l3_queue.put(key)
+            incremental_stats = self.l2_detector.incremental.stats
+            print(f"[L2] 本轮重新分析{incremental_stats['analyzed']}个进程, 复用上轮结果{incremental_stats['reused']}个"
+                  f", 结果过期重新分析{incremental_stats.get('expired', 0)}个")
+            self.stats['l2_deferred'] += self.l2_detector.last_coverage.get('deferred', 0)
+
+            # 等待已提交的早期L3验证完成；内存读取阻塞时不无限等待，验证线程在后台继续
+            self.l3_queue.put(None)
+            worker.join(early_l3_timeout)
+            if worker.is_alive():
+                print(f"⚠️  [L2→L3] 早期L3验证{early_l3_timeout}秒内未完成，不再等待")
+
             # 如果没有发现可疑进程，返回L1继续监控
             if len(self.suspicious_pids) == 0:
                 print("✅ [L2→L1] 未发现可疑进程，返回L1监控")
@@ -144,9 +226,112 @@ class CryptoJackingDetector:
 
         except Exception as e:
             print(f"[L2] 扫描出错: {e}")
+            self.l3_queue.put(None)
             self.current_state = "L1_MONITORING"
             return
 
+    def _start_early_l3_worker(self) -> threading.Thread:
+        """启动早期L3验证线程，消费L2流式产出的高分可疑进程"""
+        self.l3_queue = queue.Queue()
+        worker = threading.Thread(target=self._early_l3_worker, args=(self.l3_queue, self.l2_round),
+                                  name="early-l3", daemon=True)
+        worker.start()
+        return worker
+
+    def _early_l3_worker(self, l3_queue: queue.Queue, l2_round: int):
+        keywords = None
+        while True:
+            # 使用启动时的队列：未按时结束的旧线程不会消费下一轮的队列
+            key = l3_queue.get()
+            if key is None:
+                return
+            pid = key[0]
+            if key in self.confirmed_pids:
+                continue
+            if keywords is None:
+                keywords = self._fetch_block_keywords()
+                if keywords is None:
+                    continue
+            print(f"🔍 [L2→L3早期验证] 立即检查高分进程 PID {pid}")
+            output_file = f"tmp_early_mem_info_{pid}.txt"
+            try:
+                if self._check_process_memory(pid, keywords, output_file):
+                    with self.confirmed_lock:
+                        # 超时后仍在运行的旧线程：确认结果只属于其提交时的轮次，不计入当前轮
+                        if l2_round != self.l2_round:
+                            print(f"[L3早期确认] PID {pid} 的验证结果来自第{l2_round}轮L2扫描，已过期，忽略")
+                            continue
+                        self.confirmed_pids[key] = l2_round
+                    self.stats['l3_detections'] += 1
+                    print(f"🎯 [L3早期确认] PID {pid} 内存中发现最新区块头字段")
+            finally:
+                try:
+                    os.remove(output_file)
+                except OSError:
+                    pass
+
+    def _fetch_block_keywords(self) -> Optional[List[str]]:
+        """获取最新比特币区块头的搜索关键词，失败返回None"""
+        try:
+            block_header = listenbitcoin.get_latest_block_header()
+            previous_block_hash = block_header["previous_block_hash"]
+            previous_block_hash_modify = block_header["previous_block_hash_modify"]
+            keywords = [previous_block_hash, previous_block_hash_modify]
+            print(f"✅ [L3] 获取最新区块头成功")
+            print(f"🎯 [L3] 搜索关键词: {', '.join([k[:8] + '...' for k in keywords])}")
+            return keywords
+        except Exception as e:
+            print(f"⚠️  [L3] 获取最新区块头失败: {e}")
+            return None
+
+    def _check_process_memory(self, pid: int, keywords: List[str], output_file: str) -> bool:
+        """提取进程内存数据并检查是否包含关键词"""
+        self._extract_process_memory_to_file(pid, output_file)
+
+        matched = False
+        with open(output_file, 'r') as f:
+            content = f.read()
+            for keyword in keywords:
+                if keyword in content:
+                    # 找到包含关键词的行
+                    lines = content.split('\n')
+                    for line in lines:
+                        if keyword in line:
+                            print(f"🎯 [L3] 匹配到关键字段: {line}")
+                            matched = True
+                            break  # 每个关键词只打印第一个匹配行
+        return matched
+
+    def _memory_regions(self, pid):
+        """L3 需要读取的内存区域：(地址范围文本, 起始地址, 大小)
+
+        优先使用 L2 maps 分析给出的区域排序，只读取 JIT、隐藏代码、堆和匿名可写映射；
+        无法得到排序时退回读取 maps 中所有可读区域。
+        """
+        try:
+            ranked = self.l2_detector.maps_analyzer.ranked_regions(pid)
+        except Exception:
+            ranked = []
+        if ranked:
+            return [(region.addr_range, region.start, region.size) for region in ranked]
+
+        regions = []
+        with open(f"/proc/{pid}/maps", "r") as maps_file:
+            for line in maps_file:
+                parts = line.strip().split()
+                if len(parts) < 5:
+                    continue
+                # 只处理有读权限的区域
+                if 'r' not in parts[1]:
+                    continue
+                try:
+                    start_addr, end_addr = parts[0].split('-')
+                    start_addr = int(start_addr, 16)
+                    regions.append((parts[0], start_addr, int(end_addr, 16) - start_addr))
+                except ValueError:
+                    continue
+        return regions
+
     def _extract_process_memory_to_file(self, pid, output_file):
         """提取进程内存数据到文件，按照结构化格式输出"""
         try:
@@ -166,52 +351,33 @@ class CryptoJackingDetector:
 
                 compiled_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in mining_patterns]
 
-                # 读取maps文件
-                with open(f"/proc/{pid}/maps", "r") as maps_file:
-                    maps_content = maps_file.readlines()
+                regions = self._memory_regions(pid)
 
-                for line in maps_content:
-                    parts = line.strip().split()
-                    if len(parts) < 5:
-                        continue
-
-                    addr_range = parts[0]
-                    perms = parts[1]
-                    pathname = parts[-1] if len(parts) > 5 else "[anonymous]"
-
-                    # 只处理有读权限的区域
-                    if 'r' not in perms:
-                        continue
+                with open(f"/proc/{pid}/mem", "rb") as mem_file:
+                    for addr_range, start_addr, size in regions:
+                        try:
+                            # 读取内存（限制大小）
+                            max_read_size = 512 * 1024  # 512KB per region
+                            read_size = min(size, max_read_size)
 
-                    try:
-                        start_addr, end_addr = addr_range.split('-')
-                        start_addr = int(start_addr, 16)
-                        end_addr = int(end_addr, 16)
-                        size = end_addr - start_addr
-
-                        # 读取内存（限制大小）
-                        max_read_size = 512 * 1024  # 512KB per region
-                        read_size = min(size, max_read_size)
-
-                        with open(f"/proc/{pid}/mem", "rb") as mem_file:
                             mem_file.seek(start_addr)
                             content = mem_file.read(read_size)
 
-                        # 解码为文本
-                        text_content = content.decode('utf-8', errors='ignore')
-
-                        # 搜索挖矿相关模式
-                        for pattern in compiled_patterns:
-                            matches = pattern.findall(text_content)
-                            for match in matches:
-                                # 结构化输出
-                                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                result_line = f"process={pid}, time={current_time}, address={addr_range}, string={match}"
-                                f.write(result_line + "\n")
-                                total_found += 1
-
-                    except Exception:
-                        continue
+                            # 解码为文本
+                            text_content = content.decode('utf-8', errors='ignore')
+
+                            # 搜索挖矿相关模式
+                            for pattern in compiled_patterns:
+                                matches = pattern.findall(text_content)
+                                for match in matches:
+                                    # 结构化输出
+                                    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                                    result_line = f"process={pid}, time={current_time}, address={addr_range}, string={match}"
+                                    f.write(result_line + "\n")
+                                    total_found += 1
+
+                        except Exception:
+                            continue
             print(f"💾 [L3] PID {pid} 内存数据已保存到: {output_file} (找到 {total_found} 个字符串)")
             return True
         except Exception as e:
@@ -227,6 +393,8 @@ class CryptoJackingDetector:
             temp_file = "tmp_suspicious_mem_info.txt"
             os.remove(temp_file)
             print(f"🧹 [L3] 已清理临时文件: {temp_file}")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"⚠️ [L3] 清理临时文件失败: {e}")
 
@@ -244,35 +412,39 @@ class CryptoJackingDetector:
             check_interval = 60  # 60秒
             max_checks = 15  # 最多15次检查
 
-            print(f"🔍 [L3] 开始监控 {len(self.suspicious_pids)} 个可疑进程")
-            print(f"📊 [L3] 监控参数: {monitoring_duration}分钟, {check_interval}秒间隔, 最多{max_checks}次检查")
+            # L2 扫描期间已被本轮早期验证确认的进程无需再等待监控周期（PID 被复用的不算）
+            with self.confirmed_lock:
+                confirmed = {key[0] for key, l2_round in self.confirmed_pids.items()
+                             if l2_round == self.l2_round and process_key(key[0]) == key}
+                self.confirmed_pids.clear()
+            if confirmed:
+                print(f"\n🎯 [L3结果] L2扫描期间已确认挖矿进程: {confirmed}")
+            else:
+                print(f"🔍 [L3] 开始监控 {len(self.suspicious_pids)} 个可疑进程")
+                print(f"📊 [L3] 监控参数: {monitoring_duration}分钟, {check_interval}秒间隔, 最多{max_checks}次检查")
 
             # 为每个可疑进程创建监控记录
             process_monitoring_data = {pid: {'found': False, 'checks': 0} for pid in self.suspicious_pids}
 
             check_count = 0
-            mining_detected = False
+            # 已有早期确认时跳过监控循环，直接进入结果总结与清理
+            mining_detected = bool(confirmed)
 
             while check_count < max_checks and not mining_detected:
                 check_count += 1
                 print(f"\n📋 [L3] 第 {check_count} 次检查 (时间: {datetime.now().strftime('%H:%M:%S')})")
 
                 # 在每次检查时获取最新的比特币区块头信息
-                try:
-                    block_header = listenbitcoin.get_latest_block_header()
-                    previous_block_hash = block_header["previous_block_hash"]
-                    previous_block_hash_modify = block_header["previous_block_hash_modify"]
-                    keywords = [previous_block_hash, previous_block_hash_modify]
-                    print(f"✅ [L3] 获取最新区块头成功")
-                    print(f"🎯 [L3] 搜索关键词: {', '.join([k[:8] + '...' for k in keywords])}")
-                except Exception as e:
-                    print(f"⚠️  [L3] 获取最新区块头失败: {e}，跳过本次检查")
+                keywords = self._fetch_block_keywords()
+                if keywords is None:
+                    print("⚠️  [L3] 跳过本次检查")
                     # 等待后继续下一次检查
                     if check_count < max_checks:
                         time.sleep(check_interval)
                     continue
 
-                for target_pid in list(self.suspicious_pids):  # 使用list避免在迭代时修改
+                # 同一容器（网络命名空间）的进程相邻读取
+                for target_pid in self.l2_detector.container_resolver.order(self.suspicious_pids):
                     if process_monitoring_data[target_pid]['found']:
                         continue
 
@@ -281,24 +453,12 @@ class CryptoJackingDetector:
                     print(
                         f"🔍 [L3] 检查 PID {target_pid} ({process_monitoring_data[target_pid]['checks']}/{max_checks})")
 
-                    # 1) 提取内存数据并保存到文件
+                    # 1) 提取内存数据并保存到文件  2) 检查是否匹配关键词
                     output_file = f"tmp_suspicious_mem_info.txt"
-                    self._extract_process_memory_to_file(target_pid, output_file)
-
-                    # 2) 检查是否匹配关键词
-                    match_count = 0
-                    with open(output_file, 'r') as f:
-                        content = f.read()
-                        for keyword in keywords:
-                            if keyword in content:
-                                # 找到包含关键词的行
-                                lines = content.split('\n')
-                                for line in lines:
-                                    if keyword in line:
-                                        print(f"🎯 [L3] 匹配到关键字段: {line}")
-                                        match_count += 1
-                                        mining_detected = True
-                                        break  # 每个关键词只打印第一个匹配行
+                    if self._check_process_memory(target_pid, keywords, output_file):
+                        process_monitoring_data[target_pid]['found'] = True
+                        confirmed.add(target_pid)
+                        mining_detected = True
 
 
                 # 如果已经发现挖矿进程，提前结束
@@ -312,7 +472,8 @@ class CryptoJackingDetector:
 
             # 3) 检查结果总结
             if mining_detected:
-                print(f"\n🎯 [L3结果] 发现挖矿进程！")
+                self.stats['confirmed_miners'] += len(confirmed)
+                print(f"\n🎯 [L3结果] 发现挖矿进程！{sorted(confirmed)}")
             else:
                 print(
                     f"\n✅ [L3结果] 所有 {len(self.suspicious_pids)} 个可疑进程经过 {check_count} 次检查，未发现挖矿特征")
@@ -360,6 +521,10 @@ class CryptoJackingDetector:
     def stop_monitoring(self):
         """停止监控"""
         self.running = False
+        if self.proc_events is not None:
+            self.proc_events.stop()
+        if self.exec_watcher is not None:
+            self.exec_watcher.stop()
         print("监控已停止")
         print(f"统计信息: {json.dumps(self.stats, indent=2, ensure_ascii=False)}")
 
@@ -367,9 +532,17 @@ class CryptoJackingDetector:
 def main():
     parser = argparse.ArgumentParser(description='挖矿木马检测主程序')
     parser.add_argument('--monitor', '-m', action='store_true', help='持续监控模式')
+    parser.add_argument('--proc-events', action='store_true',
+                        help='订阅进程 fork/exec/exit 事件，新进程立即分诊（也可在 l2_scanner.yaml 中启用）')
+    parser.add_argument('--exec-watch', action='store_true',
+                        help='监视 /tmp、/dev/shm 等可写目录中的 exec，命中进程直接进入L2（也可在 l2_scanner.yaml 中启用）')
     args = parser.parse_args()
     detector = CryptoJackingDetector()
     if args.monitor:
+        if args.proc_events or detector.l2_detector.config.get('proc_events', {}).get('enabled', False):
+            detector.start_proc_events()
+        if args.exec_watch or detector.l2_detector.config.get('exec_watch', {}).get('enabled', False):
+            detector.start_exec_watch()
         detector.start_monitoring()
     else:
         parser.print_help()
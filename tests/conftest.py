@@ -0,0 +1,20 @@
+import subprocess
+import sys
+
+import pytest
+
+from miner_sentinel_l2.src.detectors.pid_status_scan import PidStatusScanner
+
+
+@pytest.fixture
+def scanner():
+    return PidStatusScanner()
+
+
+@pytest.fixture
+def child():
+    """一个空闲的子进程，特征可以按需覆盖"""
+    proc = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+    yield proc
+    proc.kill()
+    proc.wait()
@@ -0,0 +1,50 @@
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+
+from miner_sentinel_l2.src.detectors.batch_scorer import FEATURE_NAMES, FeatureMatrix
+from miner_sentinel_l2.src.utils.procfs import ProcessSnapshot
+
+
+def _random_matrix(n=200, seed=7):
+    rng = np.random.default_rng(seed)
+    values = np.zeros((len(FEATURE_NAMES), n))
+    ranges = {'cpu_current': 100, 'cpu_avg': 100, 'cpu_std': 20, 'uptime': 7200, 'rss_mb': 1000,
+              'connections': 10, 'mining_connections': 3, 'saturated_threads': 8, 'thread_cv': 0.5}
+    for i, name in enumerate(FEATURE_NAMES):
+        if name in ranges:
+            values[i] = rng.uniform(0, ranges[name], n)
+        else:
+            values[i] = rng.integers(0, 2, n)
+    return FeatureMatrix(list(range(n)), values, [{}] * n)
+
+
+def test_score_matrix_matches_score_features(scanner):
+    scorer = scanner.batch_scorer
+    fm = _random_matrix()
+    matrix = scorer.score_matrix(fm)
+    for j in range(len(fm)):
+        scalar = scorer.score_features(fm.column(j))
+        for key, value in scalar.items():
+            assert matrix[key][j] == value, (j, key)
+
+
+def test_results_keep_original_process_name(scanner, tmp_path):
+    binary = tmp_path / 'XMRig'
+    shutil.copy(sys.executable, binary)
+    proc = subprocess.Popen([str(binary), '-c', 'import time; time.sleep(30)'])
+    try:
+        snapshot = ProcessSnapshot.take()
+        fm = scanner.feature_collector.collect(snapshot, None, [proc.pid])
+    finally:
+        proc.kill()
+        proc.wait()
+    assert fm.context[0]['name'] == 'XMRig'
+    assert fm.column(0)['name_keyword'] == 1.0
+
+
+def test_batch_parity_on_idle_process(scanner, child):
+    scanner.snapshot = ProcessSnapshot.take()
+    assert scanner.batch_parity([child.pid]) == {}
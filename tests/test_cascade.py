@@ -0,0 +1,68 @@
+import time
+
+from miner_sentinel_l2.src.detectors.cascade import DetectorCascade, DetectorStage, StageOutput
+
+
+def _stage(name, weight, score, calls, delay=0.0):
+    def run(_):
+        calls.append(name)
+        if delay:
+            time.sleep(delay)
+        return StageOutput(score, score, [])
+    return DetectorStage(name, weight, run)
+
+
+def test_below_exit_skips_remaining_stages():
+    calls = []
+    cascade = DetectorCascade([_stage('a', 0.5, 0.0, calls), _stage('b', 0.3, 1.0, calls),
+                               _stage('c', 0.1, 1.0, calls)], threshold=0.5)
+    outcome = cascade.run(None)
+    # a 得 0 后剩余权重 0.4 已不可能达到 0.5
+    assert outcome.early_exit == 'below'
+    assert calls == ['a']
+    assert outcome.skipped == ['b', 'c']
+
+
+def test_above_exit_once_threshold_reached():
+    calls = []
+    cascade = DetectorCascade([_stage('a', 0.6, 1.0, calls), _stage('b', 0.3, 0.0, calls)], threshold=0.5)
+    outcome = cascade.run(None)
+    assert outcome.early_exit == 'above'
+    assert outcome.total_score == 0.6
+    assert calls == ['a']
+
+
+def test_complete_run_without_early_exit():
+    calls = []
+    cascade = DetectorCascade([_stage('a', 0.5, 0.4, calls), _stage('b', 0.5, 0.4, calls)],
+                              threshold=0.5, early_exit=False)
+    outcome = cascade.run(None)
+    assert outcome.early_exit is None
+    assert abs(outcome.total_score - 0.4) < 1e-9
+    assert cascade.exit_counts['complete'] == 1
+
+
+def test_deadline_returns_partial_result():
+    calls = []
+    cascade = DetectorCascade([_stage('a', 0.4, 0.5, calls, delay=0.05), _stage('b', 0.4, 1.0, calls)],
+                              threshold=0.5)
+    outcome = cascade.run(None, deadline=time.monotonic() + 0.01)
+    assert outcome.early_exit == 'deadline'
+    assert calls == ['a']
+    assert outcome.skipped == ['b']
+
+
+def test_precomputed_stages_are_not_run():
+    calls = []
+    cascade = DetectorCascade([_stage('a', 0.5, 0.0, calls), _stage('b', 0.5, 0.0, calls)], threshold=0.5)
+    outcome = cascade.run(None, precomputed={'b': StageOutput(1.0, 1.0, [])})
+    assert outcome.early_exit == 'above'
+    assert calls == []
+
+
+def test_stages_ordered_by_cost_per_weight():
+    calls = []
+    cascade = DetectorCascade([_stage('slow', 0.5, 0.0, calls), _stage('fast', 0.5, 0.0, calls)])
+    cascade.record_cost('slow', 1.0)
+    cascade.record_cost('fast', 0.01)
+    assert [stage.name for stage in cascade.ordered_stages()] == ['fast', 'slow']
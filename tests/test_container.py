@@ -0,0 +1,45 @@
+from miner_sentinel_l2.src.utils.container import ContainerInfo, ContainerResolver
+
+CID = 'a' * 64
+POD = '0a1b2c3d-0000-1111-2222-333344445555'
+
+
+def test_parse_docker_scope():
+    assert ContainerResolver.parse_cgroup(f'0::/system.slice/docker-{CID}.scope') == ('docker', CID, '')
+
+
+def test_parse_cgroup_v1_docker():
+    assert ContainerResolver.parse_cgroup(f'12:cpu,cpuacct:/docker/{CID}') == ('docker', CID, '')
+
+
+def test_parse_kubepods_systemd_driver():
+    cgroup = (f"0::/kubepods.slice/kubepods-burstable.slice/kubepods-burstable-pod{POD.replace('-', '_')}.slice/"
+              f"cri-containerd-{CID}.scope")
+    assert ContainerResolver.parse_cgroup(cgroup) == ('cri-containerd', CID, POD)
+
+
+def test_parse_kubepods_cgroupfs_driver():
+    cgroup = f'0::/kubepods/besteffort/pod{POD}/{CID}'
+    assert ContainerResolver.parse_cgroup(cgroup) == ('kubepods', CID, POD)
+
+
+def test_parse_lxc():
+    assert ContainerResolver.parse_cgroup('0::/lxc.payload.web01/init.scope')[:2] == ('lxc', 'web01')
+
+
+def test_parse_host_process():
+    assert ContainerResolver.parse_cgroup('0::/user.slice/user-1000.slice/session-2.scope') == ('', '', '')
+
+
+def test_reset_drops_cgroups_not_seen_this_round():
+    resolver = ContainerResolver()
+    info = ContainerInfo('/docker/x', CID, 'docker', '', 1, 2, 3)
+    resolver.by_cgroup = {'/docker/x': info, '/docker/y': info._replace(cgroup='/docker/y')}
+    resolver.ns_pids = {'/docker/x': {10: 1, 11: 2}, '/docker/y': {20: 1}}
+    resolver.seen_cgroups = {'/docker/x'}
+
+    resolver.reset(alive=[10])
+
+    assert list(resolver.by_cgroup) == ['/docker/x']
+    assert resolver.ns_pids == {'/docker/x': {10: 1}}
+    assert resolver.seen_cgroups == set()
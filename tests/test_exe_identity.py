@@ -0,0 +1,42 @@
+from miner_sentinel_l2.src.utils.exe_identity import ExeIdentity
+
+
+def _identity(verdict):
+    return ExeIdentity('/usr/bin/worker', 1, 2, 3, 4, 5, 'ab' * 32, verdict)
+
+
+def _benign(ctx):
+    ctx.set('name', 'worker')
+    ctx.set('cmdline', ['/usr/bin/worker'])
+    ctx.set('username', 'nobody')
+    ctx.set('cpu_percent', 0.0)
+    ctx.set('connections', [])
+
+
+def test_known_miner_hash_is_suspicious(scanner, child):
+    ctx = scanner.feature_graph.context(child.pid)
+    _benign(ctx)
+    ctx.set('exe_identity', _identity('miner'))
+    # ML 判定为正常、融合后加权总分低于阈值时仍然判定为可疑
+    scanner.ml_scores[child.pid] = 0.0
+    scanner.ml_weight = 0.5
+
+    result = scanner._run_detectors(ctx)
+
+    assert result.total_score < scanner.suspicious_threshold
+    assert result.status == 'SUSPICIOUS'
+
+
+def test_unknown_hash_is_scored_normally(scanner, child):
+    ctx = scanner.feature_graph.context(child.pid)
+    _benign(ctx)
+    ctx.set('exe_identity', _identity('unknown'))
+
+    assert scanner._run_detectors(ctx).status == 'NORMAL'
+
+
+def test_known_good_hash_skips_detection(scanner, child):
+    ctx = scanner.feature_graph.context(child.pid)
+    ctx.set('exe_identity', _identity('good'))
+
+    assert scanner._known_good(ctx)
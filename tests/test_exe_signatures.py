@@ -0,0 +1,77 @@
+import threading
+
+from miner_sentinel_l2.src.utils.exe_signatures import ExeSignatureScanner
+
+RULES = """
+rules:
+  - name: algorithms
+    description: "算法名"
+    score: 0.4
+    min_matches: 2
+    strings:
+      - text: "cn/r"
+      - text: "rx/0"
+"""
+
+
+def _scanner(tmp_path, **config):
+    rules = tmp_path / 'rules.yaml'
+    rules.write_text(RULES, encoding='utf-8')
+    return ExeSignatureScanner(dict(config, rules_path=str(rules)))
+
+
+def test_overlapping_patterns_are_both_reported(tmp_path):
+    scanner = _scanner(tmp_path)
+    binary = tmp_path / 'miner'
+    binary.write_bytes(b'\x00' * 4096 + b'algo cn/rx/0 ' + b'\x00' * 4096)
+
+    result = scanner.scan_file(str(binary))
+
+    assert result.rules == ('algorithms',)
+    assert result.matched == 2
+
+
+def test_cache_is_bounded_lru(tmp_path):
+    scanner = _scanner(tmp_path, max_cache_entries=2)
+    paths = []
+    for i in range(3):
+        path = tmp_path / f'bin{i}'
+        path.write_bytes(b'cn/r' * (i + 1))
+        paths.append(str(path))
+
+    scanner.scan_file(paths[0])
+    scanner.scan_file(paths[1])
+    scanner.scan_file(paths[0])   # bin0 成为最近使用
+    scanner.scan_file(paths[2])   # 淘汰 bin1
+
+    assert len(scanner.cache) == 2
+    scanner.scan_file(paths[0])
+    assert scanner.stats['cached'] == 2
+    scanner.scan_file(paths[1])
+    assert scanner.stats['scanned'] == 4
+
+
+def test_concurrent_scans(tmp_path):
+    scanner = _scanner(tmp_path, max_cache_entries=4)
+    paths = []
+    for i in range(16):
+        path = tmp_path / f'bin{i}'
+        path.write_bytes(b'rx/0' + bytes([i]) * 64)
+        paths.append(str(path))
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(20):
+                for path in paths:
+                    scanner.scan_file(path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(scanner.cache) <= 4
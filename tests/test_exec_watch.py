@@ -0,0 +1,58 @@
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+from miner_sentinel_l2.src.utils.exec_watch import ExecWatcher
+
+
+def test_default_excludes_toolchain_hidden_dirs(tmp_path):
+    watcher = ExecWatcher({'paths': [], 'home_roots': [str(tmp_path)]})
+    home = os.path.realpath(str(tmp_path))
+    assert not watcher.watched(f'{home}/.pyenv/versions/3.12.0/bin/python3.12')
+    assert watcher.watched(f'{home}/.cache/kdevtmpfsi')
+
+
+def _inotify_watcher(tmp_path, **config):
+    config = dict({'paths': [str(tmp_path)], 'hidden_home': False, 'use_fanotify': False,
+                   'poll_interval_seconds': 30.0}, **config)
+    watcher = ExecWatcher(config).start()
+    if watcher.mode != 'inotify':
+        watcher.stop()
+        pytest.skip('inotify 不可用')
+    return watcher
+
+
+def test_open_events_are_debounced(tmp_path):
+    watcher = _inotify_watcher(tmp_path, min_sweep_interval_seconds=0.5)
+    try:
+        target = tmp_path / 'data'
+        target.write_bytes(b'x')
+        deadline = time.monotonic() + 1.2
+        while time.monotonic() < deadline:
+            with open(target, 'rb'):
+                pass
+            time.sleep(0.005)
+        time.sleep(0.6)
+    finally:
+        watcher.stop()
+    assert watcher.stats['events'] > 50
+    # 启动时 1 次 + 事件触发的扫描每 0.5 秒最多 1 次
+    assert watcher.stats['sweeps'] <= 5
+
+
+def test_exec_from_watched_dir_is_queued(tmp_path):
+    binary = tmp_path / 'runjob'
+    shutil.copy(sys.executable, binary)
+    watcher = _inotify_watcher(tmp_path)
+    proc = subprocess.Popen([str(binary), '-c', 'import time; time.sleep(30)'])
+    try:
+        item = watcher.queue.get(timeout=3)
+    finally:
+        proc.kill()
+        proc.wait()
+        watcher.stop()
+    assert item is not None and item.pid == proc.pid
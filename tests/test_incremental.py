@@ -0,0 +1,37 @@
+from miner_sentinel_l2.src.detectors.incremental import IncrementalScanCache
+from miner_sentinel_l2.src.models.detection_result import DetectionResult
+from miner_sentinel_l2.src.utils.process_state_store import ProcessStateStore
+
+KEY = (100, 1)
+FINGERPRINT = (1, 2, 3, 0)
+
+
+def _cache(**config):
+    return IncrementalScanCache(ProcessStateStore(), config)
+
+
+def test_unchanged_fingerprint_reuses_a_copy():
+    cache = _cache()
+    result = DetectionResult(process_id=100, process_name='worker', total_score=0.3, evidences=['a'])
+    cache.store(KEY, FINGERPRINT, result)
+
+    reused = cache.lookup(KEY, FINGERPRINT)
+
+    assert reused is not result
+    assert (reused.process_name, reused.total_score, reused.evidences) == ('worker', 0.3, ['a'])
+    reused.evidences.append('b')
+    assert result.evidences == ['a']
+
+
+def test_changed_fingerprint_is_reanalyzed():
+    cache = _cache()
+    cache.store(KEY, FINGERPRINT, DetectionResult(process_id=100))
+    assert cache.lookup(KEY, FINGERPRINT[:3] + (1,)) is None
+
+
+def test_result_expires_after_max_age():
+    cache = _cache(max_age_seconds=0.01)
+    cache.store(KEY, FINGERPRINT, DetectionResult(process_id=100))
+    cache.state_store.get(KEY).attrs[cache.ANALYZED_ATTR] -= 1.0
+    assert cache.lookup(KEY, FINGERPRINT) is None
+    assert cache.stats['expired'] == 1
@@ -0,0 +1,28 @@
+from miner_sentinel_l2.src.utils.ioc_matcher import AhoCorasickAutomaton, IOCMatcher
+
+
+def test_overlapping_and_nested_patterns():
+    automaton = AhoCorasickAutomaton()
+    for pattern in ('he', 'she', 'his', 'hers'):
+        automaton.add(pattern, 'word')
+    assert automaton.search('ushers') == {'word': {'he', 'she', 'hers'}}
+
+
+def test_tags_are_reported_separately():
+    automaton = AhoCorasickAutomaton()
+    automaton.add('xmrig', 'name')
+    automaton.add('rig', 'keyword')
+    assert automaton.search('run xmrig') == {'name': {'xmrig'}, 'keyword': {'rig'}}
+
+
+def test_bytes_patterns():
+    automaton = AhoCorasickAutomaton()
+    automaton.add(b'cn/r', 'signature')
+    automaton.add(b'rx/0', 'signature')
+    assert automaton.search(b'\x00cn/rx/0\x00') == {'signature': {b'cn/r', b'rx/0'}}
+
+
+def test_matcher_is_case_insensitive():
+    hits = IOCMatcher().match('XMRig --url=STRATUM+TCP://pool:3333')
+    assert 'xmrig' in hits['name_keyword']
+    assert hits['pattern']
@@ -0,0 +1,33 @@
+from miner_sentinel_l2.src.utils.proc_events import (
+    _CN_MSG, _EXEC_EXIT, _FORK, _NLMSGHDR, _PROC_EVENT, CN_IDX_PROC, CN_VAL_PROC, NLMSG_DONE,
+    PROC_EVENT_EXEC, PROC_EVENT_EXIT, PROC_EVENT_FORK, ProcConnector, ProcEvent)
+
+
+def _message(what, body):
+    event = _PROC_EVENT.pack(what, 0, 2_000_000_000) + body
+    cn = _CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(event), 0)
+    payload = cn + event
+    data = _NLMSGHDR.pack(_NLMSGHDR.size + len(payload), NLMSG_DONE, 0, 0, 0) + payload
+    return data + b'\0' * (-len(data) % 4)
+
+
+def test_parse_process_events():
+    data = (_message(PROC_EVENT_FORK, _FORK.pack(100, 100, 200, 200))
+            + _message(PROC_EVENT_EXEC, _EXEC_EXIT.pack(200, 200) + b'\0' * 8)
+            + _message(PROC_EVENT_EXIT, _EXEC_EXIT.pack(200, 200) + b'\0' * 8))
+    assert ProcConnector.parse(data) == [
+        ProcEvent('fork', 200, 100, 2.0),
+        ProcEvent('exec', 200, 0, 2.0),
+        ProcEvent('exit', 200, 0, 2.0),
+    ]
+
+
+def test_thread_events_are_filtered():
+    data = (_message(PROC_EVENT_FORK, _FORK.pack(100, 100, 201, 200))
+            + _message(PROC_EVENT_EXIT, _EXEC_EXIT.pack(201, 200) + b'\0' * 8))
+    assert ProcConnector.parse(data) == []
+
+
+def test_truncated_datagram():
+    data = _message(PROC_EVENT_EXEC, _EXEC_EXIT.pack(300, 300) + b'\0' * 8)
+    assert ProcConnector.parse(data[:_NLMSGHDR.size + 4]) == []
@@ -0,0 +1,34 @@
+from miner_sentinel_l2.src.utils.process_state_store import ProcessStateStore, RingBuffer
+
+
+def test_ring_buffer_keeps_last_values():
+    ring = RingBuffer(3)
+    for value in (1, 2, 3, 4):
+        ring.append(value)
+    assert list(ring.values()) == [2, 3, 4]
+    assert ring.mean() == 3
+    assert ring.last() == 4
+
+
+def test_pid_reuse_gets_fresh_history():
+    store = ProcessStateStore(history_size=4)
+    store.ring((100, 1), 'cpu').append(90.0)
+    assert len(store.ring((100, 2), 'cpu')) == 0
+
+
+def test_evict_dead_processes():
+    store = ProcessStateStore()
+    store.get((1, 1))
+    store.get((2, 1))
+    assert store.evict_dead({(2, 1)}) == 1
+    assert (1, 1) not in store and (2, 1) in store
+
+
+def test_memory_cap_evicts_least_recently_used():
+    store = ProcessStateStore(history_size=1024, max_memory_mb=0.02)
+    for pid in range(5):
+        store.ring((pid, 0), 'cpu')
+    store.get((4, 0))
+    assert store.evicted_lru > 0
+    assert (4, 0) in store
+    assert store.total_bytes <= store.max_bytes
@@ -0,0 +1,31 @@
+from miner_sentinel_l2.src.detectors.base import FeatureGraph
+from miner_sentinel_l2.src.detectors.randomx_detector import RandomXFootprintDetector
+from miner_sentinel_l2.src.utils.procfs import ProcStat
+
+
+def _ctx(anon_mb, thp_mb=0, threads=4):
+    ctx = FeatureGraph().context(1234)
+    ctx.set('stat', ProcStat(pid=1234, comm='proc', state='R', ppid=1, session=1, flags=0, utime=0, stime=0,
+                             cutime=0, cstime=0, num_threads=threads, starttime=0, rss_pages=0))
+    ctx.set('smaps_rollup', {'Anonymous': anon_mb * 1024, 'AnonHugePages': thp_mb * 1024})
+    ctx.set('meminfo', {})
+    return ctx
+
+
+def test_light_mode_footprint_without_hugepages_is_ignored():
+    # 与 JVM / 浏览器常见的匿名内存大小相同，没有大页
+    for anon_mb in (250, 270, 300, 400, 500):
+        assert RandomXFootprintDetector().analyze(_ctx(anon_mb))['randomx_score'] == 0.0
+
+
+def test_light_mode_footprint_with_hugepages_scores():
+    result = RandomXFootprintDetector().analyze(_ctx(266, thp_mb=260))
+    assert result['randomx_score'] == 0.6
+
+
+def test_footprint_outside_tolerance_is_ignored():
+    assert RandomXFootprintDetector().analyze(_ctx(2170))['randomx_score'] == 0.0
+
+
+def test_full_dataset_footprint_scores():
+    assert RandomXFootprintDetector().analyze(_ctx(2080 + 256 + 8))['randomx_score'] == 0.5
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from miner_sentinel_l2.src.detectors.scan_budget import ScanBudget
+
+
+def test_call_returns_result_in_time():
+    budget = ScanBudget()
+    assert budget.call(lambda: 42, 1.0, 'pid-1') == (True, 42)
+
+
+def test_call_reraises_worker_errors():
+    budget = ScanBudget()
+
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        budget.call(fail, 1.0, 'pid-1')
+
+
+def test_timed_out_worker_is_abandoned_and_late():
+    budget = ScanBudget()
+    release = threading.Event()
+    seen = {}
+
+    def hang():
+        release.wait(5)
+        with budget.lock:
+            seen['late'] = budget.late()
+
+    done, value = budget.call(hang, 0.05, 'pid-1')
+    assert (done, value) == (False, None)
+    assert budget.blocked('pid-1')
+    assert budget.stats['timed_out'] == 1
+    release.set()
+    budget.stuck['pid-1'].join(2)
+    assert seen['late'] is True
+
+
+def test_worker_from_previous_round_is_late():
+    budget = ScanBudget()
+    seen = {}
+    started = threading.Event()
+    release = threading.Event()
+
+    def work():
+        started.set()
+        release.wait(5)
+        with budget.lock:
+            seen['late'] = budget.late()
+
+    thread = threading.Thread(target=work)
+    thread.scan_round = budget.round
+    thread.start()
+    started.wait(1)
+    budget.start_round()
+    release.set()
+    thread.join(2)
+    assert seen['late'] is True
+
+
+def test_current_round_worker_is_not_late():
+    budget = ScanBudget()
+    done, late = budget.call(budget.late, 1.0, 'pid-1')
+    assert done and late is False
+
+
+def test_deferred_pids_are_prioritized():
+    budget = ScanBudget()
+    budget.record(3, 'deferred', 'timeout')
+    budget.record(9, 'partial')
+    assert budget.prioritize([1, 2, 3], alive=[1, 2, 3]) == [3, 1, 2]
+    budget.record(3, 'complete')
+    assert budget.prioritize([1, 2, 3], alive=[1, 2, 3]) == [1, 2, 3]
+
+
+def test_disabled_budget_runs_inline():
+    budget = ScanBudget({'enabled': False})
+    assert budget.call(lambda: threading.current_thread(), 0.0, 'x') == (True, threading.current_thread())
+    assert budget.remaining() == float('inf')
+    assert budget.process_deadline() is None
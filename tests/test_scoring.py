@@ -0,0 +1,53 @@
+from miner_sentinel_l2.src.detectors.batch_scorer import FEATURE_NAMES
+from miner_sentinel_l2.src.detectors.cascade import DetectorCascade, DetectorStage, StageOutput
+
+
+def _cascade(scanner, scores):
+    stages = [DetectorStage(name, scanner.weights[name],
+                            lambda _, score=score: StageOutput(score, score, []))
+              for name, score in scores.items()]
+    return DetectorCascade(stages, threshold=scanner.suspicious_threshold, early_exit=False)
+
+
+def test_total_is_raw_weighted_sum(scanner):
+    outcome = _cascade(scanner, {'cpu': 1.0, 'process': 1.0}).run(None)
+    assert abs(outcome.total_score - (scanner.weights['cpu'] + scanner.weights['process'])) < 1e-9
+
+
+def test_miner_details_cross_threshold(scanner):
+    # 矿工名 + stratum 命令行 + 单核满载的典型得分
+    outcome = _cascade(scanner, {'cpu': 0.6, 'process': 1.0, 'sched_io': 0.4}).run(None)
+    assert outcome.total_score >= scanner.suspicious_threshold
+
+
+def test_busy_jvm_stays_below_threshold(scanner):
+    # 高负载 JVM：CPU、调度与 JIT 内存特征，没有任何挖矿 IOC
+    scores = {'cpu': 0.6, 'sched_io': 1.0, 'maps': 0.7, 'memory': 0.2, 'process': 0.2}
+    outcome = _cascade(scanner, scores).run(None)
+    assert outcome.total_score < scanner.suspicious_threshold
+
+
+def test_batch_and_cascade_share_scale(scanner):
+    # 批量路径与逐进程路径使用同一张权重表且都不归一化
+    features = dict.fromkeys(FEATURE_NAMES, 0.0)
+    features.update(cpu_current=100.0, cpu_avg=100.0, name_keyword=1.0, process_keyword=1.0,
+                    cmdline_keyword=1.0, cmdline_pattern=1.0)
+    scores = scanner.batch_scorer.score_features(features)
+    expected = sum(scores[name] * scanner.weights[name] for name in scanner.batch_scorer.detectors)
+    assert abs(scores['total'] - expected) < 1e-9
+    assert scores['total'] >= scanner.batch_scorer.threshold
+    assert scanner.batch_scorer.threshold == scanner.suspicious_threshold
+
+
+def test_stratum_miner_is_suspicious(scanner, child):
+    ctx = scanner.feature_graph.context(child.pid)
+    ctx.set('name', 'xmrig')
+    ctx.set('cmdline', ['xmrig', '--url=stratum+tcp://pool.example.com:3333', '--threads=1'])
+    ctx.set('username', 'nobody')
+    ctx.set('cpu_percent', 100.0)
+    ctx.set('connections', [])
+
+    result = scanner._run_detectors(ctx)
+
+    assert result.status == 'SUSPICIOUS'
+    assert result.total_score >= scanner.suspicious_threshold
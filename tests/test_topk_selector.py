@@ -0,0 +1,65 @@
+from miner_sentinel_l2.src.detectors.topk_selector import TopKSelector
+from miner_sentinel_l2.src.utils.ioc_matcher import IOCMatcher
+from miner_sentinel_l2.src.utils.procfs import ProcessSnapshot, ProcStat
+
+BASE_PID = 4000000
+
+
+def _stat(pid, comm, ticks, ppid=1):
+    return ProcStat(pid=pid, comm=comm, state='R', ppid=ppid, session=pid, flags=0, utime=ticks, stime=0,
+                    cutime=0, cstime=0, num_threads=1, starttime=100, rss_pages=0)
+
+
+def _snapshot(entries):
+    stats = {pid: _stat(pid, comm, ticks) for pid, comm, ticks in entries}
+    return ProcessSnapshot(stats, 0.0, 1000.0)
+
+
+def _selector(**config):
+    config = dict({'top_k': 2, 'top_k_trees': 0, 'min_cpu_share': 0.0}, **config)
+    return TopKSelector(config, IOCMatcher())
+
+
+def _entries():
+    return [
+        (BASE_PID + 1, 'worker', 500),
+        (BASE_PID + 2, 'worker', 400),
+        (BASE_PID + 3, 'worker', 300),
+        (BASE_PID + 4, 'origin-agent', 0),   # 只命中通用关键词 rig
+        (BASE_PID + 5, 'coinbase-sync', 0),  # 只命中通用关键词 coin
+        (BASE_PID + 6, 'xmrig', 0),          # 挖矿程序名
+    ]
+
+
+def test_first_round_is_full_scan():
+    selector = _selector()
+    snapshot = _snapshot(_entries())
+    candidates = list(snapshot.stats)
+    assert selector.select(snapshot, None, candidates) == candidates
+    assert selector.last_stats['mode_full'] == 1
+
+
+def test_top_k_bound_and_forced_selection():
+    selector = _selector()
+    snapshot = _snapshot(_entries())
+    candidates = list(snapshot.stats)
+    selector.select(snapshot, None, candidates)
+
+    selected = selector.select(snapshot, None, candidates)
+
+    assert selector.last_stats['mode_full'] == 0
+    assert selected[:2] == [BASE_PID + 1, BASE_PID + 2]
+    assert BASE_PID + 3 not in selected
+    assert BASE_PID + 6 in selected
+    assert BASE_PID + 4 not in selected and BASE_PID + 5 not in selected
+    assert selector.last_stats['by_ioc'] == 1
+
+
+def test_min_cpu_share_filters_idle_processes():
+    selector = _selector(top_k=10, min_cpu_share=0.3, force_select_tags=[])
+    snapshot = _snapshot(_entries())
+    candidates = list(snapshot.stats)
+    selector.select(snapshot, None, candidates)
+
+    # 总增量 1200，30% 为 360
+    assert selector.select(snapshot, None, candidates) == [BASE_PID + 1, BASE_PID + 2]
@@ -0,0 +1,44 @@
+from miner_sentinel_l2.src.utils.triage_queue import PRIORITY_HIGH, PRIORITY_NORMAL, TriageQueue
+
+
+def test_high_priority_first_then_fifo():
+    queue = TriageQueue()
+    queue.put(1, PRIORITY_NORMAL)
+    queue.put(2, PRIORITY_NORMAL)
+    queue.put(3, PRIORITY_HIGH)
+    assert [queue.get(timeout=0).pid for _ in range(3)] == [3, 1, 2]
+
+
+def test_duplicate_pid_is_queued_once():
+    queue = TriageQueue()
+    assert queue.put(1, PRIORITY_NORMAL)
+    assert not queue.put(1, PRIORITY_NORMAL)
+    assert len(queue) == 1
+    assert queue.stats['deduplicated'] == 1
+
+
+def test_duplicate_with_higher_priority_is_promoted():
+    queue = TriageQueue()
+    queue.put(1, PRIORITY_NORMAL, 'proc_connector')
+    queue.put(2, PRIORITY_NORMAL, 'proc_connector')
+    assert queue.put(2, PRIORITY_HIGH, 'exec_watch', '/tmp/x')
+    item = queue.get(timeout=0)
+    assert (item.pid, item.priority, item.source, item.path) == (2, PRIORITY_HIGH, 'exec_watch', '/tmp/x')
+    assert queue.get(timeout=0).pid == 1
+    assert queue.get(timeout=0) is None
+
+
+def test_full_queue_drops_new_items():
+    queue = TriageQueue(maxsize=1)
+    queue.put(1)
+    assert not queue.put(2)
+    assert queue.stats['dropped'] == 1
+
+
+def test_discarded_pid_is_skipped():
+    queue = TriageQueue()
+    queue.put(1)
+    queue.put(2)
+    queue.discard(1)
+    assert queue.get(timeout=0).pid == 2
+    assert queue.get(timeout=0.01) is None
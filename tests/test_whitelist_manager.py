@@ -0,0 +1,65 @@
+import os
+import threading
+
+import psutil
+
+from miner_sentinel_l2.src.utils.whitelist_manager import WhitelistManager
+
+
+def _manager(tmp_path, **kwargs):
+    path = tmp_path / 'pid_whitelist.yaml'
+    path.write_text("exact_matches: [init]\ntrusted_processes: [pytest]\n", encoding='utf-8')
+    return WhitelistManager(str(path), **kwargs)
+
+
+def test_decision_is_cached_per_process(tmp_path):
+    manager = _manager(tmp_path)
+    process = psutil.Process(os.getpid())
+    first = manager.is_whitelisted(process)
+    assert manager.is_whitelisted(process) == first
+    assert manager.cache_misses == 1
+    assert manager.cache_hits == 1
+
+
+def test_prune_drops_exited_pids(tmp_path):
+    manager = _manager(tmp_path)
+    manager.is_whitelisted(psutil.Process(os.getpid()))
+    manager.prune_cache(set())
+    assert manager.decision_cache == {}
+
+
+def test_concurrent_lookup_and_prune(tmp_path):
+    manager = _manager(tmp_path, max_cache_size=8)
+    processes = []
+    for pid in psutil.pids():
+        try:
+            processes.append(psutil.Process(pid))
+        except psutil.NoSuchProcess:
+            pass
+    errors = []
+    done = threading.Event()
+
+    def lookup():
+        try:
+            for _ in range(50):
+                for process in processes:
+                    manager.is_whitelisted(process)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    def prune():
+        alive = {p.pid for p in processes[::2]}
+        try:
+            while not done.is_set():
+                manager.prune_cache(alive)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=lookup), threading.Thread(target=prune)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []